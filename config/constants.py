@@ -22,6 +22,30 @@ class UserEstado(Enum):
 VOICE_CONFIG_ID = 1
 DEFAULT_LECTURA_LIMIT = 20
 MAX_LECTURAS_POR_SENSOR = 100
+MAX_LECTURAS_BATCH = 500
+MAX_PREDICCIONES_BATCH = 5000
+
+# Resolución de cada sensor: las entradas del modelo se redondean a ella
+RESOLUCION_SENSORES = {
+    "temperatura": 0.1,
+    "presion": 0.1,
+    "gas": 1.0,
+}
+
+# Rollups de series: duración en segundos de cada bucket (de fino a grueso)
+ROLLUP_BUCKETS = {"1m": 60, "1h": 3600, "1d": 86400}
+# Serie automática: el bucket más grueso que da al menos MIN_PUNTOS_SERIE puntos sin superar MAX_PUNTOS_SERIE
+MIN_PUNTOS_SERIE = 50
+MAX_PUNTOS_SERIE = 500
+MAX_PUNTOS_SERIE_CRUDA = 5000
+# Lecturas crudas que se cargan a lo sumo para reducirlas; rangos mayores usan los rollups
+MAX_LECTURAS_SERIE_CRUDA = 100_000
+
+# Método de reducción de puntos según GraphConfig.tipo_grafica (default: lttb)
+DOWNSAMPLING_POR_GRAFICA = {
+    "barra": "promedio",
+    "bar": "promedio",
+}
 
 # Alertas IA
 TEMPERATURA_MIN = 25
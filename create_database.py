@@ -23,6 +23,8 @@ def create_tables():
             from database.models.user import User
             from database.models.sensor import Sensor
             from database.models.lectura import Lectura
+            from database.models.lectura_rollup import LecturaRollup
+            from database.models.prediccion import Prediccion
             from database.models.proceso_biodigestor import ProcesoBiodigestor
             from database.models.graph_config import GraphConfig
             from database.models.voice_config import VoiceConfig
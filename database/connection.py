@@ -10,7 +10,17 @@ db = SQLAlchemy()
 def init_app(app):
     """
     Inicializa la base de datos con Aiven MySQL.
+    Con DATABASE_URL (p. ej. sqlite:///carga.db para las pruebas de carga
+    locales) se usa esa URI directamente, sin SSL.
     """
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True}
+        db.init_app(app)
+        return
+
     user = os.environ.get("DB_USER")
     password = os.environ.get("DB_PASSWORD")
     host = os.environ.get("DB_HOST")
@@ -3,36 +3,45 @@ from database.models.lectura import Lectura
 from database.models.proceso_biodigestor import ProcesoBiodigestor
 from database.models.sensor import Sensor
 from database.connection import db
-from sqlalchemy import desc
+from database.lectura_cache import cache_lecturas
+from database.proceso_cache import cache_proceso
+from sqlalchemy import and_, func, select
 from exceptions.custom_exceptions import ResourceNotFoundException
+from config.constants import SensorType
 
 logger = logging.getLogger(__name__)
 
+# Sensores que alimentan el modelo de alertas, en el orden que espera
+SENSORES_MODELO = (
+    SensorType.TEMPERATURA.value,
+    SensorType.PRESION.value,
+    SensorType.GAS.value
+)
+
 
 class LecturaException(Exception):
     pass
 
 
-def get_sensor_id_by_name(nombre):
-    """Obtiene ID de sensor por nombre"""
-    sensor = Sensor.query.filter_by(nombre=nombre).first()
-    if not sensor:
-        logger.error(f"Sensor no encontrado: {nombre}")
-        raise ResourceNotFoundException(f"Sensor '{nombre}' no encontrado")
-    return sensor.id
-
-
 def obtener_fecha_inicio_proceso_activo():
     """
     Retorna la fecha de inicio del proceso ACTIVO o None si no hay.
     """
-    proceso = ProcesoBiodigestor.query.filter_by(estado='ACTIVO').first()
+    proceso = cache_proceso.obtener()
     return proceso.fecha_inicio if proceso else None
 
 
+def obtener_fecha_inicio_proceso(proceso_id):
+    """Retorna la fecha de inicio de un proceso (activo o finalizado)"""
+    proceso = db.session.get(ProcesoBiodigestor, proceso_id)
+    if not proceso:
+        raise ResourceNotFoundException(f"Proceso {proceso_id} no encontrado")
+    return proceso.fecha_inicio
+
+
 def hay_proceso_activo():
-    """Verifica proceso activo con logging"""
-    proceso = ProcesoBiodigestor.query.filter_by(estado='ACTIVO').first()
+    """Verifica proceso activo con logging (retorna el ProcesoActivo en caché o None)"""
+    proceso = cache_proceso.obtener()
 
     if proceso:
         logger.debug(f"Proceso activo encontrado: ID={proceso.id}")
@@ -42,57 +51,94 @@ def hay_proceso_activo():
     return proceso
 
 
-def obtener_ultima_lectura_combinada():
-    """Obtiene última lectura de todos los sensores del proceso activo"""
-    logger.info("Obteniendo última lectura combinada")
-
-    try:
-        proceso_activo = hay_proceso_activo()
-        if not proceso_activo:
-            raise LecturaException("No hay proceso activo")
-
-        proceso_id = proceso_activo.id
-
-        # Obtener IDs dinámicamente
-        sensor_temp_id = get_sensor_id_by_name("temperatura")
-        sensor_pres_id = get_sensor_id_by_name("presion")
-        sensor_gas_id = get_sensor_id_by_name("gas")
-
-        # Queries individuales
-        ultima_temp = (
-            Lectura.query
-            .filter_by(sensor_id=sensor_temp_id, proceso_id=proceso_id)
-            .order_by(desc(Lectura.fecha_hora))
-            .first()
+def obtener_ultimas_lecturas(proceso_id=None):
+    """
+    Obtiene la última lectura de cada sensor del proceso indicado
+    (por defecto el proceso ACTIVO) en una sola consulta.
+    Retorna dict nombre_sensor -> {sensor_id, proceso_id, id, valor, fecha_hora}.
+    """
+    if proceso_id is None:
+        proceso_filtro = (
+            select(ProcesoBiodigestor.id)
+            .where(ProcesoBiodigestor.estado == 'ACTIVO')
+            .limit(1)
+            .scalar_subquery()
         )
-
-        ultima_pres = (
-            Lectura.query
-            .filter_by(sensor_id=sensor_pres_id, proceso_id=proceso_id)
-            .order_by(desc(Lectura.fecha_hora))
-            .first()
+    else:
+        proceso_filtro = proceso_id
+
+    # MAX(fecha_hora) agrupado por sensor: con el índice
+    # (proceso_id, sensor_id, fecha_hora) se resuelve sin recorrer la tabla
+    maximos = (
+        select(
+            Lectura.sensor_id,
+            func.max(Lectura.fecha_hora).label("fecha_max")
         )
-
-        ultima_gas = (
-            Lectura.query
-            .filter_by(sensor_id=sensor_gas_id, proceso_id=proceso_id)
-            .order_by(desc(Lectura.fecha_hora))
-            .first()
+        .where(Lectura.proceso_id == proceso_filtro)
+        .group_by(Lectura.sensor_id)
+        .subquery()
+    )
+
+    consulta = (
+        select(
+            Sensor.nombre,
+            Lectura.sensor_id,
+            Lectura.proceso_id,
+            Lectura.id,
+            Lectura.valor,
+            Lectura.fecha_hora
         )
+        .join(maximos, and_(
+            Lectura.sensor_id == maximos.c.sensor_id,
+            Lectura.fecha_hora == maximos.c.fecha_max
+        ))
+        .join(Sensor, Sensor.id == Lectura.sensor_id)
+        .where(Lectura.proceso_id == proceso_filtro)
+    )
+
+    ultimas = {}
+    for fila in db.session.execute(consulta):
+        actual = ultimas.get(fila.nombre)
+        # Desempate si dos lecturas comparten la misma fecha_hora
+        if actual is None or fila.id > actual["id"]:
+            ultimas[fila.nombre] = {
+                "sensor_id": fila.sensor_id,
+                "proceso_id": fila.proceso_id,
+                "id": fila.id,
+                "valor": fila.valor,
+                "fecha_hora": fila.fecha_hora
+            }
+    return ultimas
+
+
+def obtener_ultima_lectura_combinada(proceso_id=None):
+    """
+    Obtiene última lectura de todos los sensores del proceso activo.
+    Consulta primero la caché en memoria y recurre a la BD si no está.
+    """
+    logger.info("Obteniendo última lectura combinada")
 
-        if not all([ultima_temp, ultima_pres, ultima_gas]):
-            logger.warning("Proceso activo sin lecturas completas")
+    try:
+        if proceso_id is None:
+            proceso_activo = hay_proceso_activo()
+            if not proceso_activo:
+                raise LecturaException("No hay proceso activo")
+            proceso_id = proceso_activo.id
+
+        ultimas = cache_lecturas.obtener_ultimas(proceso_id)
+        if ultimas is None:
+            ultimas = obtener_ultimas_lecturas(proceso_id)
+            cache_lecturas.guardar_ultimas(proceso_id, ultimas)
+
+        faltantes = [nombre for nombre in SENSORES_MODELO if nombre not in ultimas]
+        if faltantes:
+            logger.warning(f"Proceso activo sin lecturas completas, faltan: {faltantes}")
             raise LecturaException("Proceso activo sin lecturas completas")
 
-        temperatura = float(ultima_temp.valor)
-        presion = float(ultima_pres.valor)
-        gas = float(ultima_gas.valor)
-
-        timestamp = max(
-            ultima_temp.fecha_hora,
-            ultima_pres.fecha_hora,
-            ultima_gas.fecha_hora
+        temperatura, presion, gas = (
+            float(ultimas[nombre]["valor"]) for nombre in SENSORES_MODELO
         )
+        timestamp = max(ultimas[nombre]["fecha_hora"] for nombre in SENSORES_MODELO)
 
         logger.info(
             f"Lectura combinada obtenida: T={temperatura}, P={presion}, G={gas}"
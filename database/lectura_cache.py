@@ -0,0 +1,133 @@
+"""
+Caché en memoria de las lecturas más recientes por proceso y sensor.
+
+Se actualiza en el camino de escritura (registrar_lectura) y se consulta en
+los caminos de lectura más frecuentes (/api/analizar y /api/lecturas/<id>).
+Cada entrada cargada desde la BD expira tras CACHE_LECTURAS_TTL segundos
+(default: 5; 0 desactiva la caché) para que los workers vean las lecturas
+escritas por otros procesos.
+"""
+import os
+import threading
+import time
+from collections import deque
+from config.constants import MAX_LECTURAS_POR_SENSOR
+
+
+class CacheLecturas:
+    """Últimas lecturas por proceso y lista de recientes por (proceso, sensor)"""
+
+    def __init__(self, ttl=5.0, max_por_sensor=MAX_LECTURAS_POR_SENSOR):
+        self.ttl = ttl
+        self.max_por_sensor = max_por_sensor
+        self._lock = threading.Lock()
+        # proceso_id -> (expira, {sensor_id: {nombre, sensor_id, proceso_id, id, valor, fecha_hora}})
+        self._ultimas = {}
+        # (proceso_id, sensor_id) -> (expira, completa, deque de lecturas, más reciente primero)
+        self._recientes = {}
+
+    def _vigente(self, entrada):
+        return entrada is not None and entrada[0] > time.monotonic()
+
+    # --- Última lectura de cada sensor del proceso ---
+
+    def obtener_ultimas(self, proceso_id):
+        """Retorna dict nombre_sensor -> lectura, o None si no está en caché"""
+        with self._lock:
+            entrada = self._ultimas.get(proceso_id)
+            if not self._vigente(entrada):
+                return None
+            return {info["nombre"]: dict(info) for info in entrada[1].values()}
+
+    def guardar_ultimas(self, proceso_id, ultimas):
+        """Guarda el resultado de obtener_ultimas_lecturas (dict por nombre)"""
+        if self.ttl <= 0:
+            return
+        por_sensor = {
+            info["sensor_id"]: dict(info, nombre=nombre)
+            for nombre, info in ultimas.items()
+        }
+        with self._lock:
+            self._ultimas[proceso_id] = (time.monotonic() + self.ttl, por_sensor)
+
+    # --- Lecturas recientes de un sensor ---
+
+    def obtener_recientes(self, proceso_id, sensor_id, limite):
+        """Retorna las `limite` lecturas más recientes, o None si no alcanza la caché"""
+        with self._lock:
+            entrada = self._recientes.get((proceso_id, sensor_id))
+            if not self._vigente(entrada):
+                return None
+            _, completa, lecturas = entrada
+            if len(lecturas) < limite and not completa:
+                return None
+            return [dict(l) for l in list(lecturas)[:limite]]
+
+    def guardar_recientes(self, proceso_id, sensor_id, lecturas, limite_consulta):
+        """Guarda lecturas leídas de la BD (más reciente primero)"""
+        if self.ttl <= 0:
+            return
+        completa = len(lecturas) < limite_consulta
+        with self._lock:
+            self._recientes[(proceso_id, sensor_id)] = (
+                time.monotonic() + self.ttl,
+                completa,
+                deque(lecturas[:self.max_por_sensor], maxlen=self.max_por_sensor)
+            )
+
+    # --- Camino de escritura ---
+
+    def registrar(self, lectura):
+        """
+        Incorpora una lectura recién escrita.
+        `lectura` es un dict con id, sensor_id, proceso_id, valor, fecha_hora, observaciones.
+        """
+        proceso_id = lectura["proceso_id"]
+        sensor_id = lectura["sensor_id"]
+
+        with self._lock:
+            entrada = self._ultimas.get(proceso_id)
+            if entrada is not None:
+                por_sensor = entrada[1]
+                actual = por_sensor.get(sensor_id)
+                if actual is None:
+                    # Sensor sin nombre conocido en la caché: recargar en la próxima consulta
+                    del self._ultimas[proceso_id]
+                elif lectura["fecha_hora"] >= actual["fecha_hora"]:
+                    por_sensor[sensor_id] = {
+                        "nombre": actual["nombre"],
+                        "sensor_id": sensor_id,
+                        "proceso_id": proceso_id,
+                        "id": lectura["id"],
+                        "valor": lectura["valor"],
+                        "fecha_hora": lectura["fecha_hora"]
+                    }
+
+            clave = (proceso_id, sensor_id)
+            entrada = self._recientes.get(clave)
+            if entrada is not None:
+                expira, completa, lecturas = entrada
+                if lecturas and lectura["fecha_hora"] < lecturas[0]["fecha_hora"]:
+                    # Lectura fuera de orden: se recarga desde la BD
+                    del self._recientes[clave]
+                else:
+                    if len(lecturas) == lecturas.maxlen:
+                        completa = False
+                    lecturas.appendleft(dict(lectura))
+                    self._recientes[clave] = (expira, completa, lecturas)
+
+    def invalidar_sensores(self, proceso_id, sensor_ids):
+        """Descarta las entradas afectadas por escrituras en bloque"""
+        with self._lock:
+            self._ultimas.pop(proceso_id, None)
+            for sensor_id in sensor_ids:
+                self._recientes.pop((proceso_id, sensor_id), None)
+
+    def invalidar(self):
+        """Descarta toda la caché (cambio de proceso, borrados)"""
+        with self._lock:
+            self._ultimas.clear()
+            self._recientes.clear()
+
+
+cache_lecturas = CacheLecturas(ttl=float(os.environ.get("CACHE_LECTURAS_TTL", 5)))
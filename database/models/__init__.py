@@ -1,6 +1,8 @@
 from .user import User
 from .sensor import Sensor
 from .lectura import Lectura
+from .lectura_rollup import LecturaRollup
+from .prediccion import Prediccion
 from .proceso_biodigestor import ProcesoBiodigestor
 from .graph_config import GraphConfig
 from .voice_config import VoiceConfig
@@ -9,6 +11,8 @@ __all__ = [
     'User',
     'Sensor', 
     'Lectura',
+    'LecturaRollup',
+    'Prediccion',
     'ProcesoBiodigestor',
     'GraphConfig',
     'VoiceConfig'
@@ -5,6 +5,14 @@ from sqlalchemy.orm import validates
 class Lectura(db.Model):
     __tablename__ = "lecturas"
 
+    # Índices para los patrones de consulta más frecuentes:
+    # - lecturas de un sensor en un proceso ordenadas por fecha (y MAX agrupado)
+    # - listado global ordenado por fecha
+    __table_args__ = (
+        db.Index('ix_lecturas_proceso_sensor_fecha', 'proceso_id', 'sensor_id', 'fecha_hora'),
+        db.Index('ix_lecturas_fecha_hora', 'fecha_hora'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sensor_id = db.Column(db.Integer, db.ForeignKey('sensores.id'), nullable=False)
     proceso_id = db.Column(db.Integer, db.ForeignKey('proceso_biodigestor.id'), nullable=True)
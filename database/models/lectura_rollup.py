@@ -0,0 +1,39 @@
+from database.connection import db
+
+
+class LecturaRollup(db.Model):
+    """
+    Agregados de lecturas por proceso, sensor y bucket de tiempo (1m, 1h, 1d).
+    Se actualizan de forma incremental al registrar lecturas.
+    """
+    __tablename__ = "lecturas_rollup"
+
+    # La restricción única también sirve de índice para las consultas por rango
+    __table_args__ = (
+        db.UniqueConstraint(
+            'proceso_id', 'sensor_id', 'bucket', 'inicio',
+            name='uq_rollup_proceso_sensor_bucket_inicio'
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    proceso_id = db.Column(db.Integer, db.ForeignKey('proceso_biodigestor.id'), nullable=False)
+    sensor_id = db.Column(db.Integer, db.ForeignKey('sensores.id'), nullable=False)
+    bucket = db.Column(db.String(3), nullable=False)
+    inicio = db.Column(db.DateTime, nullable=False)
+    minimo = db.Column(db.Float, nullable=False)
+    maximo = db.Column(db.Float, nullable=False)
+    suma = db.Column(db.Float, nullable=False)
+    conteo = db.Column(db.Integer, nullable=False)
+    ultimo_valor = db.Column(db.Float, nullable=False)
+    ultima_fecha = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            "inicio": self.inicio.isoformat(),
+            "min": self.minimo,
+            "max": self.maximo,
+            "avg": self.suma / self.conteo if self.conteo else None,
+            "count": self.conteo,
+            "last": self.ultimo_valor
+        }
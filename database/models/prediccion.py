@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from database.connection import db
+
+
+class Prediccion(db.Model):
+    """
+    Predicción de los modelos de alertas para la lectura combinada
+    (temperatura, presión, gas) de un proceso. Se registra al completar o
+    actualizar la terna de lecturas y forma el historial de alertas.
+    """
+    __tablename__ = "predicciones"
+
+    __table_args__ = (
+        db.Index('ix_predicciones_proceso_fecha', 'proceso_id', 'fecha_hora'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    proceso_id = db.Column(db.Integer, db.ForeignKey('proceso_biodigestor.id'), nullable=False)
+    # Fecha de la lectura más reciente de la terna evaluada
+    fecha_hora = db.Column(db.DateTime, nullable=False)
+    temperatura = db.Column(db.Float, nullable=False)
+    presion = db.Column(db.Float, nullable=False)
+    gas = db.Column(db.Float, nullable=False)
+    dia_proceso = db.Column(db.Integer, nullable=False)
+    alerta_ia = db.Column(db.Integer, nullable=False)
+    tipo_alerta_modelo = db.Column(db.String(50), nullable=False)
+    version_modelo = db.Column(db.String(20), nullable=True)
+    creado_en = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "proceso_id": self.proceso_id,
+            "fecha_hora": self.fecha_hora.isoformat() if self.fecha_hora else None,
+            "temperatura": self.temperatura,
+            "presion": self.presion,
+            "gas": self.gas,
+            "dia_proceso": self.dia_proceso,
+            "alerta_ia": self.alerta_ia,
+            "tipo_alerta_modelo": self.tipo_alerta_modelo,
+            "version_modelo": self.version_modelo
+        }
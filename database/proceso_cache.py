@@ -0,0 +1,54 @@
+"""
+Caché en memoria del proceso ACTIVO.
+
+Casi todos los endpoints necesitan saber cuál es el proceso activo, que solo
+cambia al iniciar o finalizar un proceso. iniciar_proceso/finalizar_proceso
+invalidan la caché explícitamente; además cada consulta expira tras
+CACHE_PROCESO_TTL segundos (default: 5; 0 desactiva la caché) para que los
+workers vean los cambios hechos por otros procesos.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from database.models.proceso_biodigestor import ProcesoBiodigestor
+
+# Copia inmutable del proceso: se puede compartir entre hilos y requests
+ProcesoActivo = namedtuple("ProcesoActivo", ["id", "estado", "fecha_inicio", "fecha_fin"])
+
+
+class CacheProcesoActivo:
+    """Proceso activo (o su ausencia) con expiración"""
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (expira, ProcesoActivo o None)
+        self._entrada = None
+
+    def obtener(self):
+        """Retorna el ProcesoActivo o None, consultando la BD solo si expiró"""
+        with self._lock:
+            entrada = self._entrada
+        if entrada is not None and entrada[0] > time.monotonic():
+            return entrada[1]
+
+        proceso = ProcesoBiodigestor.query.filter_by(estado='ACTIVO').first()
+        snapshot = None
+        if proceso is not None:
+            snapshot = ProcesoActivo(
+                proceso.id, proceso.estado, proceso.fecha_inicio, proceso.fecha_fin
+            )
+
+        if self.ttl > 0:
+            with self._lock:
+                self._entrada = (time.monotonic() + self.ttl, snapshot)
+        return snapshot
+
+    def invalidar(self):
+        """Descarta el proceso en caché (al iniciar o finalizar un proceso)"""
+        with self._lock:
+            self._entrada = None
+
+
+cache_proceso = CacheProcesoActivo(ttl=float(os.environ.get("CACHE_PROCESO_TTL", 5)))
@@ -0,0 +1,39 @@
+"""
+Caché en memoria de los sensores existentes.
+
+Los sensores se crean pocas veces y la API no permite eliminarlos, así que
+basta con recordar los ids ya vistos en la BD: un id conocido no vuelve a
+consultarse y uno desconocido se consulta cada vez (puede haberse creado en
+otro worker).
+"""
+import threading
+from database.connection import db
+from database.models.sensor import Sensor
+
+
+class CacheSensores:
+    """Ids de sensores confirmados en la BD"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conocidos = set()
+
+    def existe(self, sensor_id):
+        """True si el sensor existe, consultando la BD solo para ids no vistos"""
+        with self._lock:
+            if sensor_id in self._conocidos:
+                return True
+
+        existe = db.session.query(Sensor.id).filter(Sensor.id == sensor_id).first() is not None
+        if existe:
+            with self._lock:
+                self._conocidos.add(sensor_id)
+        return existe
+
+    def invalidar(self):
+        """Olvida los sensores conocidos"""
+        with self._lock:
+            self._conocidos.clear()
+
+
+cache_sensores = CacheSensores()
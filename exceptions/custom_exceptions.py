@@ -29,4 +29,9 @@ class ValidationException(AppException):
 class ResourceNotFoundException(AppException):
     """Excepción cuando no se encuentra un recurso"""
     def __init__(self, message, status_code=404, details=None):
-        super().__init__(message, status_code, details)
\ No newline at end of file
+        super().__init__(message, status_code, details)
+class ServiceUnavailableException(AppException):
+    """Servicio saturado temporalmente; el cliente debe reintentar tras retry_after segundos"""
+    def __init__(self, message, retry_after=1, details=None):
+        super().__init__(message, 503, details)
+        self.retry_after = retry_after
@@ -1,7 +1,52 @@
 # gunicorn_config.py
+import logging
+import os
+from utils.entorno import env_bool
+
 bind = "0.0.0.0:5000"
 workers = 4
 worker_class = "sync"
 worker_connections = 1000
 timeout = 30
-keepalive = 2
\ No newline at end of file
+keepalive = 2
+
+# Con preload la app (y los modelos ML) se cargan una vez en el master y los
+# workers comparten esas páginas copy-on-write tras el fork
+preload_app = env_bool("GUNICORN_PRELOAD")
+
+
+def worker_exit(server, worker):
+    """Vacía las lecturas pendientes del buffer write-behind antes de salir"""
+    from services.lectura_buffer import buffer_lecturas
+    if buffer_lecturas.activo:
+        buffer_lecturas.flush()
+
+
+def post_fork(server, worker):
+    """Con preload, descarta conexiones heredadas del master (no se comparten entre procesos)"""
+    if not preload_app:
+        return
+    from database.connection import db
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """
+    Reporta la memoria de cada worker con los modelos ML ya cargados: con
+    preload vienen cargados del master; si no, se reporta al terminar la
+    precarga del worker.
+    """
+    from services.modelos_ml import modelos_ml
+    modelos_ml.al_cargar(_reportar_memoria)
+
+
+def _reportar_memoria():
+    from utils.memoria import uso_memoria_mb
+    memoria = uso_memoria_mb()
+    logging.getLogger("gunicorn.error").info(
+        f"Worker {memoria['pid']} con modelos cargados: RSS={memoria['rss_mb']} MB, "
+        f"PSS={memoria['pss_mb']} MB, compartida={memoria['compartida_mb']} MB "
+        f"(ML_MODO_CARGA={os.environ.get('ML_MODO_CARGA', 'pkl')}, preload={preload_app})"
+    )
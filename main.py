@@ -5,6 +5,8 @@ from flask_cors import CORS
 from database.connection import init_app
 from config.logging_config import setup_logging
 from exceptions.exception_handler import register_exception_handlers
+from services.lectura_buffer import init_buffer
+from services.modelos_ml import init_modelos, modelos_ml
 from sqlalchemy import text  # ✅ AGREGADO
 
 # Importar blueprints
@@ -45,6 +47,12 @@ def create_app():
     # Inicializar DB
     init_app(app)
     
+    # Buffer write-behind de lecturas (opcional, por variables de entorno)
+    init_buffer(app)
+
+    # Modelos ML: precarga en segundo plano, /health informa cuándo están listos
+    init_modelos(app)
+    
     # CORS
     CORS(app)
     logger.info("CORS habilitado")
@@ -73,6 +81,7 @@ def create_app():
         return jsonify({
             'status': 'ok' if db_status == 'healthy' else 'degraded',
             'database': db_status,
+            'ml': modelos_ml.resumen(),
             'timestamp': now_utc().isoformat()  # ✅ FIX: Usar función UTC
         }), status_code
     
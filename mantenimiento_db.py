@@ -0,0 +1,107 @@
+# mantenimiento_db.py - Tareas de mantenimiento sobre una base de datos existente
+#
+# Uso:
+#   python mantenimiento_db.py indices            # crea los índices faltantes (online)
+#   python mantenimiento_db.py indices --dry-run  # solo muestra las sentencias
+#   python mantenimiento_db.py rollups [--proceso-id N]  # reconstruye rollups de series
+import argparse
+import sys
+import os
+from sqlalchemy import inspect, text
+
+# Agregar el directorio actual al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import create_app
+from database.connection import db
+
+
+def _sentencia_indice_online(indice):
+    """ALTER TABLE que crea el índice sin bloquear escrituras (InnoDB DDL online)"""
+    columnas = ", ".join(f"`{c.name}`" for c in indice.columns)
+    return (
+        f"ALTER TABLE `{indice.table.name}` "
+        f"ADD INDEX `{indice.name}` ({columnas}), "
+        f"ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def crear_indices(dry_run=False):
+    """
+    Crea en tablas existentes los índices declarados en los modelos que aún
+    no existen. En MySQL se usa DDL online para no bloquear la ingesta.
+    """
+    from database.models.lectura import Lectura
+
+    tablas = [Lectura.__table__]
+    inspector = inspect(db.engine)
+    es_mysql = db.engine.dialect.name == "mysql"
+
+    creados = 0
+    for tabla in tablas:
+        existentes = {i["name"] for i in inspector.get_indexes(tabla.name)}
+        creados_tabla = 0
+        print(f"\n🔍 Tabla {tabla.name}: {len(existentes)} índices existentes")
+
+        for indice in sorted(tabla.indexes, key=lambda i: i.name):
+            if indice.name in existentes:
+                print(f"   ✅ {indice.name} ya existe")
+                continue
+
+            if es_mysql:
+                sentencia = _sentencia_indice_online(indice)
+                print(f"   🔄 {sentencia}")
+                if not dry_run:
+                    db.session.execute(text(sentencia))
+            else:
+                print(f"   🔄 CREATE INDEX {indice.name}")
+                if not dry_run:
+                    indice.create(bind=db.engine)
+            creados_tabla += 1
+
+        creados += creados_tabla
+        if creados_tabla and es_mysql and not dry_run:
+            # Actualiza estadísticas para que el optimizador use los índices nuevos
+            db.session.execute(text(f"ANALYZE TABLE `{tabla.name}`"))
+
+    if not dry_run:
+        db.session.commit()
+    return creados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    p_indices = subparsers.add_parser("indices", help="Crear índices faltantes")
+    p_indices.add_argument("--dry-run", action="store_true", help="Solo mostrar sentencias")
+
+    p_rollups = subparsers.add_parser("rollups", help="Reconstruir rollups de series")
+    p_rollups.add_argument("--proceso-id", type=int, default=None,
+                           help="Solo este proceso (default: todos)")
+
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        try:
+            if args.comando == "indices":
+                creados = crear_indices(dry_run=args.dry_run)
+                accion = "por crear" if args.dry_run else "creados"
+                print(f"\n🎉 Índices {accion}: {creados}")
+            elif args.comando == "rollups":
+                from services.rollup_service import reconstruir_rollups
+                print("🔄 Reconstruyendo rollups (ejecutar con la ingesta detenida)...")
+                procesadas = reconstruir_rollups(proceso_id=args.proceso_id)
+                print(f"\n🎉 Rollups reconstruidos a partir de {procesadas} lecturas")
+            return True
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error en mantenimiento: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
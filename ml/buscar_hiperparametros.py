@@ -0,0 +1,219 @@
+# ml/buscar_hiperparametros.py
+"""
+Búsqueda de hiperparámetros y comparación de modelos candidatos.
+
+Cada candidato (bosques de distinto tamaño/profundidad/hojas, un árbol
+podado y un gradient boosting pequeño) se evalúa con validación cruzada
+estratificada en un pool de procesos que usa todos los núcleos. Después,
+en el proceso principal y de a uno (sin competir por CPU), se mide la
+latencia de inferencia de una fila, el rendimiento por lote y el tamaño
+serializado. Se recomienda el candidato más barato (menor latencia, luego
+menor tamaño) que alcanza la precisión mínima, no el más preciso.
+
+Solo se recomiendan bosques aleatorios: es lo único que la app sabe servir
+(services/modelos_ml.py los compila con ml/motor_inferencia.py). El árbol
+podado y el gradient boosting se reportan como referencia de costo. Con
+--guardar el modelo recomendado reemplaza al .pkl del objetivo.
+
+Uso (desde la raíz del proyecto):
+    python ml/buscar_hiperparametros.py --precision-minima 0.95
+    python ml/buscar_hiperparametros.py --objetivo tipo --procesos 4 --salida busqueda.json
+    python ml/buscar_hiperparametros.py --objetivo alerta --guardar
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.tree import DecisionTreeClassifier
+from ml.ensemble_system import COLUMNAS
+from ml.motor_inferencia import BosqueCompilado
+from ml.optimize_model import preparar_datos
+
+OBJETIVOS = {"alerta": "alerta_ia", "tipo": "tipo_alerta"}
+# Archivo que sirve la app para cada objetivo
+ARCHIVOS_MODELO = {"alerta": "modelo_alerta.pkl", "tipo": "modelo_tipo_alerta.pkl"}
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+REPETICIONES_LATENCIA = 200
+
+
+def candidatos():
+    """Lista de (nombre, clase, parámetros) a comparar"""
+    lista = []
+    for n_estimators, max_depth, min_samples_leaf in itertools.product(
+        (25, 50, 100, 150), (8, 12, 20, None), (1, 2, 5)
+    ):
+        lista.append((
+            f"rf_{n_estimators}_{max_depth or 'full'}_{min_samples_leaf}",
+            RandomForestClassifier,
+            {"n_estimators": n_estimators, "max_depth": max_depth,
+             "min_samples_leaf": min_samples_leaf, "random_state": 42, "n_jobs": 1}
+        ))
+    # Candidatos pequeños: un árbol podado por complejidad y gradient boosting
+    for ccp_alpha in (0.0, 0.001, 0.005):
+        lista.append((
+            f"arbol_podado_{ccp_alpha}", DecisionTreeClassifier,
+            {"ccp_alpha": ccp_alpha, "min_samples_leaf": 2, "random_state": 42}
+        ))
+    for max_iter, max_depth in ((50, 3), (100, 4)):
+        lista.append((
+            f"hgb_{max_iter}_{max_depth}", HistGradientBoostingClassifier,
+            {"max_iter": max_iter, "max_depth": max_depth, "random_state": 42}
+        ))
+    return lista
+
+
+def _particiones(y, maximo=5):
+    # Tantos pliegues como permita la clase con menos ejemplos
+    minimo_clase = int(pd.Series(y).value_counts().min())
+    return StratifiedKFold(n_splits=max(2, min(maximo, minimo_clase)), shuffle=True, random_state=42)
+
+
+def evaluar_candidato(candidato, X, y):
+    """
+    Validación cruzada y entrenamiento final de un candidato (se ejecuta en
+    un proceso del pool). Retorna el resultado y el modelo serializado.
+    """
+    nombre, clase, parametros = candidato
+    inicio = time.perf_counter()
+    puntajes = cross_val_score(clase(**parametros), X, y, cv=_particiones(y), scoring="accuracy")
+    modelo = clase(**parametros).fit(X, y)
+
+    buffer = io.BytesIO()
+    joblib.dump(modelo, buffer)
+    return {
+        "nombre": nombre,
+        "modelo": clase.__name__,
+        "parametros": parametros,
+        "precision": round(float(puntajes.mean()), 4),
+        "precision_std": round(float(puntajes.std()), 4),
+        "segundos_entrenamiento": round(time.perf_counter() - inicio, 3),
+        "tamano_kb": round(len(buffer.getvalue()) / 1024, 1),
+    }, buffer.getvalue()
+
+
+def medir_latencia(modelo, X, repeticiones=REPETICIONES_LATENCIA):
+    """Mediana de ms por predicción de una fila y filas/s en un lote"""
+    fila = X[:1]
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        modelo.predict(fila)
+        tiempos.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    modelo.predict(X)
+    lote = time.perf_counter() - inicio
+    return round(float(np.median(tiempos)) * 1000, 4), round(len(X) / lote)
+
+
+def buscar(X, y, lista=None, procesos=None, modelos=None):
+    """
+    Evalúa los candidatos en paralelo y mide su costo de inferencia; retorna
+    una lista de dicts. Si se pasa el dict `modelos`, se llena con el modelo
+    entrenado de cada candidato por nombre.
+    """
+    lista = lista if lista is not None else candidatos()
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y)
+
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as pool:
+        evaluados = list(pool.map(evaluar_candidato, lista, itertools.repeat(X), itertools.repeat(y)))
+
+    resultados = []
+    for resultado, serializado in evaluados:
+        modelo = joblib.load(io.BytesIO(serializado))
+        resultado["latencia_ms"], resultado["filas_por_segundo"] = medir_latencia(modelo, X)
+        # Los bosques se sirven con el motor compilado (services/modelos_ml.py)
+        resultado["servible"] = isinstance(modelo, RandomForestClassifier)
+        if resultado["servible"]:
+            resultado["latencia_compilado_ms"], _ = medir_latencia(BosqueCompilado(modelo), X)
+        else:
+            resultado["latencia_compilado_ms"] = None
+        if modelos is not None:
+            modelos[resultado["nombre"]] = modelo
+        resultados.append(resultado)
+    return resultados
+
+
+def costo_servicio(resultado):
+    """Latencia con la que se serviría el modelo (compilado si es posible)"""
+    return resultado["latencia_compilado_ms"] or resultado["latencia_ms"]
+
+
+def elegir_modelo(resultados, precision_minima):
+    """El candidato servible más barato que alcanza la precisión mínima (None si ninguno)"""
+    aptos = [r for r in resultados if r["servible"] and r["precision"] >= precision_minima]
+    if not aptos:
+        return None
+    return min(aptos, key=lambda r: (costo_servicio(r), r["tamano_kb"], -r["precision"]))
+
+
+def guardar_modelo(modelo, ruta):
+    """
+    Escribe el modelo a un temporal y lo reemplaza: los workers en ejecución
+    recargan los modelos al detectar el cambio y nunca leen un archivo a medio
+    escribir.
+    """
+    if not isinstance(modelo, RandomForestClassifier):
+        raise ValueError(f"La app solo sirve RandomForestClassifier, no {type(modelo).__name__}")
+    joblib.dump(modelo, ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+
+
+def imprimir_tabla(resultados, elegido):
+    print(f"{'candidato':<28}{'precisión':>10}{'±':>8}{'ms/fila':>10}{'ms comp.':>10}{'filas/s':>12}{'KB':>10}")
+    for r in sorted(resultados, key=lambda r: (-r["precision"], costo_servicio(r))):
+        marca = " ⭐" if elegido is not None and r["nombre"] == elegido["nombre"] else ""
+        compilado = f"{r['latencia_compilado_ms']:.3f}" if r["latencia_compilado_ms"] is not None else "-"
+        print(f"{r['nombre']:<28}{r['precision']:>10.4f}{r['precision_std']:>8.4f}{r['latencia_ms']:>10.3f}"
+              f"{compilado:>10}{r['filas_por_segundo']:>12}{r['tamano_kb']:>10.1f}{marca}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros con validación cruzada")
+    parser.add_argument("--csv", default="sensors.csv")
+    parser.add_argument("--objetivo", choices=sorted(OBJETIVOS), default="alerta")
+    parser.add_argument("--precision-minima", type=float, default=0.95)
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (default: todos los núcleos)")
+    parser.add_argument("--salida", help="Guardar resultados en JSON")
+    parser.add_argument("--guardar", action="store_true",
+                        help="Reemplazar ml/modelo_alerta.pkl o ml/modelo_tipo_alerta.pkl con el recomendado")
+    args = parser.parse_args()
+
+    df = preparar_datos(pd.read_csv(args.csv))
+    print(f"🔎 {len(candidatos())} candidatos, {len(df)} registros, objetivo {args.objetivo}")
+    modelos = {}
+    resultados = buscar(df[COLUMNAS], df[OBJETIVOS[args.objetivo]], procesos=args.procesos, modelos=modelos)
+    elegido = elegir_modelo(resultados, args.precision_minima)
+
+    imprimir_tabla(resultados, elegido)
+    if elegido:
+        print(f"\n✅ Recomendado: {elegido['nombre']} (precisión {elegido['precision']}, "
+              f"{costo_servicio(elegido)} ms/fila, {elegido['tamano_kb']} KB)")
+        if args.guardar:
+            ruta = os.path.join(ML_DIR, ARCHIVOS_MODELO[args.objetivo])
+            guardar_modelo(modelos[elegido["nombre"]], ruta)
+            print(f"💾 Guardado en {ruta} (recompilar con python -m ml.exportar_modelos si se usa mmap/compacto)")
+    else:
+        print(f"\n⚠️  Ningún candidato servible alcanza la precisión mínima {args.precision_minima}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "objetivo": args.objetivo,
+                "precision_minima": args.precision_minima,
+                "recomendado": elegido["nombre"] if elegido else None,
+                "resultados": resultados
+            }, f, ensure_ascii=False, indent=2)
@@ -1,108 +1,167 @@
 # ml/ensemble_system.py
+import os
 import joblib
 import pandas as pd
 import numpy as np
 
+COLUMNAS = ["temperatura_celsius", "presion_biogas_kpa", "mq4_ppm", "dia_proceso"]
+
+# Reglas de negocio: (columna de la máscara, tipo, confianza)
+REGLAS = [
+    ("regla_temperatura", "Temperatura Anormal", 0.95),
+    ("regla_baja_produccion", "Baja Producción", 0.85),
+    ("regla_presion", "Presión Crítica", 0.90),
+]
+
+
+def evaluar_reglas(temperatura, presion, ch4, dia):
+    """Máscara de cada regla de negocio (columna de REGLAS → arreglo bool)"""
+    return {
+        # Temperaturas críticas (OBLIGATORIO alertar)
+        "regla_temperatura": (temperatura < 26) | (temperatura > 39),
+        # Baja producción (CH4 muy bajo después de día 7)
+        "regla_baja_produccion": (ch4 < 2500) & (dia > 7),
+        # Presión crítica
+        "regla_presion": presion > 780,
+    }
+
+
+def tipo_por_reglas(reglas, n):
+    """Tipo de la regla activa de mayor confianza por fila ("Normal" si ninguna)"""
+    tipo = np.full(n, "Normal", dtype=object)
+    # Se asigna de menor a mayor confianza: la última escritura gana
+    for columna, tipo_regla, _ in sorted(REGLAS, key=lambda r: r[2]):
+        tipo[reglas[columna]] = tipo_regla
+    return tipo
+
+
 class SistemaAlertaOptimizado:
-    def __init__(self):
-        self.modelo_original_alerta = joblib.load("ml/modelo_alerta.pkl")
-        self.modelo_original_tipo = joblib.load("ml/modelo_tipo_alerta.pkl")
+    def __init__(self, directorio="ml"):
+        self.modelo_original_alerta = joblib.load(os.path.join(directorio, "modelo_alerta.pkl"))
+        self.modelo_original_tipo = joblib.load(os.path.join(directorio, "modelo_tipo_alerta.pkl"))
         
         try:
-            self.modelo_optimizado_alerta = joblib.load("ml/modelo_alerta_optimizado.pkl")
-            self.modelo_optimizado_tipo = joblib.load("ml/modelo_tipo_alerta_optimizado.pkl")
+            self.modelo_optimizado_alerta = joblib.load(os.path.join(directorio, "modelo_alerta_optimizado.pkl"))
+            self.modelo_optimizado_tipo = joblib.load(os.path.join(directorio, "modelo_tipo_alerta_optimizado.pkl"))
             self.usar_optimizado = True
         except:
             self.usar_optimizado = False
     
     def predecir_con_ensemble(self, datos):
-        """Sistema ensemble que combina modelos + reglas de negocio"""
+        """Sistema ensemble que combina modelos + reglas de negocio (una fila)"""
         
         # Convertir a DataFrame si es necesario
         if isinstance(datos, (list, np.ndarray)):
-            datos = pd.DataFrame([datos], 
-                               columns=["temperatura_celsius", "presion_biogas_kpa", 
-                                       "mq4_ppm", "dia_proceso"])
+            datos = pd.DataFrame([datos], columns=COLUMNAS)
         
-        # 🔧 REGLA 1: DETECCIÓN OBLIGATORIA DE TEMPERATURA EXTREMA
-        temperatura = datos['temperatura_celsius'].iloc[0]
-        presion = datos['presion_biogas_kpa'].iloc[0]
-        ch4 = datos['mq4_ppm'].iloc[0]
-        dia = datos['dia_proceso'].iloc[0]
+        fila = self.predecir_lote(datos.iloc[:1]).iloc[0]
         
-        # Reglas de negocio explícitas
-        alertas_reglas = []
-        
-        # Temperaturas críticas (OBLIGATORIO alertar)
-        if temperatura < 26 or temperatura > 39:
-            alertas_reglas.append({
-                'tipo': 'Temperatura Anormal',
-                'confianza': 0.95,
-                'fuente': 'regla'
-            })
+        # Reglas activadas, en el orden en que se evalúan
+        alertas_reglas = [
+            {'tipo': tipo, 'confianza': confianza, 'fuente': 'regla'}
+            for columna, tipo, confianza in REGLAS if fila[columna]
+        ]
         
-        # Baja producción (CH4 muy bajo después de día 7)
-        if ch4 < 2500 and dia > 7:
-            alertas_reglas.append({
-                'tipo': 'Baja Producción', 
-                'confianza': 0.85,
-                'fuente': 'regla'
-            })
+        return {
+            'alerta': int(fila['alerta']),
+            'tipo_alerta': fila['tipo_alerta'],
+            'fuente': fila['fuente'],
+            'detalles': {
+                'original': {'alerta': fila['original_alerta'], 'tipo': fila['original_tipo']},
+                'optimizado': {'alerta': fila['optimizado_alerta'], 'tipo': fila['optimizado_tipo']},
+                'reglas': alertas_reglas
+            }
+        }
+    
+    def _predecir_modelos(self, X, modelo_alerta, modelo_tipo):
+        """Alerta y tipo de un par de modelos; el tipo solo se evalúa en las filas con alerta"""
+        alerta = modelo_alerta.predict(X)
+        tipo = np.full(len(X), "Normal", dtype=object)
+        con_alerta = alerta.astype(bool)
+        if con_alerta.any():
+            tipo[con_alerta] = modelo_tipo.predict(X[con_alerta])
+        return alerta, tipo
+    
+    def predecir_lote(self, datos, tamano_bloque=200_000):
+        """
+        Ensemble para muchas filas: cada modelo se llama una vez por bloque y
+        las reglas de negocio se evalúan como máscaras de NumPy.
+        `datos`: DataFrame con COLUMNAS o arreglo (n, 4) en ese orden.
+        Retorna un DataFrame (mismo índice) con alerta, tipo_alerta, fuente,
+        las predicciones de cada modelo y la máscara de cada regla; cada fila
+        coincide con predecir_con_ensemble.
+        """
+        if not isinstance(datos, pd.DataFrame):
+            datos = pd.DataFrame(np.asarray(datos, dtype=float).reshape(-1, len(COLUMNAS)), columns=COLUMNAS)
+        X = datos[COLUMNAS]
+        if len(X) == 0:
+            raise ValueError("No hay filas para evaluar")
         
-        # Presión crítica
-        if presion > 780:
-            alertas_reglas.append({
-                'tipo': 'Presión Crítica',
-                'confianza': 0.90,
-                'fuente': 'regla'
-            })
+        return pd.concat([
+            self._predecir_bloque(X.iloc[inicio:inicio + tamano_bloque])
+            for inicio in range(0, len(X), tamano_bloque)
+        ])
+    
+    def _predecir_bloque(self, X):
+        temperatura = X['temperatura_celsius'].to_numpy()
+        presion = X['presion_biogas_kpa'].to_numpy()
+        ch4 = X['mq4_ppm'].to_numpy()
+        dia = X['dia_proceso'].to_numpy()
         
-        # 🔧 PREDICCIÓN CON MÚLTIPLES MODELOS
-        pred_original_alerta = self.modelo_original_alerta.predict(datos)[0]
-        pred_original_tipo = self.modelo_original_tipo.predict(datos)[0] if pred_original_alerta else "Normal"
+        # 🔧 REGLAS DE NEGOCIO COMO MÁSCARAS
+        reglas = evaluar_reglas(temperatura, presion, ch4, dia)
+        hay_regla = np.logical_or.reduce(list(reglas.values()))
         
+        # 🔧 PREDICCIÓN CON MÚLTIPLES MODELOS (una llamada por modelo)
+        original_alerta, original_tipo = self._predecir_modelos(
+            X, self.modelo_original_alerta, self.modelo_original_tipo
+        )
         if self.usar_optimizado:
-            pred_optimizado_alerta = self.modelo_optimizado_alerta.predict(datos)[0]
-            pred_optimizado_tipo = self.modelo_optimizado_tipo.predict(datos)[0] if pred_optimizado_alerta else "Normal"
+            optimizado_alerta, optimizado_tipo = self._predecir_modelos(
+                X, self.modelo_optimizado_alerta, self.modelo_optimizado_tipo
+            )
         else:
-            pred_optimizado_alerta = pred_original_alerta
-            pred_optimizado_tipo = pred_original_tipo
+            optimizado_alerta, optimizado_tipo = original_alerta, original_tipo
         
         # 🔧 COMBINAR PREDICCIONES
-        # Votación para alerta
-        votos_alerta = [pred_original_alerta, pred_optimizado_alerta]
-        if alertas_reglas:
-            votos_alerta.append(1)  # Las reglas siempre votan por alerta
+        # Votación para alerta: las reglas siempre votan por alerta
+        votos = original_alerta.astype(int) + optimizado_alerta.astype(int) + hay_regla
+        alerta = (votos >= 2).astype(int)
         
-        alerta_final = 1 if sum(votos_alerta) >= 2 else 0
+        # Tipo: la regla de mayor confianza tiene prioridad sobre los modelos
+        tipo = np.full(len(X), "Normal", dtype=object)
+        fuente = np.full(len(X), "modelo", dtype=object)
         
-        # Determinar tipo de alerta
-        if not alerta_final:
-            tipo_final = "Normal"
-            fuente = "modelo"
-        else:
-            # Priorizar reglas de negocio
-            if alertas_reglas:
-                # Tomar la alerta de mayor confianza de las reglas
-                alerta_principal = max(alertas_reglas, key=lambda x: x['confianza'])
-                tipo_final = alerta_principal['tipo']
-                fuente = alerta_principal['fuente']
-            else:
-                # Votación entre modelos
-                tipos = [pred_original_tipo, pred_optimizado_tipo]
-                tipo_final = max(set(tipos), key=tipos.count)
-                fuente = "modelo"
+        por_modelo = alerta.astype(bool) & ~hay_regla
+        tipo[por_modelo] = self._votar_tipos(original_tipo[por_modelo], optimizado_tipo[por_modelo])
         
-        return {
-            'alerta': alerta_final,
-            'tipo_alerta': tipo_final,
-            'fuente': fuente,
-            'detalles': {
-                'original': {'alerta': pred_original_alerta, 'tipo': pred_original_tipo},
-                'optimizado': {'alerta': pred_optimizado_alerta, 'tipo': pred_optimizado_tipo},
-                'reglas': alertas_reglas
-            }
-        }
+        por_regla = alerta.astype(bool) & hay_regla
+        fuente[por_regla] = "regla"
+        tipo[por_regla] = tipo_por_reglas(reglas, len(X))[por_regla]
+        
+        return pd.DataFrame({
+            "alerta": alerta,
+            "tipo_alerta": tipo,
+            "fuente": fuente,
+            "original_alerta": original_alerta,
+            "original_tipo": original_tipo,
+            "optimizado_alerta": optimizado_alerta,
+            "optimizado_tipo": optimizado_tipo,
+            **reglas
+        }, index=X.index)
+    
+    @staticmethod
+    def _votar_tipos(tipos_original, tipos_optimizado):
+        """Votación entre modelos por fila, resuelta una vez por par distinto"""
+        if len(tipos_original) == 0:
+            return tipos_original
+        pares = np.stack([tipos_original.astype(str), tipos_optimizado.astype(str)], axis=1)
+        unicos, inversos = np.unique(pares, axis=0, return_inverse=True)
+        # Misma regla que la versión por fila (incluido el desempate)
+        votos = np.array(
+            [max(set(tipos), key=list(tipos).count) for tipos in unicos.tolist()], dtype=object
+        )
+        return votos[inversos.reshape(-1)]
 
 # Prueba del sistema optimizado
 def probar_sistema_optimizado():
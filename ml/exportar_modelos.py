@@ -0,0 +1,137 @@
+# ml/exportar_modelos.py
+"""
+Compila los modelos de alertas (.pkl) a directorios de arreglos .npy que
+services/ai_service.py carga con memoria mapeada (ML_MODO_CARGA=mmap).
+
+Con --compacto genera en cambio un .npz comprimido por modelo, con a lo sumo
+MAX_ARBOLES_COMPACTO árboles y profundidad MAX_PROFUNDIDAD_COMPACTO
+(ML_MODO_CARGA=compacto). Antes de escribirlo valida contra sensors.csv que
+la precisión no caiga más que --tolerancia respecto del modelo original.
+Con los modelos de 100 árboles de ml/train_model.py los límites por defecto
+reducen a la mitad la memoria sin cambiar la precisión sobre sensors.csv.
+
+Uso (desde la raíz del proyecto, después de entrenar):
+    python -m ml.exportar_modelos
+    python -m ml.exportar_modelos --compacto
+    python -m ml.exportar_modelos --compacto --max-arboles 25 --max-profundidad 10 --tolerancia 0.005
+    python -m ml.exportar_modelos --compacto --max-arboles 0 --max-profundidad 0   # sin recortar
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.motor_inferencia import BosqueCompilado, origen_modelo
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPILADOS_DIR = os.path.join(ML_DIR, "compilados")
+MODELOS = ("modelo_alerta", "modelo_tipo_alerta")
+# Columna de sensors.csv que predice cada modelo
+OBJETIVOS = {"modelo_alerta": "alerta_ia", "modelo_tipo_alerta": "tipo_alerta"}
+# Límites del modo compacto (validados con validar_deriva sobre sensors.csv)
+MAX_ARBOLES_COMPACTO = 50
+MAX_PROFUNDIDAD_COMPACTO = 12
+TOLERANCIA_COMPACTO = 0.01
+
+
+def exportar_modelos(nombres=MODELOS, ml_dir=ML_DIR, destino=COMPILADOS_DIR):
+    """Compila cada <nombre>.pkl en <destino>/<nombre>/. Retorna las rutas generadas"""
+    generados = []
+    for nombre in nombres:
+        ruta_pkl = os.path.join(ml_dir, f"{nombre}.pkl")
+        directorio = os.path.join(destino, nombre)
+        bosque = BosqueCompilado.desde_archivo(ruta_pkl)
+        bosque.guardar(directorio, origen=origen_modelo(ruta_pkl))
+
+        tamano = sum(
+            os.path.getsize(os.path.join(directorio, f)) for f in os.listdir(directorio)
+        )
+        print(f"✅ {nombre}: {bosque.n_arboles} árboles, "
+              f"{len(bosque.izquierdos)} nodos, {tamano / 1024:.0f} KB → {directorio}")
+        generados.append(directorio)
+    return generados
+
+
+def validar_deriva(original, compacto, X, y):
+    """Precisión de ambos bosques sobre (X, y) y fracción de predicciones iguales"""
+    pred_original = original.predict(X)
+    pred_compacto = compacto.predict(X)
+    return {
+        "precision_original": float((pred_original == y).mean()),
+        "precision_compacto": float((pred_compacto == y).mean()),
+        "coincidencia": float((pred_original == pred_compacto).mean())
+    }
+
+
+def exportar_compactos(nombres=MODELOS, ml_dir=ML_DIR, destino=COMPILADOS_DIR,
+                       max_arboles=MAX_ARBOLES_COMPACTO, max_profundidad=MAX_PROFUNDIDAD_COMPACTO,
+                       tolerancia=TOLERANCIA_COMPACTO, ruta_csv="sensors.csv"):
+    """
+    Compacta cada modelo en <destino>/<nombre>.npz si la caída de precisión
+    sobre ruta_csv no supera `tolerancia`. Retorna {nombre: métricas}; lanza
+    ValueError (sin escribir nada) si algún modelo la supera.
+    """
+    import pandas as pd
+    from ml.ensemble_system import COLUMNAS
+    from ml.optimize_model import preparar_datos
+
+    df = preparar_datos(pd.read_csv(ruta_csv))
+    X = df[COLUMNAS].to_numpy(dtype=float)
+
+    compactos, metricas = {}, {}
+    for nombre in nombres:
+        ruta_pkl = os.path.join(ml_dir, f"{nombre}.pkl")
+        original = BosqueCompilado.desde_archivo(ruta_pkl)
+        compacto = original.compactar(max_arboles, max_profundidad)
+
+        y = df[OBJETIVOS[nombre]].to_numpy()
+        if original.classes_.dtype.kind in "iub":
+            y = y.astype(original.classes_.dtype)
+        resultado = validar_deriva(original, compacto, X, y)
+        resultado.update({
+            "arboles": compacto.n_arboles,
+            "profundidad": compacto.profundidad,
+            "kb_original": round(original.tamano_bytes() / 1024, 1),
+            "kb_compacto": round(compacto.tamano_bytes() / 1024, 1),
+        })
+        deriva = resultado["precision_original"] - resultado["precision_compacto"]
+        print(f"{'✅' if deriva <= tolerancia else '❌'} {nombre}: precisión "
+              f"{resultado['precision_original']:.4f} → {resultado['precision_compacto']:.4f}, "
+              f"coincidencia {resultado['coincidencia']:.4f}, {compacto.n_arboles} árboles, "
+              f"{resultado['kb_original']} → {resultado['kb_compacto']} KB en memoria")
+        if deriva > tolerancia:
+            raise ValueError(f"{nombre}: la precisión cae {deriva:.4f} (tolerancia {tolerancia})")
+        compactos[nombre] = (compacto, origen_modelo(ruta_pkl))
+        metricas[nombre] = resultado
+
+    # Se escribe solo si todos los modelos pasaron la validación
+    for nombre, (compacto, origen) in compactos.items():
+        ruta = os.path.join(destino, f"{nombre}.npz")
+        compacto.guardar_compacto(ruta, origen=origen)
+        metricas[nombre]["ruta"] = ruta
+        print(f"   {nombre} → {ruta} ({os.path.getsize(ruta) / 1024:.0f} KB)")
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compila los modelos de alertas para servirlos")
+    parser.add_argument("--compacto", action="store_true", help="Generar .npz comprimidos y reducidos")
+    parser.add_argument("--max-arboles", type=int, default=MAX_ARBOLES_COMPACTO,
+                        help="Árboles por modelo en modo compacto (0: todos)")
+    parser.add_argument("--max-profundidad", type=int, default=MAX_PROFUNDIDAD_COMPACTO,
+                        help="Profundidad máxima en modo compacto (0: sin límite)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_COMPACTO,
+                        help="Caída máxima de precisión sobre el CSV de validación")
+    parser.add_argument("--csv", default="sensors.csv", help="Dataset de validación")
+    args = parser.parse_args()
+
+    if args.compacto:
+        try:
+            exportar_compactos(max_arboles=args.max_arboles or None,
+                               max_profundidad=args.max_profundidad or None,
+                               tolerancia=args.tolerancia, ruta_csv=args.csv)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+    else:
+        exportar_modelos()
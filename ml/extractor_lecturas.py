@@ -0,0 +1,226 @@
+# ml/extractor_lecturas.py
+"""
+Extrae datos de entrenamiento directamente de la tabla lecturas.
+
+Las lecturas guardan una fila por sensor y timestamp; los modelos esperan
+una fila (temperatura, presión, gas, día de proceso). El extractor recorre
+las lecturas de cada proceso en orden de fecha con un cursor del servidor
+(stream_results), por lotes, y las alinea en ventanas de tiempo fijas:
+promedio de cada sensor en la ventana y, si un sensor no reportó, su último
+valor conocido en el proceso (como hace /api/analizar con la última lectura
+combinada). En memoria solo hay un lote de lecturas a la vez.
+
+Las lecturas no tienen etiquetas: sin --etiquetar-reglas el CSV lleva solo
+las características; con él cada fila se etiqueta con las reglas de negocio
+del ensemble (ml/ensemble_system.py), es decir, los modelos entrenados con
+esas filas aprenden las reglas, no eventos reales.
+
+Uso (desde la raíz del proyecto):
+    python -m ml.extractor_lecturas --salida dataset_bd.csv --ventana 60
+    python -m ml.extractor_lecturas --salida dataset_bd.csv --etiquetar-reglas
+    python -m ml.extractor_lecturas --proceso-id 3 --proceso-id 4 --salida p34.csv
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from database.connection import db
+from database.models.lectura import Lectura
+from database.models.sensor import Sensor
+from database.models.proceso_biodigestor import ProcesoBiodigestor
+from database.db_service import SENSORES_MODELO
+from ml.ensemble_system import COLUMNAS, evaluar_reglas, tipo_por_reglas
+
+# Sensor → columna del dataset de entrenamiento
+COLUMNAS_SENSOR = dict(zip(SENSORES_MODELO, COLUMNAS[:3]))
+COLUMNAS_LECTURA = ["proceso_id", "sensor", "valor", "fecha_hora", "fecha_inicio"]
+ETIQUETAS = ["alerta_ia", "tipo_alerta"]
+TAMANO_LOTE = 50_000
+
+
+def _consulta_lecturas(procesos=None):
+    consulta = (
+        select(
+            Lectura.proceso_id,
+            Sensor.nombre.label("sensor"),
+            Lectura.valor,
+            Lectura.fecha_hora,
+            ProcesoBiodigestor.fecha_inicio
+        )
+        .join(Sensor, Lectura.sensor_id == Sensor.id)
+        .join(ProcesoBiodigestor, Lectura.proceso_id == ProcesoBiodigestor.id)
+        .where(Sensor.nombre.in_(SENSORES_MODELO))
+        .order_by(Lectura.proceso_id, Lectura.fecha_hora, Lectura.id)
+    )
+    if procesos:
+        consulta = consulta.where(Lectura.proceso_id.in_(procesos))
+    return consulta
+
+
+def leer_lecturas(procesos=None, tamano_lote=TAMANO_LOTE):
+    """Lotes de filas (proceso_id, sensor, valor, fecha_hora, fecha_inicio) con cursor del servidor"""
+    with db.engine.connect() as conexion:
+        resultado = conexion.execution_options(
+            stream_results=True, yield_per=tamano_lote
+        ).execute(_consulta_lecturas(procesos))
+        for lote in resultado.partitions(tamano_lote):
+            yield lote
+
+
+class PivoteVentanas:
+    """
+    Convierte lotes de lecturas ordenadas por (proceso, fecha) en filas de
+    características. Conserva entre lotes la ventana que sigue abierta y el
+    último valor de cada sensor por proceso.
+    """
+
+    def __init__(self, ventana=60, rellenar=True):
+        self.frecuencia = f"{int(ventana)}s"
+        self.rellenar = rellenar
+        self._abierta = None
+        self._ultimos = pd.DataFrame(columns=list(SENSORES_MODELO), dtype=float)
+
+    def agregar(self, lote):
+        """Procesa un lote; retorna las filas de las ventanas ya cerradas"""
+        df = pd.DataFrame.from_records(list(lote), columns=COLUMNAS_LECTURA)
+        if self._abierta is not None:
+            df = pd.concat([self._abierta, df], ignore_index=True)
+        if df.empty:
+            return self._vacio()
+
+        df["ventana"] = pd.to_datetime(df["fecha_hora"]).dt.floor(self.frecuencia)
+        # La última ventana puede continuar en el lote siguiente
+        ultima = (df["proceso_id"] == df["proceso_id"].iat[-1]) & (df["ventana"] == df["ventana"].iat[-1])
+        self._abierta = df.loc[ultima, COLUMNAS_LECTURA]
+        return self._pivotar(df[~ultima])
+
+    def cerrar(self):
+        """Filas de la última ventana abierta"""
+        abierta, self._abierta = self._abierta, None
+        if abierta is None or abierta.empty:
+            return self._vacio()
+        abierta = abierta.assign(ventana=pd.to_datetime(abierta["fecha_hora"]).dt.floor(self.frecuencia))
+        return self._pivotar(abierta)
+
+    def _vacio(self):
+        return pd.DataFrame(columns=["proceso_id", "fecha_hora", *COLUMNAS])
+
+    def _pivotar(self, df):
+        if df.empty:
+            return self._vacio()
+        claves = ["proceso_id", "ventana"]
+        valores = (
+            df.pivot_table(index=claves, columns="sensor", values="valor", aggfunc="mean")
+            .reindex(columns=list(SENSORES_MODELO))
+        )
+        meta = df.groupby(claves).agg(
+            fecha_hora=("fecha_hora", "max"), fecha_inicio=("fecha_inicio", "first")
+        )
+
+        if self.rellenar:
+            valores = valores.groupby(level="proceso_id").ffill()
+            # Huecos al inicio del lote: último valor de lotes anteriores
+            procesos = valores.index.get_level_values("proceso_id")
+            previos = self._ultimos.reindex(procesos)
+            valores = valores.fillna(pd.DataFrame(previos.to_numpy(), index=valores.index, columns=valores.columns))
+            self._ultimos = valores.groupby(level="proceso_id").last().combine_first(self._ultimos)
+
+        filas = valores.join(meta).dropna(subset=list(SENSORES_MODELO)).reset_index()
+        fecha_hora = pd.to_datetime(filas["fecha_hora"])
+        filas["dia_proceso"] = (
+            fecha_hora.dt.normalize() - pd.to_datetime(filas["fecha_inicio"]).dt.normalize()
+        ).dt.days + 1
+        filas = filas.rename(columns=COLUMNAS_SENSOR)
+        filas["fecha_hora"] = fecha_hora
+        return filas[["proceso_id", "fecha_hora", *COLUMNAS]]
+
+
+def pivotar_por_ventanas(lotes, ventana=60, rellenar=True):
+    """Genera DataFrames (proceso_id, fecha_hora, COLUMNAS) a partir de lotes de lecturas"""
+    pivote = PivoteVentanas(ventana, rellenar)
+    for lote in lotes:
+        filas = pivote.agregar(lote)
+        if not filas.empty:
+            yield filas
+    filas = pivote.cerrar()
+    if not filas.empty:
+        yield filas
+
+
+def etiquetar_con_reglas(filas):
+    """Agrega alerta_ia y tipo_alerta según las reglas de negocio del ensemble"""
+    reglas = evaluar_reglas(*(filas[columna].to_numpy() for columna in COLUMNAS))
+    alerta = np.logical_or.reduce(list(reglas.values()))
+    return filas.assign(alerta_ia=alerta.astype(int), tipo_alerta=tipo_por_reglas(reglas, len(filas)))
+
+
+def _columnas_dataset(etiquetador):
+    return ["proceso_id", "fecha_hora", *COLUMNAS, *(ETIQUETAS if etiquetador else [])]
+
+
+def extraer_dataset(procesos=None, ventana=60, rellenar=True, tamano_lote=TAMANO_LOTE,
+                    etiquetador=None):
+    """Bloques de filas de características (etiquetadas si se pasa etiquetador); requiere contexto de aplicación"""
+    for filas in pivotar_por_ventanas(leer_lecturas(procesos, tamano_lote), ventana, rellenar):
+        yield etiquetador(filas) if etiquetador else filas
+
+
+def volcar_dataset(ruta, procesos=None, ventana=60, rellenar=True, tamano_lote=TAMANO_LOTE,
+                   etiquetador=None):
+    """
+    Escribe el dataset en un CSV bloque a bloque y retorna el número de
+    filas. En memoria solo hay un lote de lecturas y un bloque de filas a la
+    vez, sin importar el tamaño de la tabla.
+    """
+    total = 0
+    with open(ruta, "w", newline="") as archivo:
+        for bloque in extraer_dataset(procesos, ventana, rellenar, tamano_lote, etiquetador):
+            bloque.to_csv(archivo, header=total == 0, index=False)
+            total += len(bloque)
+        if total == 0:
+            pd.DataFrame(columns=_columnas_dataset(etiquetador)).to_csv(archivo, index=False)
+    return total
+
+
+def cargar_dataset(procesos=None, ventana=60, rellenar=True, tamano_lote=TAMANO_LOTE,
+                   etiquetador=None):
+    """
+    Dataset completo en un DataFrame con las columnas de sensors.csv. Reúne
+    todos los bloques en memoria (características en float32), así que el
+    consumo crece con el número de filas: para la tabla completa usar
+    volcar_dataset.
+    """
+    bloques = [
+        bloque.astype({columna: np.float32 for columna in COLUMNAS[:3]})
+        for bloque in extraer_dataset(procesos, ventana, rellenar, tamano_lote, etiquetador)
+    ]
+    if not bloques:
+        return pd.DataFrame(columns=_columnas_dataset(etiquetador))
+    return pd.concat(bloques, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrae un dataset de entrenamiento de la tabla lecturas")
+    parser.add_argument("--salida", default="dataset_bd.csv")
+    parser.add_argument("--proceso-id", type=int, action="append", help="Proceso a extraer (repetible; default: todos)")
+    parser.add_argument("--ventana", type=int, default=60, help="Segundos por ventana de alineación")
+    parser.add_argument("--sin-relleno", action="store_true",
+                        help="Descartar ventanas en las que falte algún sensor")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--etiquetar-reglas", action="store_true",
+                        help="Agregar alerta_ia y tipo_alerta según las reglas de negocio del ensemble")
+    args = parser.parse_args()
+
+    from main import create_app
+    app = create_app()
+    with app.app_context():
+        total = volcar_dataset(
+            args.salida, args.proceso_id, args.ventana, not args.sin_relleno, args.tamano_lote,
+            etiquetar_con_reglas if args.etiquetar_reglas else None
+        )
+    print(f"✅ {total} filas de entrenamiento → {args.salida}")
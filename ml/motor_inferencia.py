@@ -0,0 +1,280 @@
+# ml/motor_inferencia.py
+"""
+Motor de inferencia para los RandomForestClassifier de alertas.
+
+Extrae una sola vez los árboles de un modelo entrenado con scikit-learn y los
+evalúa sobre arreglos planos de NumPy, sin DataFrame ni validación de
+entrada por predicción. Reproduce exactamente predict/predict_proba de
+sklearn:
+  - las entradas se convierten a float32 y se comparan con `<=` contra los
+    umbrales (float64), como hace sklearn;
+  - cada hoja aporta las mismas probabilidades que
+    DecisionTreeClassifier.predict_proba (tree_.value);
+  - las probabilidades de los árboles se acumulan en el mismo orden que el
+    bosque, de modo que los empates en el argmax se resuelven igual.
+
+Un bosque compilado se puede guardar como un directorio de archivos .npy
+(guardar) y cargarse con memoria mapeada (cargar): los workers de gunicorn
+comparten entonces las páginas de los árboles a través de la caché de
+páginas del sistema operativo en lugar de tener cada uno su copia.
+
+También se puede reducir (compactar: menos árboles, profundidad acotada,
+tipos de 32 bits o menos) y guardar en un único .npz comprimido
+(guardar_compacto / cargar_compacto).
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+TREE_LEAF = -1
+ARREGLOS = ("izquierdos", "derechos", "features", "umbrales", "valores", "raices")
+ARCHIVO_META = "meta.json"
+CLAVE_META = "meta"
+
+
+class BosqueCompilado:
+    """Bosque aleatorio en arreglos planos (todos los árboles concatenados)"""
+
+    def __init__(self, modelo):
+        if getattr(modelo, "n_outputs_", 1) != 1:
+            raise ValueError("Solo se soportan modelos de una salida")
+
+        self.classes_ = modelo.classes_
+        self.columnas = list(getattr(modelo, "feature_names_in_", []))
+        self.n_features = modelo.n_features_in_
+        self.n_arboles = len(modelo.estimators_)
+        self.origen = None
+
+        izquierdos, derechos, features, umbrales, valores, raices = [], [], [], [], [], []
+        desplazamiento = 0
+        profundidad = 0
+        for estimador in modelo.estimators_:
+            arbol = estimador.tree_
+            n = arbol.node_count
+            indices = np.arange(n) + desplazamiento
+            es_hoja = arbol.children_left == TREE_LEAF
+
+            # Las hojas apuntan a sí mismas: recorrer de más no cambia el resultado
+            izquierdos.append(np.where(es_hoja, indices, arbol.children_left + desplazamiento))
+            derechos.append(np.where(es_hoja, indices, arbol.children_right + desplazamiento))
+            features.append(np.where(es_hoja, 0, arbol.feature))
+            umbrales.append(arbol.threshold)
+
+            # Desde scikit-learn 1.4 tree_.value ya guarda las fracciones por clase
+            # que retorna DecisionTreeClassifier.predict_proba
+            valores.append(arbol.value[:, 0, :len(self.classes_)].astype(np.float64))
+
+            raices.append(desplazamiento)
+            desplazamiento += n
+            profundidad = max(profundidad, arbol.max_depth)
+
+        self.izquierdos = np.concatenate(izquierdos).astype(np.intp)
+        self.derechos = np.concatenate(derechos).astype(np.intp)
+        self.features = np.concatenate(features).astype(np.intp)
+        self.umbrales = np.concatenate(umbrales).astype(np.float64)
+        self.valores = np.concatenate(valores)
+        self.raices = np.array(raices, dtype=np.intp)
+        self.profundidad = profundidad
+
+    @classmethod
+    def desde_archivo(cls, ruta):
+        """Carga un modelo .pkl y lo compila"""
+        import joblib
+        return cls(joblib.load(ruta))
+
+    def guardar(self, directorio, origen=None):
+        """
+        Guarda los arreglos como .npy sin comprimir (mapeables) y los
+        metadatos en meta.json, que se escribe al final.
+        `origen` identifica el .pkl del que salió (ver origen_modelo).
+        """
+        os.makedirs(directorio, exist_ok=True)
+        for nombre in ARREGLOS:
+            np.save(os.path.join(directorio, f"{nombre}.npy"), np.ascontiguousarray(getattr(self, nombre)))
+
+        meta = self._meta(origen)
+        ruta_meta = os.path.join(directorio, ARCHIVO_META)
+        with open(ruta_meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(ruta_meta + ".tmp", ruta_meta)
+
+    @classmethod
+    def cargar(cls, directorio, mmap=True):
+        """Carga un bosque guardado con guardar(); con mmap los arreglos no se copian a memoria privada"""
+        with open(os.path.join(directorio, ARCHIVO_META), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        bosque = cls._desde_meta(meta)
+        for nombre in ARREGLOS:
+            setattr(bosque, nombre, np.load(
+                os.path.join(directorio, f"{nombre}.npy"),
+                mmap_mode="r" if mmap else None
+            ))
+        return bosque
+
+    def _meta(self, origen=None):
+        return {
+            "classes": self.classes_.tolist(),
+            "columnas": self.columnas,
+            "n_features": int(self.n_features),
+            "n_arboles": int(self.n_arboles),
+            "profundidad": int(self.profundidad),
+            "origen": origen
+        }
+
+    def compactar(self, max_arboles=None, max_profundidad=None):
+        """
+        Copia reducida del bosque: los primeros max_arboles árboles, cortados
+        a max_profundidad (un nodo cortado pasa a ser hoja con su propia
+        distribución de clases), solo con los nodos alcanzables y en tipos
+        compactos. Los umbrales se redondean hacia abajo a float32: para
+        entradas float32 `x <= umbral` da lo mismo que con el umbral float64.
+        """
+        n_arboles = min(max_arboles or self.n_arboles, self.n_arboles)
+        raices = np.asarray(self.raices[:n_arboles])
+
+        # Recorrido por niveles de todos los árboles a la vez
+        conservados, cortados = [], []
+        nivel, profundidad = raices, 0
+        while True:
+            conservados.append(nivel)
+            internos = nivel[np.asarray(self.izquierdos[nivel]) != nivel]
+            if internos.size == 0:
+                break
+            if max_profundidad is not None and profundidad >= max_profundidad:
+                cortados.append(internos)
+                break
+            nivel = np.concatenate([self.izquierdos[internos], self.derechos[internos]])
+            profundidad += 1
+        nodos = np.concatenate(conservados)
+        cortados = np.concatenate(cortados) if cortados else np.empty(0, dtype=np.intp)
+
+        nuevo_indice = np.full(len(self.izquierdos), -1, dtype=np.int64)
+        nuevo_indice[nodos] = np.arange(len(nodos))
+        izquierdos = nuevo_indice[np.asarray(self.izquierdos)[nodos]]
+        derechos = nuevo_indice[np.asarray(self.derechos)[nodos]]
+        if cortados.size:
+            posiciones = nuevo_indice[cortados]
+            izquierdos[posiciones] = posiciones
+            derechos[posiciones] = posiciones
+
+        umbrales = np.asarray(self.umbrales)[nodos]
+        umbrales32 = umbrales.astype(np.float32)
+        arriba = umbrales32.astype(np.float64) > umbrales
+        umbrales32[arriba] = np.nextafter(umbrales32[arriba], np.float32(-np.inf))
+
+        compacto = BosqueCompilado.__new__(BosqueCompilado)
+        compacto.classes_ = self.classes_
+        compacto.columnas = list(self.columnas)
+        compacto.n_features = self.n_features
+        compacto.n_arboles = n_arboles
+        compacto.profundidad = profundidad
+        compacto.origen = self.origen
+        compacto.izquierdos = izquierdos.astype(np.int32)
+        compacto.derechos = derechos.astype(np.int32)
+        compacto.features = np.asarray(self.features)[nodos].astype(np.uint8)
+        compacto.umbrales = umbrales32
+        compacto.valores = np.asarray(self.valores)[nodos].astype(np.float32)
+        compacto.raices = nuevo_indice[raices].astype(np.int32)
+        return compacto
+
+    def guardar_compacto(self, ruta, origen=None):
+        """Guarda arreglos y metadatos en un solo .npz comprimido (escritura atómica)"""
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with open(ruta + ".tmp", "wb") as f:
+            np.savez_compressed(
+                f,
+                **{nombre: getattr(self, nombre) for nombre in ARREGLOS},
+                **{CLAVE_META: np.array(json.dumps(self._meta(origen), ensure_ascii=False))}
+            )
+        os.replace(ruta + ".tmp", ruta)
+
+    @classmethod
+    def cargar_compacto(cls, ruta):
+        """Carga un bosque guardado con guardar_compacto()"""
+        with np.load(ruta) as datos:
+            bosque = cls._desde_meta(json.loads(str(datos[CLAVE_META])))
+            for nombre in ARREGLOS:
+                setattr(bosque, nombre, datos[nombre])
+        return bosque
+
+    @classmethod
+    def _desde_meta(cls, meta):
+        bosque = cls.__new__(cls)
+        bosque.classes_ = np.array(meta["classes"])
+        bosque.columnas = meta["columnas"]
+        bosque.n_features = meta["n_features"]
+        bosque.n_arboles = meta["n_arboles"]
+        bosque.profundidad = meta["profundidad"]
+        bosque.origen = meta.get("origen")
+        return bosque
+
+    def tamano_bytes(self):
+        """Memoria ocupada por los arreglos de nodos"""
+        return sum(getattr(self, nombre).nbytes for nombre in ARREGLOS)
+
+    def _preparar(self, X):
+        """Matriz (n, n_features) en float32, como la valida sklearn"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Se esperaban {self.n_features} características por fila, "
+                f"se recibió la forma {X.shape}"
+            )
+        return X
+
+    def hojas(self, X):
+        """Índice (global) de la hoja alcanzada por cada fila en cada árbol: (n, n_arboles)"""
+        X = self._preparar(X)
+        filas = np.arange(X.shape[0])[:, np.newaxis]
+        nodos = np.broadcast_to(self.raices, (X.shape[0], self.n_arboles)).copy()
+
+        # Todas las filas y árboles avanzan un nivel por iteración
+        for _ in range(self.profundidad):
+            valores = X[filas, self.features[nodos]].astype(np.float64)
+            nodos = np.where(
+                valores <= self.umbrales[nodos],
+                self.izquierdos[nodos],
+                self.derechos[nodos]
+            )
+        return nodos
+
+    def predict_proba(self, X):
+        """Probabilidad por clase, (n, n_clases), idéntica a sklearn"""
+        probas = self.valores[self.hojas(X)]
+        # cumsum suma árbol por árbol en orden, igual que el bosque de sklearn
+        total = np.cumsum(probas, axis=1, dtype=np.float64)[:, -1, :]
+        return total / self.n_arboles
+
+    def predict(self, X):
+        """Clase predicha por fila"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def origen_modelo(ruta_pkl):
+    """Identifica un .pkl por nombre y contenido (sha256)"""
+    with open(ruta_pkl, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {
+        "archivo": os.path.basename(ruta_pkl),
+        "sha256": digest
+    }
+
+
+def _leer_meta(ruta):
+    if ruta.endswith(".npz"):
+        with np.load(ruta) as datos:
+            return json.loads(str(datos[CLAVE_META]))
+    with open(os.path.join(ruta, ARCHIVO_META), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compilado_vigente(ruta, ruta_pkl):
+    """True si el compilado (directorio o .npz compacto) existe y corresponde al .pkl actual"""
+    try:
+        return _leer_meta(ruta).get("origen") == origen_modelo(ruta_pkl)
+    except (OSError, ValueError, KeyError):
+        return False
@@ -1,72 +1,156 @@
 # ml/optimize_model.py
+"""
+Reentrena los modelos con aumento de datos para los casos problemáticos.
+
+El aumento es vectorizado: las filas de cada caso se repiten con
+Index.repeat y se les suma una matriz de ruido uniforme generada con una
+semilla fija (resultados reproducibles). El multiplicador de cada clase es
+configurable y para exportaciones más grandes que la memoria el CSV se
+puede aumentar por bloques sin cargarlo completo.
+
+Uso (desde la raíz del proyecto):
+    python ml/optimize_model.py
+    python ml/optimize_model.py --multiplicador "Baja Producción=6" --semilla 7
+    python ml/optimize_model.py --solo-aumentar export.csv --salida aumentado.csv
+"""
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 import joblib
 
-def optimizar_modelo():
-    """Optimiza el modelo para los casos problemáticos identificados"""
-    
-    print("OPTIMIZANDO MODELO...")
-    
-    # Cargar dataset original
-    df = pd.read_csv("sensors.csv")
-    
-    # Preparación de datos (igual que antes)
+COLUMNAS = ["temperatura_celsius", "presion_biogas_kpa", "mq4_ppm", "dia_proceso"]
+
+# Casos problemáticos por clase (tipo_alerta): filas a aumentar, copias por
+# fila, ruido uniforme (mín, máx) por columna y valores mínimos tras el ruido
+CASOS_AUMENTO = {
+    # Caso 1: Temperaturas bajas que no se detectan (25°C)
+    "Temperatura Anormal": {
+        "filtro": lambda df: (df['temperatura_celsius'] < 26) & (df['alerta_ia'] == 1),
+        "multiplicador": 3,
+        "ruido": {
+            "temperatura_celsius": (-1, 1),
+            "presion_biogas_kpa": (-10, 10),
+            "mq4_ppm": (-50, 50),
+        },
+        "minimos": {},
+    },
+    # Caso 2: Baja producción confundida con temperatura
+    "Baja Producción": {
+        "filtro": lambda df: df['mq4_ppm'] < 2500,
+        "multiplicador": 4,
+        # Mantener CH4 bajo pero variar otros parámetros
+        "ruido": {
+            "mq4_ppm": (-100, 100),
+            "temperatura_celsius": (-2, 2),
+            "presion_biogas_kpa": (-20, 20),
+        },
+        "minimos": {"mq4_ppm": 800},
+    },
+}
+
+
+def preparar_datos(df):
+    """Normaliza las etiquetas: alerta_ia a 0/1 y tipo_alerta sin nulos"""
+    df = df.copy()
     df["alerta_ia"] = (
         df["alerta_ia"].astype(str).str.lower()
-        .map({"true": 1, "false": 0}).fillna(0).astype(int)
+        .map({"true": 1, "false": 0, "1": 1, "0": 0}).fillna(0).astype(int)
     )
     df["tipo_alerta"] = df["tipo_alerta"].fillna("Normal").astype(str)
+    return df
+
+
+def aumentar_datos(df, multiplicadores=None, rng=None):
+    """
+    Filas sintéticas para los casos problemáticos de un DataFrame ya
+    preparado. `multiplicadores` reemplaza las copias por fila de cada
+    clase (0 desactiva la clase). Retorna solo las filas nuevas.
+    """
+    multiplicadores = multiplicadores or {}
+    rng = rng if rng is not None else np.random.default_rng(42)
+
+    nuevas = []
+    for clase, caso in CASOS_AUMENTO.items():
+        copias = multiplicadores.get(clase, caso["multiplicador"])
+        base = df[(df["tipo_alerta"] == clase) & caso["filtro"](df)]
+        if copias <= 0 or base.empty:
+            continue
+
+        # Cada fila seguida de sus copias, como en el aumento original
+        filas = base.loc[base.index.repeat(copias)].reset_index(drop=True)
+        columnas = list(caso["ruido"])
+        bajos, altos = np.array(list(caso["ruido"].values()), dtype=float).T
+        ruido = rng.uniform(bajos, altos, size=(len(filas), len(columnas)))
+        filas[columnas] = filas[columnas].to_numpy(dtype=float) + ruido
+
+        for columna, minimo in caso["minimos"].items():
+            filas[columna] = filas[columna].clip(lower=minimo)
+        nuevas.append(filas)
+
+    if not nuevas:
+        return df.iloc[:0].copy()
+    return pd.concat(nuevas, ignore_index=True)
+
+
+def aumentar_por_bloques(bloques, multiplicadores=None, semilla=42):
+    """
+    Versión en streaming: por cada DataFrame de `bloques` (p. ej.
+    pd.read_csv(..., chunksize=n)) produce (bloque preparado, filas
+    sintéticas). La memoria depende del tamaño del bloque, no del archivo.
+    """
+    rng = np.random.default_rng(semilla)
+    for bloque in bloques:
+        bloque = preparar_datos(bloque)
+        yield bloque, aumentar_datos(bloque, multiplicadores, rng)
+
+
+def aumentar_csv(ruta_entrada, ruta_salida, multiplicadores=None, semilla=42, tamano_bloque=100_000):
+    """
+    Escribe en ruta_salida el CSV de entrada (preparado) más las filas
+    sintéticas, leyéndolo por bloques. Retorna (filas_originales, filas_nuevas).
+    """
+    originales = nuevas = 0
+    bloques = pd.read_csv(ruta_entrada, chunksize=tamano_bloque)
+    for i, (bloque, aumentadas) in enumerate(aumentar_por_bloques(bloques, multiplicadores, semilla)):
+        pd.concat([bloque, aumentadas], ignore_index=True).to_csv(
+            ruta_salida, mode="w" if i == 0 else "a", header=i == 0, index=False
+        )
+        originales += len(bloque)
+        nuevas += len(aumentadas)
+    return originales, nuevas
+
+
+def _parsear_multiplicadores(valores):
+    """["Baja Producción=6", ...] → {"Baja Producción": 6}"""
+    multiplicadores = {}
+    for valor in valores or []:
+        clase, _, copias = valor.rpartition("=")
+        if clase not in CASOS_AUMENTO:
+            raise ValueError(f"Clase desconocida '{clase}'. Opciones: {', '.join(CASOS_AUMENTO)}")
+        multiplicadores[clase] = int(copias)
+    return multiplicadores
+
+
+def optimizar_modelo(ruta_csv="sensors.csv", multiplicadores=None, semilla=42):
+    """Optimiza el modelo para los casos problemáticos identificados"""
     
-    print("📊 Aumentando datos para casos problemáticos...")
-    
-    # Caso 1: Temperaturas bajas que no se detectan (25°C)
-    temperaturas_bajas = df[
-        (df['temperatura_celsius'] < 26) & 
-        (df['alerta_ia'] == 1) &
-        (df['tipo_alerta'] == 'Temperatura Anormal')
-    ].copy()
-    
-    # Duplicar y variar ligeramente estos casos
-    nuevas_temperaturas_bajas = []
-    for _, row in temperaturas_bajas.iterrows():
-        for _ in range(3):  # Triplicar estos casos críticos
-            nueva_fila = row.copy()
-            # Variación pequeña en características
-            nueva_fila['temperatura_celsius'] += np.random.uniform(-1, 1)
-            nueva_fila['presion_biogas_kpa'] += np.random.uniform(-10, 10)
-            nueva_fila['mq4_ppm'] += np.random.uniform(-50, 50)
-            nuevas_temperaturas_bajas.append(nueva_fila)
-    
-    # Caso 2: Baja producción confundida con temperatura
-    bajas_produccion = df[
-        (df['tipo_alerta'] == 'Baja Producción') & 
-        (df['mq4_ppm'] < 2500)
-    ].copy()
+    print("OPTIMIZANDO MODELO...")
     
-    nuevas_bajas_produccion = []
-    for _, row in bajas_produccion.iterrows():
-        for _ in range(4):  # Cuadruplicar estos casos raros
-            nueva_fila = row.copy()
-            # Mantener CH4 bajo pero variar otros parámetros
-            nueva_fila['mq4_ppm'] = max(800, nueva_fila['mq4_ppm'] + np.random.uniform(-100, 100))
-            nueva_fila['temperatura_celsius'] += np.random.uniform(-2, 2)
-            nueva_fila['presion_biogas_kpa'] += np.random.uniform(-20, 20)
-            nuevas_bajas_produccion.append(nueva_fila)
+    # Cargar dataset original
+    df = preparar_datos(pd.read_csv(ruta_csv))
     
-    # Combinar dataset aumentado
+    print("📊 Aumentando datos para casos problemáticos...")
     df_aumentado = pd.concat([
         df,
-        pd.DataFrame(nuevas_temperaturas_bajas),
-        pd.DataFrame(nuevas_bajas_produccion)
+        aumentar_datos(df, multiplicadores, np.random.default_rng(semilla))
     ], ignore_index=True)
     
     print(f"Dataset original: {len(df)} registros")
     print(f"Dataset aumentado: {len(df_aumentado)} registros")
     
-    X = df_aumentado[["temperatura_celsius", "presion_biogas_kpa", "mq4_ppm", "dia_proceso"]]
+    X = df_aumentado[COLUMNAS]
     y_alerta = df_aumentado["alerta_ia"]
     y_tipo = df_aumentado["tipo_alerta"]
     
@@ -128,4 +212,25 @@ def optimizar_modelo():
     return modelo_alerta_opt, modelo_tipo_opt, df_aumentado
 
 if __name__ == "__main__":
-    optimizar_modelo()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reentrena los modelos con aumento de datos")
+    parser.add_argument("--csv", default="sensors.csv", help="Dataset de entrenamiento")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--multiplicador", action="append", metavar="CLASE=N",
+                        help="Copias por fila de una clase (repetible)")
+    parser.add_argument("--solo-aumentar", metavar="CSV",
+                        help="Solo aumentar este CSV por bloques y escribirlo en --salida")
+    parser.add_argument("--salida", default="dataset_aumentado.csv")
+    parser.add_argument("--tamano-bloque", type=int, default=100_000)
+    args = parser.parse_args()
+
+    try:
+        multiplicadores = _parsear_multiplicadores(args.multiplicador)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.solo_aumentar:
+        originales, nuevas = aumentar_csv(
+            args.solo_aumentar, args.salida, multiplicadores, args.semilla, args.tamano_bloque
+        )
+        print(f"✅ {originales} registros + {nuevas} sintéticos → {args.salida}")
+    else:
+        optimizar_modelo(args.csv, multiplicadores, args.semilla)
\ No newline at end of file
@@ -48,25 +48,11 @@ def test_modelo_optimizado():
     y_alerta_real = df["alerta_ia"]
     y_tipo_real = df["tipo_alerta"]
     
-    # Predicciones con sistema optimizado
-    y_alerta_pred = []
-    y_tipo_pred = []
-    fuentes = []
-    
-    for i, (_, fila) in enumerate(X.iterrows()):
-        if i % 50 == 0:  # Progress bar
-            print(f"   Procesando... {i}/{len(X)}")
-        
-        resultado = sistema.predecir_con_ensemble([
-            fila['temperatura_celsius'],
-            fila['presion_biogas_kpa'], 
-            fila['mq4_ppm'],
-            fila['dia_proceso']
-        ])
-        
-        y_alerta_pred.append(resultado['alerta'])
-        y_tipo_pred.append(resultado['tipo_alerta'])
-        fuentes.append(resultado['fuente'])
+    # Predicciones con sistema optimizado (una pasada sobre todo el dataset)
+    resultados = sistema.predecir_lote(X)
+    y_alerta_pred = resultados['alerta']
+    y_tipo_pred = resultados['tipo_alerta']
+    fuentes = resultados['fuente']
     
     # Métricas
     acc_alerta = accuracy_score(y_alerta_real, y_alerta_pred)
@@ -76,7 +62,7 @@ def test_modelo_optimizado():
     print(f"✅ Precisión Tipo Alerta: {acc_tipo:.3f} ({acc_tipo*100:.1f}%)")
     
     # Distribución de fuentes
-    fuentes_count = pd.Series(fuentes).value_counts()
+    fuentes_count = fuentes.value_counts()
     print(f"\n📍 Fuentes de predicción:")
     for fuente, count in fuentes_count.items():
         print(f"   {fuente}: {count} ({count/len(fuentes)*100:.1f}%)")
@@ -3,19 +3,44 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
+import argparse
 import os
+import sys
+
+# Uso (desde la raíz del proyecto):
+#   python ml/train_model.py                                      # entrena con sensors.csv → ml/
+#   python ml/train_model.py --desde-bd --etiquetar-reglas        # + filas de la BD → ml/candidatos_bd/
+#   python ml/train_model.py --desde-bd --etiquetar-reglas --proceso-id 3 --ventana 120
+#
+# Las lecturas de la BD no tienen etiquetas: con --etiquetar-reglas se etiquetan
+# con las reglas de negocio del ensemble, y los modelos aprenden esas reglas.
+# Por eso, con --desde-bd los modelos se guardan aparte y no reemplazan a los
+# que sirve la app; para servirlos se copian a ml/ después de revisarlos.
+parser = argparse.ArgumentParser(description="Entrena los modelos de alertas")
+parser.add_argument("--csv", default="sensors.csv", help="Dataset etiquetado")
+parser.add_argument("--desde-bd", action="store_true",
+                    help="Agregar filas extraídas de la tabla lecturas (ver ml/extractor_lecturas.py)")
+parser.add_argument("--etiquetar-reglas", action="store_true",
+                    help="Etiquetar las filas de la BD con las reglas de negocio (requerido con --desde-bd)")
+parser.add_argument("--proceso-id", type=int, action="append", help="Procesos a extraer (default: todos)")
+parser.add_argument("--ventana", type=int, default=60, help="Segundos por ventana de alineación")
+parser.add_argument("--salida", help="Directorio de los modelos (default: ml, o ml/candidatos_bd con --desde-bd)")
+parser.add_argument("--dataset-bd", help="CSV intermedio con las filas de la BD (default: <salida>/dataset_bd.csv)")
+args = parser.parse_args()
+
+if args.desde_bd and not args.etiquetar_reglas:
+    parser.error("las lecturas de la BD no tienen etiquetas; --desde-bd requiere --etiquetar-reglas")
 
 # --- Configuración de rutas para guardar modelos ---
-# Asegúrate de que el directorio 'ml' exista en el directorio raíz de tu proyecto
-if not os.path.exists("ml"):
-    os.makedirs("ml")
+salida = args.salida or (os.path.join("ml", "candidatos_bd") if args.desde_bd else "ml")
+os.makedirs(salida, exist_ok=True)
 
 # Cargar dataset
 # Pandas usará la primera fila como encabezado por defecto.
 try:
-    df = pd.read_csv("sensors.csv")
+    df = pd.read_csv(args.csv)
 except FileNotFoundError:
-    print("Error: No se encontró 'sensors.csv'. Por favor, verifica la ruta.")
+    print(f"Error: No se encontró '{args.csv}'. Por favor, verifica la ruta.")
     exit()
 
 # -----------------------------------------------------------
@@ -37,6 +62,28 @@ df["alerta_ia"] = (
 # 2. Asegurar que 'tipo_alerta' sea un string y rellenar nulos si los hay.
 df["tipo_alerta"] = df["tipo_alerta"].fillna("Normal").astype(str)
 
+# 3. Filas de la tabla lecturas: se vuelcan bloque a bloque a un CSV y se
+# leen solo las columnas del modelo, en float32
+if args.desde_bd:
+    # Al ejecutar el script ml/ queda en sys.path, y ml/utils.py taparía el
+    # paquete utils de la app (sin __init__.py)
+    directorio_ml = os.path.dirname(os.path.abspath(__file__))
+    sys.path = [os.path.dirname(directorio_ml)] + [p for p in sys.path if os.path.abspath(p) != directorio_ml]
+    from main import create_app
+    from ml.ensemble_system import COLUMNAS
+    from ml.extractor_lecturas import volcar_dataset, etiquetar_con_reglas, ETIQUETAS
+
+    ruta_bd = args.dataset_bd or os.path.join(salida, "dataset_bd.csv")
+    with create_app().app_context():
+        total = volcar_dataset(ruta_bd, args.proceso_id, args.ventana, etiquetador=etiquetar_con_reglas)
+    print(f"Filas extraídas de la BD: {total} → {ruta_bd}")
+    df_bd = pd.read_csv(
+        ruta_bd, usecols=[*COLUMNAS, *ETIQUETAS],
+        dtype={**{columna: "float32" for columna in COLUMNAS[:3]}, "tipo_alerta": str}
+    )
+    df = pd.concat([df, df_bd], ignore_index=True)
+    del df_bd
+
 # -----------------------------------------------------------
 # --- Definición de Features y Targets ---
 # -----------------------------------------------------------
@@ -82,6 +129,10 @@ print("Precisión tipo alerta:", accuracy_score(y_tipo_test, y_tipo_pred))
 print("\nReporte tipo de alerta:\n", classification_report(y_tipo_test, y_tipo_pred, zero_division=0))
 
 # Guardar modelos en el directorio 'ml'
-joblib.dump(modelo_alerta, "ml/modelo_alerta.pkl")
-joblib.dump(modelo_tipo, "ml/modelo_tipo_alerta.pkl")
-print("\n Modelos entrenados y guardados en el directorio 'ml/'")
\ No newline at end of file
+# Se escribe a un temporal y se reemplaza: los workers en ejecución recargan
+# los modelos al detectar el cambio y nunca leen un archivo a medio escribir
+for modelo, nombre in ((modelo_alerta, "modelo_alerta.pkl"), (modelo_tipo, "modelo_tipo_alerta.pkl")):
+    ruta = os.path.join(salida, nombre)
+    joblib.dump(modelo, ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+print(f"\n Modelos entrenados y guardados en el directorio '{salida}/'")
\ No newline at end of file
@@ -1,5 +1,15 @@
-from flask import Blueprint, jsonify
-from services.ai_service import predecir_alerta
+from flask import Blueprint, jsonify, request
+from services.ai_service import predecir_alerta, predecir_alertas_lote
+from services.prediccion_cache import cache_predicciones
+from services.modelos_ml import modelos_ml
+from services.inferencia_pool import pool_inferencia
+from services.prediccion_service import (
+    obtener_ultima_prediccion, programar_prediccion, resultado_prediccion,
+    prediccion_desactualizada, obtener_historial_predicciones
+)
+from exceptions.custom_exceptions import (
+    ValidationException, ResourceNotFoundException, DatabaseException
+)
 from database.db_service import obtener_ultima_lectura_combinada, hay_proceso_activo, LecturaException 
 
 ai_bp = Blueprint("ai_bp", __name__)
@@ -11,7 +21,8 @@ def analizar_biodigestor():
     Maneja:
       - Sin proceso
       - Sin lecturas
-      - Predicción exitosa
+      - Predicción guardada al registrar las lecturas
+      - Predicción en línea (lecturas sin predicción guardada)
       - Errores internos
     """
     try:
@@ -28,9 +39,19 @@ def analizar_biodigestor():
                 "tipo_estado": "Proceso finalizado"
             }), 200
 
+        # --- PREDICCIÓN CALCULADA EN LA ESCRITURA ---
+        prediccion = obtener_ultima_prediccion(proceso.id)
+        if prediccion is not None:
+            if prediccion_desactualizada(prediccion):
+                # Modelos recargados o evaluación omitida (pool saturado): se
+                # responde con la predicción guardada y la última lectura se
+                # vuelve a evaluar en el pool de inferencia
+                programar_prediccion(proceso.id, proceso.fecha_inicio)
+            return jsonify(resultado_prediccion(prediccion)), 200
+
         # --- PROCESO ACTIVO PERO SIN LECTURAS ---
         try:
-            lectura = obtener_ultima_lectura_combinada()
+            lectura = obtener_ultima_lectura_combinada(proceso.id)
         except LecturaException as le:
             return jsonify({
                 "alerta_ia": 0,
@@ -57,4 +78,85 @@ def analizar_biodigestor():
             "recomendacion": "Revise logs.",
             "tipo_estado": "Error",
             "detalle": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@ai_bp.post("/analizar/batch")
+def analizar_lote():
+    """
+    Predicción IA para un lote de lecturas, en el orden recibido.
+    Body JSON: {"lecturas": [{"temperatura", "presion", "gas", "timestamp"}
+                o [temperatura, presion, gas, timestamp], ...],
+                "proceso_id": int (opcional, default: el proceso activo)}
+    Responde 200 si todas se evaluaron, 207 si hubo rechazos parciales
+    y 422 si ninguna fue válida.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("lecturas") if isinstance(data, dict) else data
+    proceso_id = data.get("proceso_id") if isinstance(data, dict) else None
+
+    if proceso_id is not None and (not isinstance(proceso_id, int) or isinstance(proceso_id, bool)):
+        return jsonify({"error": "proceso_id debe ser entero"}), 400
+
+    try:
+        resultados = predecir_alertas_lote(items, proceso_id=proceso_id)
+    except (ValidationException, ResourceNotFoundException) as e:
+        return jsonify({"error": str(e)}), e.status_code
+
+    rechazadas = sum(1 for r in resultados if "error" in r)
+    evaluadas = len(resultados) - rechazadas
+
+    if rechazadas == 0:
+        status = 200
+    elif evaluadas == 0:
+        status = 422
+    else:
+        status = 207
+
+    return jsonify({
+        "total": len(resultados),
+        "evaluadas": evaluadas,
+        "rechazadas": rechazadas,
+        "resultados": resultados
+    }), status
+
+
+@ai_bp.get("/analizar/metricas")
+def metricas_analisis():
+    """Caché de predicciones, pool de inferencia y estado de los modelos"""
+    return jsonify({
+        "cache_predicciones": cache_predicciones.metricas(),
+        "pool_inferencia": pool_inferencia.metricas(),
+        "modelos": modelos_ml.resumen()
+    }), 200
+
+
+@ai_bp.get("/analizar/historial")
+def historial_analisis():
+    """
+    Predicciones guardadas de un proceso, más reciente primero.
+    Query params: proceso_id (default: el proceso activo), limit (default 100,
+    máx. 1000), solo_alertas=true para devolver solo las alertas.
+    """
+    proceso_id = request.args.get("proceso_id", type=int)
+    limite = request.args.get("limit", 100, type=int)
+    solo_alertas = request.args.get("solo_alertas", "false").lower() == "true"
+
+    if proceso_id is None:
+        proceso = hay_proceso_activo()
+        if proceso is None:
+            return jsonify({"error": "No hay proceso activo"}), 404
+        proceso_id = proceso.id
+
+    try:
+        predicciones = obtener_historial_predicciones(
+            proceso_id, limite=limite, solo_alertas=solo_alertas
+        )
+    except DatabaseException as e:
+        return jsonify({"error": str(e)}), e.status_code
+
+    return jsonify({
+        "proceso_id": proceso_id,
+        "total": len(predicciones),
+        "predicciones": [p.to_dict() for p in predicciones]
+    }), 200
@@ -1,9 +1,18 @@
 from flask import Blueprint, request, jsonify
 from services.lectura_service import (
-    registrar_lectura, obtener_lecturas,
-    obtener_lecturas_por_sensor, eliminar_lecturas_sensor
+    registrar_lectura, aceptar_lectura, registrar_lecturas_batch, obtener_lecturas,
+    obtener_lecturas_por_sensor, obtener_lecturas_cursor, contar_lecturas,
+    eliminar_lecturas_sensor, obtener_proceso_activo, obtener_serie_cruda
 )
-from exceptions.custom_exceptions import ValidationException
+from services.lectura_buffer import buffer_lecturas
+from services.rollup_service import obtener_serie
+from database.connection import db
+from database.models.proceso_biodigestor import ProcesoBiodigestor
+from utils.datetime_utils import parse_timestamp, to_naive_utc, now_utc
+from exceptions.custom_exceptions import (
+    ValidationException, ResourceNotFoundException, ServiceUnavailableException
+)
+from config.constants import MAX_PUNTOS_SERIE, MAX_PUNTOS_SERIE_CRUDA
 
 lectura_bp = Blueprint("lectura", __name__)
 
@@ -20,6 +29,26 @@ def create_lectura():
     if not sensor_id or valor is None:
         return jsonify({"error": "Faltan datos obligatorios"}), 400
 
+    # Modo write-behind: la lectura se escribe en el próximo vaciado del buffer
+    if buffer_lecturas.activo:
+        try:
+            fila, pendientes = aceptar_lectura(sensor_id, valor, observaciones)
+        except ServiceUnavailableException as e:
+            # Buffer lleno: el dispositivo reintenta tras el próximo vaciado
+            return jsonify({"error": str(e)}), e.status_code, {"Retry-After": str(e.retry_after)}
+        except (ValidationException, ResourceNotFoundException) as e:
+            return jsonify({"error": str(e)}), e.status_code
+
+        return jsonify({
+            "message": "Lectura aceptada",
+            "estado": "aceptada",
+            "sensor_id": fila["sensor_id"],
+            "valor": fila["valor"],
+            "fecha_hora": fila["fecha_hora"].isoformat(),
+            "observaciones": fila["observaciones"],
+            "pendientes": pendientes
+        }), 202
+
     try:
         lectura = registrar_lectura(sensor_id, valor, observaciones)
     except ValidationException as e:
@@ -35,41 +64,112 @@ def create_lectura():
     }), 201
 
 
+@lectura_bp.post("/lecturas/batch")
+def create_lecturas_batch():
+    """
+    Registra un lote de lecturas en una sola transacción.
+    Body JSON: {"lecturas": [{"sensor_id": int, "valor": float,
+                "fecha_hora": str (opcional), "observaciones": str (opcional)}]}
+    Responde 201 si todas se registraron, 207 si hubo rechazos parciales
+    y 422 si ninguna fue válida.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("lecturas") if isinstance(data, dict) else data
+
+    try:
+        resultados = registrar_lecturas_batch(items)
+    except ValidationException as e:
+        return jsonify({"error": str(e)}), e.status_code
+
+    registradas = sum(1 for r in resultados if r["estado"] == "registrada")
+    rechazadas = len(resultados) - registradas
+
+    if rechazadas == 0:
+        status_code = 201
+    elif registradas == 0:
+        status_code = 422
+    else:
+        status_code = 207
+
+    return jsonify({
+        "message": f"{registradas} lecturas registradas, {rechazadas} rechazadas",
+        "registradas": registradas,
+        "rechazadas": rechazadas,
+        "resultados": resultados
+    }), status_code
+
+
+def _serializar_lectura(l):
+    return {
+        "id": l.id,
+        "sensor_id": l.sensor_id,
+        "valor": l.valor,
+        "fecha_hora": l.fecha_hora.isoformat(),
+        "observaciones": l.observaciones
+    }
+
+
 @lectura_bp.get("/lecturas")
 def get_lecturas():
     """
     Agregada paginación para evitar memory overflow
-    Query params: ?page=1&per_page=50
+    Query params:
+      ?page=1&per_page=50          paginación por página (OFFSET)
+      ?after=<fecha_hora,id>       paginación por cursor (vacío = primera página)
+      ?count=exacto|aproximado|ninguno
+            total a calcular (default: exacto por página, ninguno por cursor)
     """
     try:
-        page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
         
         # Limitar máximo de registros por página
-        per_page = min(per_page, 100)
+        per_page = max(1, min(per_page, 100))
+
+        modo_cursor = 'after' in request.args
+        conteo = request.args.get('count', 'ninguno' if modo_cursor else 'exacto')
+        if conteo not in ('exacto', 'aproximado', 'ninguno'):
+            return jsonify({"error": "count debe ser exacto, aproximado o ninguno"}), 400
+
+        if modo_cursor:
+            lecturas, siguiente_cursor, total, es_aproximado = obtener_lecturas_cursor(
+                after=request.args.get('after'), per_page=per_page, conteo=conteo
+            )
+            return jsonify({
+                "lecturas": [_serializar_lectura(l) for l in lecturas],
+                "next_cursor": siguiente_cursor,
+                "total": total,
+                "total_aproximado": es_aproximado,
+                "per_page": per_page
+            }), 200
+
+        page = request.args.get('page', 1, type=int)
         
         # Obtener lecturas paginadas
         from database.models.lectura import Lectura
         from sqlalchemy import desc
         
         pagination = Lectura.query.order_by(desc(Lectura.fecha_hora))\
-            .paginate(page=page, per_page=per_page, error_out=False)
+            .paginate(page=page, per_page=per_page, error_out=False,
+                      count=(conteo == 'exacto'))
+
+        total = pagination.total
+        es_aproximado = False
+        if conteo != 'exacto':
+            total, es_aproximado = contar_lecturas(conteo)
+        pages = -(-total // per_page) if total is not None else None
         
         result = {
-            "lecturas": [{
-                "id": l.id,
-                "sensor_id": l.sensor_id,
-                "valor": l.valor,
-                "fecha_hora": l.fecha_hora.isoformat(),
-                "observaciones": l.observaciones
-            } for l in pagination.items],
-            "total": pagination.total,
-            "pages": pagination.pages,
+            "lecturas": [_serializar_lectura(l) for l in pagination.items],
+            "total": total,
+            "total_aproximado": es_aproximado,
+            "pages": pages,
             "current_page": page,
             "per_page": per_page
         }
         
         return jsonify(result), 200
+    except ValidationException as e:
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
         return jsonify({"error": f"Error al obtener lecturas: {e}"}), 500
 
@@ -90,12 +190,83 @@ def get_lecturas_por_sensor_endpoint(sensor_id):
             return jsonify([]), 200 
         
         result = [{
-            "id": l.id,
-            "sensor_id": l.sensor_id,
-            "valor": l.valor,
-            "fecha_hora": l.fecha_hora.isoformat(),
-            "observaciones": l.observaciones
+            "id": l["id"],
+            "sensor_id": l["sensor_id"],
+            "valor": l["valor"],
+            "fecha_hora": l["fecha_hora"].isoformat(),
+            "observaciones": l["observaciones"]
         } for l in lecturas]
         return jsonify(result), 200
     except Exception as e:
-        return jsonify({"error": f"Error al obtener lecturas del sensor {sensor_id}: {e}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Error al obtener lecturas del sensor {sensor_id}: {e}"}), 500
+
+
+@lectura_bp.get("/lecturas/<int:sensor_id>/serie")
+def get_serie_sensor(sensor_id):
+    """
+    Serie histórica agregada de un sensor desde los rollups.
+    Query params:
+      ?desde=&hasta=    rango (default: inicio del proceso hasta ahora)
+      ?bucket=1m|1h|1d  resolución (default: la más gruesa con al menos MIN_PUNTOS_SERIE
+                        puntos sin exceder MAX_PUNTOS_SERIE)
+      ?bucket=raw       lecturas crudas reducidas con LTTB/promedio según la gráfica
+                        (400 si el rango supera MAX_LECTURAS_SERIE_CRUDA lecturas)
+      ?max_puntos=      máximo de puntos en modo raw (default: 500, máx: 5000)
+      ?proceso_id=      proceso a consultar (default: el activo)
+    """
+    try:
+        proceso_id = request.args.get('proceso_id', type=int)
+        if proceso_id is not None:
+            proceso = db.session.get(ProcesoBiodigestor, proceso_id)
+            if not proceso:
+                return jsonify({"error": f"Proceso con ID {proceso_id} no encontrado"}), 404
+        else:
+            proceso = obtener_proceso_activo()
+            if not proceso:
+                return jsonify({"sensor_id": sensor_id, "puntos": []}), 200
+
+        try:
+            desde = request.args.get('desde')
+            hasta = request.args.get('hasta')
+            desde = to_naive_utc(parse_timestamp(desde)) if desde else proceso.fecha_inicio
+            hasta = to_naive_utc(parse_timestamp(hasta)) if hasta else (
+                proceso.fecha_fin or to_naive_utc(now_utc())
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        bucket = request.args.get('bucket')
+        if bucket == 'raw':
+            max_puntos = request.args.get('max_puntos', MAX_PUNTOS_SERIE, type=int)
+            max_puntos = max(3, min(max_puntos, MAX_PUNTOS_SERIE_CRUDA))
+            puntos, metodo, total = obtener_serie_cruda(
+                sensor_id, proceso.id, desde, hasta, max_puntos=max_puntos
+            )
+            return jsonify({
+                "sensor_id": sensor_id,
+                "proceso_id": proceso.id,
+                "bucket": "raw",
+                "desde": desde.isoformat(),
+                "hasta": hasta.isoformat(),
+                "downsampling": metodo,
+                "total_lecturas": total,
+                "puntos": puntos
+            }), 200
+
+        bucket, puntos = obtener_serie(
+            sensor_id, proceso.id, desde, hasta,
+            bucket=None if bucket in (None, '', 'auto') else bucket
+        )
+
+        return jsonify({
+            "sensor_id": sensor_id,
+            "proceso_id": proceso.id,
+            "bucket": bucket,
+            "desde": desde.isoformat(),
+            "hasta": hasta.isoformat(),
+            "puntos": [p.to_dict() for p in puntos]
+        }), 200
+    except ValidationException as e:
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        return jsonify({"error": f"Error al obtener serie del sensor {sensor_id}: {e}"}), 500
@@ -1,10 +1,12 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from services.proceso_service import (
     iniciar_proceso,
     finalizar_proceso,
     hay_proceso_activo,
     proceso_to_dict
 )
+from services.lectura_service import exportar_lecturas_proceso
+from exceptions.custom_exceptions import ValidationException, ResourceNotFoundException
 
 proceso_bp = Blueprint("proceso_bp", __name__)
 
@@ -45,3 +47,23 @@ def verificar_estado_proceso_route():
             "error": "Error interno del servidor al verificar el estado.",
             "detalle": str(e)
         }), 500
+
+# Exporta todas las lecturas de un proceso (streaming, memoria constante)
+@proceso_bp.get("/proceso/<int:proceso_id>/lecturas/export")
+def exportar_lecturas(proceso_id):
+    formato = request.args.get("format", "ndjson")
+    try:
+        contenido = exportar_lecturas_proceso(proceso_id, formato)
+    except (ValidationException, ResourceNotFoundException) as e:
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        return jsonify({"error": "Error interno del servidor", "detalle": str(e)}), 500
+
+    mimetype = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(contenido),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=proceso_{proceso_id}_lecturas.{formato}"
+        }
+    )
@@ -1,22 +1,14 @@
-import os
-import joblib
-import pandas as pd
+import numpy as np
 from datetime import datetime
 from ml.utils import obtener_recomendacion
-from database.db_service import obtener_fecha_inicio_proceso_activo
-
-# --- Rutas de Modelos ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ML_DIR = os.path.join(BASE_DIR, '..', 'ml')
-
-# --- Carga de modelos ---
-try:
-    modelo_alerta = joblib.load(os.path.join(ML_DIR, "modelo_alerta.pkl"))
-    modelo_tipo = joblib.load(os.path.join(ML_DIR, "modelo_tipo_alerta.pkl"))
-except FileNotFoundError:
-    print("FATAL ERROR: No se pudieron cargar los modelos de IA. Ejecute el script de entrenamiento.")
-    modelo_alerta = None
-    modelo_tipo = None
+from services.modelos_ml import modelos_ml
+from services.prediccion_cache import cache_predicciones
+from services.inferencia_pool import pool_inferencia, InferenciaPendiente
+from database.db_service import (
+    obtener_fecha_inicio_proceso_activo, obtener_fecha_inicio_proceso
+)
+from exceptions.custom_exceptions import ValidationException
+from config.constants import MAX_PREDICCIONES_BATCH, RESOLUCION_SENSORES
 
 
 def calcular_dia_proceso(timestamp_str):
@@ -29,42 +21,122 @@ def calcular_dia_proceso(timestamp_str):
     if fecha_inicio is None:
         return 0
 
-    formatos_admitidos = (
-        "%Y-%m-%d %H:%M:%S.%f", 
-        "%Y-%m-%d %H:%M:%S", 
-        "%d/%m/%Y %H:%M"
-    )
+    return dia_desde_inicio(timestamp_str, fecha_inicio)
+
+
+FORMATOS_TIMESTAMP = (
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M"
+)
+
 
-    for fmt in formatos_admitidos:
+def leer_timestamp(timestamp_str):
+    """datetime del timestamp en alguno de FORMATOS_TIMESTAMP; ValueError si no se reconoce"""
+    for fmt in FORMATOS_TIMESTAMP:
         try:
-            timestamp = datetime.strptime(timestamp_str, fmt)
-            break
+            return datetime.strptime(timestamp_str, fmt)
         except ValueError:
             continue
-    else:
+    raise ValueError(
+        f"timestamp con formato no reconocido: '{timestamp_str}' "
+        "(use AAAA-MM-DD HH:MM:SS o DD/MM/AAAA HH:MM)"
+    )
+
+
+def dia_desde_inicio(timestamp_str, fecha_inicio):
+    """Día del proceso (desde 1) del timestamp; 1 si el formato no se reconoce"""
+    try:
+        timestamp = leer_timestamp(timestamp_str)
+    except ValueError:
         return 1
 
     delta = timestamp.date() - fecha_inicio.date()
     return delta.days + 1
 
 
+def cuantizar(valor, resolucion):
+    """Redondea un valor a la resolución del sensor"""
+    return round(round(valor / resolucion) * resolucion, 6)
+
+
+def predecir_entradas(motores, temperatura, presion, gas, dia_proceso):
+    """
+    (alerta, tipo) de los modelos para entradas ya cuantizadas, pasando
+    por la caché de predicciones.
+    """
+    clave = (temperatura, presion, gas, dia_proceso)
+    resultado = cache_predicciones.obtener(motores.version, clave)
+    if resultado is not None:
+        return resultado
+
+    # --- Entrada en el orden de entrenamiento ---
+    # (temperatura_celsius, presion_biogas_kpa, mq4_ppm, dia_proceso)
+    entrada = np.array([clave], dtype=np.float64)
+    resultado = (
+        int(motores.alerta.predict(entrada)[0]),
+        str(motores.tipo.predict(entrada)[0])
+    )
+    cache_predicciones.guardar(motores.version, clave, resultado)
+    return resultado
+
+
+def predecir_lectura(motores, temperatura, presion, gas, dia_proceso):
+    """
+    (alerta, tipo) para una lectura combinada. Las entradas se redondean a la
+    resolución de cada sensor: lecturas equivalentes comparten la misma
+    entrada en la caché.
+    """
+    return predecir_entradas(
+        motores,
+        cuantizar(temperatura, RESOLUCION_SENSORES["temperatura"]),
+        cuantizar(presion, RESOLUCION_SENSORES["presion"]),
+        cuantizar(gas, RESOLUCION_SENSORES["gas"]),
+        dia_proceso
+    )
+
+
+def construir_resultado(alerta_pred, tipo_pred, temperatura, presion, gas, dia_proceso,
+                        version_modelo=None):
+    """Respuesta estándar de /api/analizar a partir de la predicción"""
+    recomendacion_data = obtener_recomendacion(
+        estado=alerta_pred,
+        temperatura=temperatura,
+        presion=presion,
+        gas=gas
+    )
+
+    return {
+        "alerta_ia": alerta_pred,
+        "tipo_alerta_modelo": tipo_pred,
+        "tipo_estado": recomendacion_data.get("tipo", ""),
+        "mensaje_lectura": recomendacion_data.get("mensaje", ""),
+        "recomendacion": recomendacion_data.get("recomendacion", ""),
+        "dia_proceso": dia_proceso,
+        "version_modelo": version_modelo
+    }
+
+
+def _inferir(temperatura, presion, gas, dia_proceso):
+    """
+    Carga (si hace falta) y evalúa los modelos; se ejecuta en el pool de
+    inferencia. Retorna (alerta, tipo, version) o None sin modelos.
+    """
+    motores = modelos_ml.obtener()
+    if motores is None:
+        return None
+    return (*predecir_lectura(motores, temperatura, presion, gas, dia_proceso), motores.version)
+
+
 def predecir_alerta(temperatura, presion, gas, timestamp):
     """
     Realiza predicción IA.
     Maneja errores comunes y modelos no cargados.
+    Los modelos se evalúan en el pool de inferencia: si está saturado o no
+    responde a tiempo se retorna una predicción pendiente.
     Retorna un dict estandarizado.
     """
     try:
-        # --- SI NO HAY MODELOS CARGADOS ---
-        if modelo_alerta is None or modelo_tipo is None:
-            return {
-                "alerta_ia": 0,
-                "tipo_estado": "Error de Sistema",
-                "mensaje_lectura": "Modelos de IA no cargados.",
-                "recomendacion": "Ejecute el script de entrenamiento.",
-                "dia_proceso": 0
-            }
-
         dia_proceso = calcular_dia_proceso(timestamp)
 
         if dia_proceso == 0:
@@ -76,32 +148,33 @@ def predecir_alerta(temperatura, presion, gas, timestamp):
                 "dia_proceso": 0
             }
 
-        # --- Construcción del DataFrame ---
-        entrada = pd.DataFrame([{
-            "temperatura_celsius": temperatura,
-            "presion_biogas_kpa": presion,
-            "mq4_ppm": gas,
-            "dia_proceso": dia_proceso
-        }])
-
-        alerta_pred = int(modelo_alerta.predict(entrada)[0])
-        tipo_pred = str(modelo_tipo.predict(entrada)[0])
-
-        recomendacion_data = obtener_recomendacion(
-            estado=alerta_pred,
-            temperatura=temperatura,
-            presion=presion,
-            gas=gas
-        )
+        try:
+            prediccion = pool_inferencia.ejecutar(_inferir, temperatura, presion, gas, dia_proceso)
+        except InferenciaPendiente as e:
+            return {
+                "alerta_ia": 0,
+                "tipo_estado": "Predicción pendiente",
+                "mensaje_lectura": "El motor de IA está ocupado; la predicción no estuvo lista a tiempo.",
+                "recomendacion": "Vuelva a consultar en unos segundos.",
+                "dia_proceso": dia_proceso,
+                "prediccion_pendiente": True,
+                "motivo": e.motivo
+            }
 
-        return {
-            "alerta_ia": alerta_pred,
-            "tipo_alerta_modelo": tipo_pred,
-            "tipo_estado": recomendacion_data.get("tipo", ""),
-            "mensaje_lectura": recomendacion_data.get("mensaje", ""),
-            "recomendacion": recomendacion_data.get("recomendacion", ""),
-            "dia_proceso": dia_proceso
-        }
+        # --- SI NO HAY MODELOS CARGADOS ---
+        if prediccion is None:
+            return {
+                "alerta_ia": 0,
+                "tipo_estado": "Error de Sistema",
+                "mensaje_lectura": "Modelos de IA no cargados.",
+                "recomendacion": "Ejecute el script de entrenamiento.",
+                "dia_proceso": 0
+            }
+
+        alerta_pred, tipo_pred, version = prediccion
+        return construir_resultado(
+            alerta_pred, tipo_pred, temperatura, presion, gas, dia_proceso, version_modelo=version
+        )
 
     except Exception as e:
         return {
@@ -112,3 +185,95 @@ def predecir_alerta(temperatura, presion, gas, timestamp):
             "dia_proceso": 0,
             "detalle_error": str(e)
         }
+
+
+def _validar_item_prediccion(item):
+    """
+    Convierte un elemento del lote en (temperatura, presion, gas, timestamp),
+    con el timestamp como datetime. Acepta un objeto con esas claves o una
+    lista de 4 valores. Lanza ValueError con el motivo del rechazo (también
+    si el formato del timestamp no se reconoce: no se adivina el día).
+    """
+    if isinstance(item, dict):
+        valores = [item.get(c) for c in ("temperatura", "presion", "gas", "timestamp")]
+    elif isinstance(item, (list, tuple)) and len(item) == 4:
+        valores = list(item)
+    else:
+        raise ValueError("Cada elemento debe ser un objeto o una lista [temperatura, presion, gas, timestamp]")
+
+    *medidas, timestamp = valores
+    try:
+        if any(v is None or isinstance(v, bool) for v in medidas):
+            raise TypeError
+        temperatura, presion, gas = (float(v) for v in medidas)
+    except (ValueError, TypeError):
+        raise ValueError("temperatura, presion y gas deben ser números válidos")
+
+    if not isinstance(timestamp, str) or not timestamp.strip():
+        raise ValueError("timestamp es obligatorio y debe ser texto")
+
+    return temperatura, presion, gas, leer_timestamp(timestamp.strip())
+
+
+def predecir_alertas_lote(items, proceso_id=None):
+    """
+    Predicción IA para muchas lecturas a la vez (re-evaluación de históricos
+    y escenarios hipotéticos). El día de proceso se calcula con una sola
+    consulta de la fecha de inicio (del proceso indicado o del activo) y
+    ambos modelos se evalúan una vez sobre la matriz completa.
+    Retorna una lista en el orden de entrada con la predicción de cada
+    elemento o su error de validación.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValidationException("Se requiere una lista no vacía de lecturas", status_code=400)
+    if len(items) > MAX_PREDICCIONES_BATCH:
+        raise ValidationException(
+            f"El lote excede el máximo de {MAX_PREDICCIONES_BATCH} lecturas", status_code=400
+        )
+    motores = modelos_ml.obtener()
+    if motores is None:
+        raise ValidationException("Modelos de IA no cargados. Ejecute el script de entrenamiento.", status_code=503)
+
+    if proceso_id is not None:
+        fecha_inicio = obtener_fecha_inicio_proceso(proceso_id)
+    else:
+        fecha_inicio = obtener_fecha_inicio_proceso_activo()
+        if fecha_inicio is None:
+            raise ValidationException("No hay proceso activo", status_code=409)
+
+    resultados = [None] * len(items)
+    indices, validos, filas = [], [], []
+    for indice, item in enumerate(items):
+        try:
+            temperatura, presion, gas, timestamp = _validar_item_prediccion(item)
+        except ValueError as e:
+            resultados[indice] = {"indice": indice, "error": str(e)}
+            continue
+        indices.append(indice)
+        validos.append((temperatura, presion, gas, timestamp))
+        filas.append((
+            cuantizar(temperatura, RESOLUCION_SENSORES["temperatura"]),
+            cuantizar(presion, RESOLUCION_SENSORES["presion"]),
+            cuantizar(gas, RESOLUCION_SENSORES["gas"]),
+            (timestamp.date() - fecha_inicio.date()).days + 1
+        ))
+
+    if not filas:
+        return resultados
+
+    # Orden de entrenamiento: temperatura_celsius, presion_biogas_kpa, mq4_ppm, dia_proceso
+    entrada = np.array(filas, dtype=np.float64)
+    alertas = motores.alerta.predict(entrada)
+    tipos = motores.tipo.predict(entrada)
+
+    for indice, item, dia_proceso, alerta, tipo in zip(indices, validos, entrada[:, 3], alertas, tipos):
+        temperatura, presion, gas, _ = item
+        resultados[indice] = {
+            "indice": indice,
+            **construir_resultado(
+                int(alerta), str(tipo), temperatura, presion, gas, int(dia_proceso),
+                version_modelo=motores.version
+            )
+        }
+
+    return resultados
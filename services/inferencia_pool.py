@@ -0,0 +1,132 @@
+"""
+Pool acotado de hilos para la inferencia de los modelos de alertas.
+
+Con workers síncronos de gunicorn una predicción lenta (primera llamada
+mientras los modelos cargan, CPU contendida) bloquea al worker completo. La
+inferencia se ejecuta en un pool con un límite de trabajos pendientes y un
+tiempo máximo de espera: si el pool está saturado o la predicción no termina
+a tiempo, el request recibe una respuesta degradada en lugar de esperar.
+Variables de entorno:
+
+    ML_POOL_HILOS           hilos de inferencia por worker (default: 2; 0 ejecuta
+                            en el hilo del request, sin límite ni timeout)
+    ML_POOL_MAX_PENDIENTES  trabajos en cola o en ejecución admitidos (default: 8)
+    ML_TIMEOUT_INFERENCIA   segundos de espera por predicción (default: 2)
+"""
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturoTimeout
+
+logger = logging.getLogger(__name__)
+
+SATURADO = "saturado"
+TIMEOUT = "timeout"
+
+
+class InferenciaPendiente(Exception):
+    """La predicción no se obtuvo a tiempo (motivo: saturado o timeout)"""
+
+    def __init__(self, motivo):
+        super().__init__(f"Inferencia pendiente ({motivo})")
+        self.motivo = motivo
+
+
+class PoolInferencia:
+    """ThreadPoolExecutor con admisión acotada, timeout y métricas"""
+
+    def __init__(self, max_hilos=2, max_pendientes=8, timeout=2.0):
+        self.max_hilos = max_hilos
+        self.max_pendientes = max(max_pendientes, max_hilos)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.pendientes = 0
+        self.max_observado = 0
+        self.completadas = 0
+        self.rechazadas = 0
+        self.timeouts = 0
+
+    def _obtener_executor(self):
+        # Se ejecuta con el lock tomado. Los hilos no sobreviven a un fork
+        # (preload de gunicorn): cada proceso crea su propio executor.
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_hilos, thread_name_prefix="inferencia-ml"
+            )
+            self._pid = os.getpid()
+            self.pendientes = 0
+        return self._executor
+
+    def _correr(self, funcion, args):
+        # El lugar se libera antes de publicar el resultado
+        try:
+            return funcion(*args)
+        finally:
+            with self._lock:
+                self.pendientes -= 1
+                self.completadas += 1
+
+    def enviar(self, funcion, *args):
+        """
+        Encola funcion(*args) sin esperar el resultado y retorna su Future.
+        Lanza InferenciaPendiente(SATURADO) si el pool está lleno. Sin hilos
+        se ejecuta en línea y el Future ya está resuelto.
+        """
+        if self.max_hilos <= 0:
+            futuro = Future()
+            try:
+                futuro.set_result(funcion(*args))
+            except Exception as e:
+                futuro.set_exception(e)
+            return futuro
+
+        with self._lock:
+            if self.pendientes >= self.max_pendientes:
+                self.rechazadas += 1
+                raise InferenciaPendiente(SATURADO)
+            executor = self._obtener_executor()
+            self.pendientes += 1
+            self.max_observado = max(self.max_observado, self.pendientes)
+
+        return executor.submit(self._correr, funcion, args)
+
+    def ejecutar(self, funcion, *args):
+        """
+        Ejecuta funcion(*args) en el pool y retorna su resultado.
+        Lanza InferenciaPendiente si el pool está lleno o si el resultado no
+        llega en self.timeout segundos (el trabajo sigue y libera su lugar al
+        terminar). Las excepciones de funcion se propagan.
+        """
+        if self.max_hilos <= 0:
+            return funcion(*args)
+
+        futuro = self.enviar(funcion, *args)
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturoTimeout:
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"Inferencia sin respuesta tras {self.timeout}s")
+            raise InferenciaPendiente(TIMEOUT)
+
+    def metricas(self):
+        with self._lock:
+            return {
+                "hilos": self.max_hilos,
+                "max_pendientes": self.max_pendientes,
+                "timeout_segundos": self.timeout,
+                "pendientes": self.pendientes,
+                "max_observado": self.max_observado,
+                "completadas": self.completadas,
+                "rechazadas": self.rechazadas,
+                "timeouts": self.timeouts
+            }
+
+
+pool_inferencia = PoolInferencia(
+    max_hilos=int(os.environ.get("ML_POOL_HILOS", 2)),
+    max_pendientes=int(os.environ.get("ML_POOL_MAX_PENDIENTES", 8)),
+    timeout=float(os.environ.get("ML_TIMEOUT_INFERENCIA", 2))
+)
@@ -0,0 +1,178 @@
+"""
+Buffer de escritura diferida (write-behind) para lecturas.
+
+Acumula lecturas en memoria y las escribe en bloque con una inserción
+multi-fila cuando se alcanza el tamaño máximo o vence el intervalo de
+vaciado. Se configura por despliegue con variables de entorno:
+
+    LECTURAS_BUFFER_ACTIVO     true/false (default: false)
+    LECTURAS_BUFFER_MAX        lecturas que disparan el vaciado (default: 200)
+    LECTURAS_BUFFER_INTERVALO  segundos entre vaciados (default: 2)
+"""
+import atexit
+import logging
+import math
+import os
+import threading
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from database.connection import db
+from database.models.lectura import Lectura
+from database.lectura_cache import cache_lecturas
+from services.rollup_service import actualizar_rollups
+from services.prediccion_service import programar_prediccion
+from exceptions.custom_exceptions import ServiceUnavailableException
+from utils.entorno import env_bool
+
+logger = logging.getLogger(__name__)
+
+# Múltiplo de LECTURAS_BUFFER_MAX que se retiene si la BD no está disponible
+FACTOR_CAPACIDAD = 10
+
+
+class BufferLecturas:
+    """Acumula filas de Lectura y las vacía en bloque desde un hilo propio"""
+
+    def __init__(self, max_filas=200, intervalo=2.0):
+        self.activo = False
+        self.max_filas = max_filas
+        self.intervalo = intervalo
+        self._app = None
+        self._filas = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._atexit_registrado = False
+
+    def configurar(self, app, activo, max_filas, intervalo):
+        """Asocia la aplicación (para el app_context del hilo) y los umbrales"""
+        self._app = app
+        self.activo = activo
+        self.max_filas = max_filas
+        self.intervalo = intervalo
+        if activo:
+            if not self._atexit_registrado:
+                atexit.register(self.flush)
+                self._atexit_registrado = True
+            logger.info(
+                f"Buffer de lecturas activo: max={max_filas}, intervalo={intervalo}s"
+            )
+
+    @property
+    def pendientes(self):
+        with self._lock:
+            return len(self._filas)
+
+    def agregar(self, fila):
+        """
+        Encola una fila lista para insertar y retorna las lecturas pendientes.
+        Lanza ServiceUnavailableException (503) si el buffer está lleno (BD
+        caída): el dispositivo debe reintentar tras el próximo vaciado.
+        """
+        self._asegurar_hilo()
+
+        with self._lock:
+            if len(self._filas) >= self.max_filas * FACTOR_CAPACIDAD:
+                raise ServiceUnavailableException(
+                    "Buffer de lecturas lleno, reintente más tarde",
+                    retry_after=max(1, math.ceil(self.intervalo))
+                )
+            self._filas.append(fila)
+            pendientes = len(self._filas)
+
+        if pendientes >= self.max_filas:
+            self._despertar.set()
+        return pendientes
+
+    def flush(self):
+        """Escribe todas las lecturas pendientes. Retorna cuántas se guardaron."""
+        with self._flush_lock:
+            with self._lock:
+                filas, self._filas = self._filas, []
+
+            if not filas or self._app is None:
+                return 0
+
+            with self._app.app_context():
+                try:
+                    guardadas = self._insertar(filas)
+                    logger.info(f"Buffer vaciado: {guardadas} lecturas")
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error al vaciar buffer de lecturas: {e}", exc_info=True)
+                    with self._lock:
+                        self._filas = filas + self._filas
+                    return 0
+
+            self._invalidar_cache(filas)
+            for proceso_id in {f["proceso_id"] for f in filas}:
+                programar_prediccion(proceso_id, app=self._app)
+            return guardadas
+
+    def _insertar(self, filas):
+        try:
+            db.session.execute(insert(Lectura), filas)
+            actualizar_rollups(filas)
+            db.session.commit()
+            return len(filas)
+        except IntegrityError:
+            # Una fila inválida (p. ej. sensor inexistente) no debe bloquear el lote:
+            # se reintenta fila a fila con un SAVEPOINT por fila, descartando solo
+            # las que fallan. Todo va en una transacción: si otro error corta el
+            # reintento no queda nada escrito y el lote completo vuelve al buffer.
+            db.session.rollback()
+            logger.warning("Lote con filas inválidas, reintentando fila a fila")
+            guardadas = 0
+            try:
+                for fila in filas:
+                    try:
+                        with db.session.begin_nested():
+                            db.session.execute(insert(Lectura), [fila])
+                            actualizar_rollups([fila])
+                        guardadas += 1
+                    except IntegrityError as e:
+                        logger.error(f"Lectura descartada {fila}: {e.orig if hasattr(e, 'orig') else e}")
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            return guardadas
+
+    def _invalidar_cache(self, filas):
+        afectados = {}
+        for fila in filas:
+            afectados.setdefault(fila["proceso_id"], set()).add(fila["sensor_id"])
+        for proceso_id, sensor_ids in afectados.items():
+            cache_lecturas.invalidar_sensores(proceso_id, sensor_ids)
+
+    def _asegurar_hilo(self):
+        # Tras un fork (gunicorn --preload) el hilo del padre no existe en el hijo
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(
+                target=self._ciclo, name="buffer-lecturas", daemon=True
+            )
+            self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            self.flush()
+
+
+buffer_lecturas = BufferLecturas()
+
+
+def init_buffer(app):
+    """Configura el buffer de lecturas según variables de entorno"""
+    activo = env_bool("LECTURAS_BUFFER_ACTIVO")
+    max_filas = int(os.environ.get("LECTURAS_BUFFER_MAX", 200))
+    intervalo = float(os.environ.get("LECTURAS_BUFFER_INTERVALO", 2))
+    buffer_lecturas.configurar(app, activo, max_filas, intervalo)
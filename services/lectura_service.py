@@ -1,19 +1,53 @@
+import csv
+import io
+import json
 import logging
 from database.models.lectura import Lectura
 from database.models.proceso_biodigestor import ProcesoBiodigestor
+from database.models.sensor import Sensor
 from database.connection import db
+from database.lectura_cache import cache_lecturas
+from database.proceso_cache import cache_proceso
+from database.sensor_cache import cache_sensores
 from datetime import datetime, timezone
-from sqlalchemy import desc
-from sqlalchemy.orm import joinedload
+import numpy as np
+from sqlalchemy import and_, desc, func, insert, or_, select, text
 from sqlalchemy.exc import SQLAlchemyError
-from exceptions.custom_exceptions import ValidationException, DatabaseException
-from config.constants import DEFAULT_LECTURA_LIMIT
+from exceptions.custom_exceptions import (
+    ValidationException, DatabaseException, ResourceNotFoundException
+)
+from config.constants import (
+    DEFAULT_LECTURA_LIMIT, MAX_LECTURAS_BATCH, MAX_LECTURAS_POR_SENSOR,
+    MAX_PUNTOS_SERIE, MAX_LECTURAS_SERIE_CRUDA, DOWNSAMPLING_POR_GRAFICA
+)
+from utils.datetime_utils import parse_timestamp, to_naive_utc
+from services.lectura_buffer import buffer_lecturas
+from services.rollup_service import actualizar_rollups, elegir_bucket
+from services.prediccion_service import programar_prediccion
+from services.graph_service import obtener_config_por_sensor
+from utils.downsampling import lttb, promedio_por_bucket
 
 logger = logging.getLogger(__name__)
 
+FORMATOS_EXPORTACION = ("ndjson", "csv")
+COLUMNAS_EXPORTACION = ("id", "sensor_id", "sensor", "valor", "fecha_hora", "observaciones")
+TAMANO_LOTE_EXPORTACION = 1000
+
 def obtener_proceso_activo():
-    """Retorna el proceso activo o None"""
-    return ProcesoBiodigestor.query.filter_by(estado='ACTIVO').first()
+    """Retorna el proceso activo (ProcesoActivo en caché) o None"""
+    return cache_proceso.obtener()
+
+
+def _lectura_a_dict(lectura):
+    """Representación en memoria de una lectura (la que guarda la caché)"""
+    return {
+        "id": lectura.id,
+        "sensor_id": lectura.sensor_id,
+        "proceso_id": lectura.proceso_id,
+        "valor": lectura.valor,
+        "fecha_hora": lectura.fecha_hora,
+        "observaciones": lectura.observaciones
+    }
 
 
 def registrar_lectura(sensor_id, valor, observaciones=None):
@@ -38,15 +72,175 @@ def registrar_lectura(sensor_id, valor, observaciones=None):
     
     try:
         db.session.add(lectura)
+        actualizar_rollups([{
+            "proceso_id": proceso.id,
+            "sensor_id": sensor_id,
+            "valor": lectura.valor,
+            "fecha_hora": lectura.fecha_hora
+        }])
         db.session.commit()
         logger.info(f"Lectura registrada: ID={lectura.id}, Proceso={proceso.id}")
-        return lectura
-        
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error al registrar lectura: {e}", exc_info=True)
         raise DatabaseException(f"Error al registrar lectura: {str(e)}")
 
+    cache_lecturas.registrar(_lectura_a_dict(lectura))
+    programar_prediccion(proceso.id, proceso.fecha_inicio)
+    return lectura
+
+
+def aceptar_lectura(sensor_id, valor, observaciones=None):
+    """
+    Acepta una lectura en modo write-behind: valida el proceso activo, el
+    sensor y el valor, y la encola en el buffer, que la escribirá en el
+    próximo vaciado en bloque.
+    Retorna la fila encolada y el número de lecturas pendientes.
+    """
+    proceso = obtener_proceso_activo()
+    if not proceso:
+        logger.warning("Intento de registrar lectura sin proceso activo")
+        raise ValidationException(
+            "No hay proceso biodigestor activo. Inicie un proceso primero.",
+            status_code=409
+        )
+
+    # Un sensor inexistente se rechaza aquí: en el vaciado se descartaría en silencio
+    if not cache_sensores.existe(sensor_id):
+        raise ResourceNotFoundException(f"Sensor con ID {sensor_id} no encontrado")
+
+    try:
+        valor = float(valor)
+    except (ValueError, TypeError):
+        raise ValidationException("El valor debe ser un número válido")
+
+    fila = {
+        "sensor_id": sensor_id,
+        "valor": valor,
+        "proceso_id": proceso.id,
+        "observaciones": observaciones,
+        "fecha_hora": datetime.now(timezone.utc)
+    }
+    pendientes = buffer_lecturas.agregar(fila)
+    logger.debug(f"Lectura encolada - Sensor: {sensor_id}, pendientes: {pendientes}")
+    return fila, pendientes
+
+
+def _validar_item_batch(item, sensores_validos):
+    """
+    Valida un elemento del lote y lo convierte en fila para inserción.
+    Lanza ValueError con el motivo del rechazo.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Cada lectura debe ser un objeto JSON")
+
+    sensor_id = item.get("sensor_id")
+    if not isinstance(sensor_id, int) or isinstance(sensor_id, bool):
+        raise ValueError("sensor_id es obligatorio y debe ser entero")
+    if sensor_id not in sensores_validos:
+        raise ValueError(f"Sensor con ID {sensor_id} no encontrado")
+
+    valor = item.get("valor")
+    if valor is None or isinstance(valor, bool):
+        raise ValueError("El valor de la lectura no puede ser nulo")
+    try:
+        valor = float(valor)
+    except (ValueError, TypeError):
+        raise ValueError("El valor debe ser un número válido")
+
+    fecha_hora = item.get("fecha_hora")
+    if fecha_hora is None:
+        fecha_hora = datetime.now(timezone.utc)
+    elif isinstance(fecha_hora, str):
+        # Con zona ("Z", "+02:00") se convierte a UTC, como en routes/lectura_bp.py
+        fecha_hora = to_naive_utc(parse_timestamp(fecha_hora))
+    else:
+        raise ValueError("fecha_hora debe ser un texto con fecha válida")
+
+    observaciones = item.get("observaciones")
+    if observaciones is not None and len(str(observaciones)) > 255:
+        raise ValueError("observaciones no puede exceder 255 caracteres")
+
+    return {
+        "sensor_id": sensor_id,
+        "valor": valor,
+        "fecha_hora": fecha_hora,
+        "observaciones": observaciones
+    }
+
+
+def registrar_lecturas_batch(items):
+    """
+    Registra un lote de lecturas del proceso activo.
+    Resuelve el proceso una sola vez y escribe todas las filas válidas con
+    una inserción multi-fila y un único commit.
+    Retorna la lista de resultados por elemento, en el mismo orden recibido.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValidationException("Debe enviar una lista de lecturas no vacía")
+    if len(items) > MAX_LECTURAS_BATCH:
+        raise ValidationException(
+            f"El lote excede el máximo de {MAX_LECTURAS_BATCH} lecturas"
+        )
+
+    logger.info(f"Registrando lote de {len(items)} lecturas")
+
+    proceso = obtener_proceso_activo()
+    if not proceso:
+        logger.warning("Intento de registrar lote sin proceso activo")
+        raise ValidationException(
+            "No hay proceso biodigestor activo. Inicie un proceso primero.",
+            status_code=409
+        )
+
+    # Una sola consulta para validar todos los sensores del lote
+    ids_solicitados = {
+        item.get("sensor_id") for item in items
+        if isinstance(item, dict) and isinstance(item.get("sensor_id"), int)
+    }
+    sensores_validos = {
+        sensor_id for (sensor_id,) in
+        db.session.query(Sensor.id).filter(Sensor.id.in_(ids_solicitados)).all()
+    } if ids_solicitados else set()
+
+    resultados = []
+    filas = []
+    for indice, item in enumerate(items):
+        try:
+            fila = _validar_item_batch(item, sensores_validos)
+        except ValueError as e:
+            resultados.append({"indice": indice, "estado": "rechazada", "error": str(e)})
+            continue
+
+        fila["proceso_id"] = proceso.id
+        filas.append(fila)
+        resultados.append({
+            "indice": indice,
+            "estado": "registrada",
+            "sensor_id": fila["sensor_id"],
+            "valor": fila["valor"],
+            "fecha_hora": fila["fecha_hora"].isoformat()
+        })
+
+    if not filas:
+        logger.warning("Lote sin lecturas válidas")
+        return resultados
+
+    try:
+        db.session.execute(insert(Lectura), filas)
+        actualizar_rollups(filas)
+        db.session.commit()
+        logger.info(f"Lote registrado: {len(filas)} lecturas, Proceso={proceso.id}")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error al registrar lote de lecturas: {e}", exc_info=True)
+        raise DatabaseException(f"Error al registrar lote de lecturas: {str(e)}")
+
+    # Sin ids por fila: las entradas afectadas se recargan desde la BD
+    cache_lecturas.invalidar_sensores(proceso.id, {f["sensor_id"] for f in filas})
+    programar_prediccion(proceso.id, proceso.fecha_inicio)
+    return resultados
+
 
 def obtener_lecturas():
     """Retorna todas las lecturas ordenadas por fecha descendente"""
@@ -62,9 +256,92 @@ def obtener_lecturas():
         raise DatabaseException("Error al obtener las lecturas")
 
 
+def parsear_cursor(cursor):
+    """
+    Convierte un cursor "<fecha_hora ISO>,<id>" en (datetime naive UTC, id).
+    Lanza ValidationException si el formato no es válido.
+    """
+    try:
+        fecha_str, id_str = cursor.rsplit(",", 1)
+        fecha_hora = datetime.fromisoformat(fecha_str.strip())
+        lectura_id = int(id_str)
+    except (ValueError, AttributeError):
+        raise ValidationException(
+            "Cursor inválido. Formato esperado: <fecha_hora ISO>,<id>",
+            status_code=400
+        )
+
+    if fecha_hora.tzinfo is not None:
+        fecha_hora = fecha_hora.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha_hora, lectura_id
+
+
+def generar_cursor(lectura):
+    """Cursor que apunta justo después de la lectura dada"""
+    return f"{lectura.fecha_hora.isoformat()},{lectura.id}"
+
+
+def contar_lecturas(modo):
+    """
+    Cuenta las lecturas de la tabla según el modo:
+    'exacto' (COUNT(*)), 'aproximado' (estadísticas de la tabla en MySQL)
+    o 'ninguno'. Retorna (total, es_aproximado).
+    """
+    if modo == "ninguno":
+        return None, False
+
+    if modo == "aproximado" and db.engine.dialect.name == "mysql":
+        total = db.session.execute(text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :tabla"
+        ), {"tabla": Lectura.__tablename__}).scalar()
+        return int(total or 0), True
+
+    return db.session.query(func.count(Lectura.id)).scalar(), False
+
+
+def obtener_lecturas_cursor(after=None, per_page=50, conteo="ninguno"):
+    """
+    Página de lecturas ordenadas por (fecha_hora, id) descendente usando
+    paginación por cursor: busca directamente en el índice por fecha_hora,
+    con costo constante sin importar la profundidad.
+    Retorna (lecturas, siguiente_cursor, total, es_aproximado).
+    """
+    consulta = Lectura.query
+
+    if after:
+        fecha_hora, lectura_id = parsear_cursor(after)
+        consulta = consulta.filter(or_(
+            Lectura.fecha_hora < fecha_hora,
+            and_(Lectura.fecha_hora == fecha_hora, Lectura.id < lectura_id)
+        ))
+
+    try:
+        # Se pide una fila extra para saber si existe una página siguiente
+        lecturas = consulta\
+            .order_by(desc(Lectura.fecha_hora), desc(Lectura.id))\
+            .limit(per_page + 1)\
+            .all()
+
+        siguiente_cursor = None
+        if len(lecturas) > per_page:
+            lecturas = lecturas[:per_page]
+            siguiente_cursor = generar_cursor(lecturas[-1])
+
+        total, es_aproximado = contar_lecturas(conteo)
+        return lecturas, siguiente_cursor, total, es_aproximado
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error al obtener lecturas por cursor: {e}")
+        raise DatabaseException("Error al obtener las lecturas")
+
+
 def obtener_lecturas_por_sensor(sensor_id, limite=None):
     """
-    Obtiene lecturas del proceso activo con eager loading para evitar N+1
+    Obtiene las lecturas más recientes del sensor en el proceso activo.
+    Se sirven desde la caché en memoria; ante un fallo se leen de la BD
+    MAX_LECTURAS_POR_SENSOR filas para cubrir cualquier límite posterior.
+    Retorna una lista de dicts (ver _lectura_a_dict).
     """
     logger.info(f"Obteniendo lecturas del sensor {sensor_id}")
     
@@ -75,24 +352,170 @@ def obtener_lecturas_por_sensor(sensor_id, limite=None):
         return []
     
     limite = limite or DEFAULT_LECTURA_LIMIT
+
+    lecturas = cache_lecturas.obtener_recientes(proceso_activo.id, sensor_id, limite)
+    if lecturas is not None:
+        logger.debug(f"Lecturas del sensor {sensor_id} servidas desde caché")
+        return lecturas
     
     try:
-        # Usar joinedload para evitar N+1 queries
-        lecturas = Lectura.query\
-            .options(joinedload(Lectura.sensor))\
-            .filter_by(sensor_id=sensor_id, proceso_id=proceso_activo.id)\
-            .order_by(desc(Lectura.fecha_hora))\
-            .limit(limite)\
+        limite_consulta = max(limite, MAX_LECTURAS_POR_SENSOR)
+        lecturas = [
+            _lectura_a_dict(l) for l in Lectura.query
+            .filter_by(sensor_id=sensor_id, proceso_id=proceso_activo.id)
+            .order_by(desc(Lectura.fecha_hora), desc(Lectura.id))
+            .limit(limite_consulta)
             .all()
+        ]
         
+        cache_lecturas.guardar_recientes(
+            proceso_activo.id, sensor_id, lecturas, limite_consulta
+        )
         logger.info(f"Se obtuvieron {len(lecturas)} lecturas del sensor {sensor_id}")
-        return lecturas
+        return lecturas[:limite]
         
     except SQLAlchemyError as e:
         logger.error(f"Error al obtener lecturas: {e}")
         raise DatabaseException("Error al obtener lecturas del sensor")
 
 
+def metodo_downsampling(sensor_id):
+    """Método de reducción de puntos según la gráfica configurada del sensor"""
+    config = obtener_config_por_sensor(sensor_id)
+    if config is None:
+        return "lttb"
+    return DOWNSAMPLING_POR_GRAFICA.get(config.tipo_grafica, "lttb")
+
+
+def obtener_serie_cruda(sensor_id, proceso_id, desde, hasta, max_puntos=MAX_PUNTOS_SERIE,
+                        max_lecturas=MAX_LECTURAS_SERIE_CRUDA):
+    """
+    Serie de lecturas crudas de un sensor entre desde y hasta, reducida a
+    lo sumo a max_puntos con el método de su gráfica (LTTB o promedio).
+    Carga a lo sumo max_lecturas filas: si el rango tiene más lanza
+    ValidationException (400) sugiriendo el bucket de rollup adecuado.
+    Retorna (puntos, metodo, total_lecturas).
+    """
+    try:
+        filas = db.session.execute(
+            select(Lectura.fecha_hora, Lectura.valor)
+            .where(
+                Lectura.sensor_id == sensor_id,
+                Lectura.proceso_id == proceso_id,
+                Lectura.fecha_hora >= desde,
+                Lectura.fecha_hora <= hasta
+            )
+            .order_by(Lectura.fecha_hora, Lectura.id)
+            .limit(max_lecturas + 1)
+        ).all()
+    except SQLAlchemyError as e:
+        logger.error(f"Error al obtener serie cruda: {e}")
+        raise DatabaseException("Error al obtener la serie del sensor")
+
+    total = len(filas)
+    if total > max_lecturas:
+        raise ValidationException(
+            f"El rango tiene más de {max_lecturas} lecturas; acote desde/hasta o use "
+            f"bucket={elegir_bucket(desde, hasta)}",
+            status_code=400
+        )
+    if total <= max_puntos:
+        return [
+            {"fecha_hora": f.isoformat(), "valor": v} for f, v in filas
+        ], "ninguno", total
+
+    fechas = np.array([f for f, _ in filas], dtype="datetime64[us]")
+    valores = np.array([v for _, v in filas], dtype=float)
+    x = fechas.astype("int64").astype(float)
+
+    metodo = metodo_downsampling(sensor_id)
+    if metodo == "promedio":
+        x_red, y_red = promedio_por_bucket(x, valores, max_puntos)
+        fechas_red = np.datetime_as_string(x_red.astype("int64").astype("datetime64[us]"), unit="s")
+        puntos = [
+            {"fecha_hora": str(f), "valor": float(v)} for f, v in zip(fechas_red, y_red)
+        ]
+    else:
+        puntos = [
+            {"fecha_hora": filas[i][0].isoformat(), "valor": filas[i][1]}
+            for i in lttb(x, valores, max_puntos)
+        ]
+
+    logger.info(f"Serie del sensor {sensor_id} reducida de {total} a {len(puntos)} puntos ({metodo})")
+    return puntos, metodo, total
+
+
+def exportar_lecturas_proceso(proceso_id, formato="ndjson"):
+    """
+    Exporta todas las lecturas de un proceso en NDJSON o CSV.
+    Valida antes de empezar y retorna un generador de bloques de texto que
+    recorre las lecturas con un cursor del servidor, en lotes de
+    TAMANO_LOTE_EXPORTACION, sin cargar el proceso completo en memoria.
+    """
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValidationException(
+            f"Formato inválido. Valores válidos: {', '.join(FORMATOS_EXPORTACION)}",
+            status_code=400
+        )
+    if db.session.get(ProcesoBiodigestor, proceso_id) is None:
+        raise ResourceNotFoundException(f"Proceso {proceso_id} no encontrado")
+
+    consulta = (
+        select(
+            Lectura.id, Lectura.sensor_id, Sensor.nombre.label("sensor"),
+            Lectura.valor, Lectura.fecha_hora, Lectura.observaciones
+        )
+        .join(Sensor, Lectura.sensor_id == Sensor.id)
+        .where(Lectura.proceso_id == proceso_id)
+        .order_by(Lectura.fecha_hora, Lectura.id)
+        .execution_options(yield_per=TAMANO_LOTE_EXPORTACION)
+    )
+    return _generar_exportacion(consulta, proceso_id, formato)
+
+
+def _generar_exportacion(consulta, proceso_id, formato):
+    """Recorre la consulta y produce un bloque de texto por lote"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    if formato == "csv":
+        escritor.writerow(COLUMNAS_EXPORTACION)
+
+    exportadas = 0
+    try:
+        # Conexión propia: el cursor queda abierto mientras se envía la respuesta
+        with db.engine.connect() as conexion:
+            resultado = conexion.execution_options(stream_results=True).execute(consulta)
+            for lote in resultado.partitions(TAMANO_LOTE_EXPORTACION):
+                for fila in lote:
+                    fecha_hora = fila.fecha_hora.isoformat() if fila.fecha_hora else None
+                    if formato == "csv":
+                        escritor.writerow((
+                            fila.id, fila.sensor_id, fila.sensor, fila.valor,
+                            fecha_hora, fila.observaciones or ""
+                        ))
+                    else:
+                        buffer.write(json.dumps(
+                            dict(zip(COLUMNAS_EXPORTACION, (
+                                fila.id, fila.sensor_id, fila.sensor, fila.valor,
+                                fecha_hora, fila.observaciones
+                            ))),
+                            ensure_ascii=False
+                        ))
+                        buffer.write("\n")
+                exportadas += len(lote)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    except SQLAlchemyError as e:
+        # La respuesta ya empezó: solo se puede cortar el stream
+        logger.error(f"Error exportando lecturas del proceso {proceso_id}: {e}", exc_info=True)
+        raise
+
+    if buffer.tell():
+        yield buffer.getvalue()
+    logger.info(f"Exportadas {exportadas} lecturas del proceso {proceso_id} ({formato})")
+
+
 def eliminar_lecturas_sensor(sensor_id):
     """Elimina todas las lecturas asociadas a un sensor"""
     logger.info(f"Eliminando lecturas del sensor {sensor_id}")
@@ -100,6 +523,7 @@ def eliminar_lecturas_sensor(sensor_id):
     try:
         count = Lectura.query.filter_by(sensor_id=sensor_id).delete()
         db.session.commit()
+        cache_lecturas.invalidar()
         logger.info(f"Se eliminaron {count} lecturas del sensor {sensor_id}")
         return count
         
@@ -0,0 +1,301 @@
+"""
+Carga diferida de los modelos de alertas.
+
+Importar la aplicación no carga scikit-learn, pandas ni los modelos: /health
+responde de inmediato y los modelos se cargan en un hilo de precarga al
+crear la app (ML_PRECARGA=true, default) o en la primera predicción.
+Variables de entorno:
+
+    ML_MODO_CARGA  pkl: cada worker deserializa los .pkl con joblib (default)
+                   mmap: arreglos generados por `python -m ml.exportar_modelos`,
+                         mapeados en memoria y compartidos entre workers
+                   compacto: .npz comprimidos y reducidos generados por
+                         `python -m ml.exportar_modelos --compacto`
+    ML_PRECARGA    true/false (default: true)
+    GUNICORN_PRELOAD
+                   true: la app se crea en el master de gunicorn antes del fork;
+                         los modelos se cargan ahí mismo, de forma síncrona, para
+                         que los workers compartan sus páginas copy-on-write
+    ML_RECARGA_INTERVALO
+                   segundos entre revisiones de los .pkl (default: 30; 0 desactiva
+                   la recarga en caliente)
+
+Recarga en caliente: como mucho una vez por intervalo, obtener() compara la
+fecha de modificación y el tamaño de los .pkl con los de la carga vigente.
+Si cambiaron (p. ej. tras `python ml/train_model.py`), un hilo carga los
+modelos nuevos mientras se sigue respondiendo con los actuales y luego
+reemplaza la referencia de una sola vez. Cada request usa la instantánea
+Motores que obtuvo, así que los modelos anteriores se liberan cuando
+terminan los requests que aún los usan. Si la carga nueva falla, se
+conservan los modelos vigentes.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from ml.motor_inferencia import BosqueCompilado, compilado_vigente, origen_modelo
+from utils.entorno import env_bool
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ML_DIR = os.path.join(BASE_DIR, '..', 'ml')
+COMPILADOS_DIR = os.path.join(ML_DIR, 'compilados')
+
+PENDIENTE = "pendiente"
+CARGANDO = "cargando"
+LISTO = "listo"
+ERROR = "error"
+
+MODELOS = ("modelo_alerta", "modelo_tipo_alerta")
+
+# Modelos en uso y su versión (hash del contenido de los .pkl)
+Motores = namedtuple("Motores", ["alerta", "tipo", "version"])
+
+
+def cargar_motor(nombre, modo="pkl"):
+    """Carga un modelo como BosqueCompilado según el modo de carga"""
+    ruta_pkl = os.path.join(ML_DIR, f"{nombre}.pkl")
+    if modo == "mmap":
+        directorio = os.path.join(COMPILADOS_DIR, nombre)
+        if compilado_vigente(directorio, ruta_pkl):
+            return BosqueCompilado.cargar(directorio, mmap=True)
+        logger.warning(f"{nombre}: compilado ausente o desactualizado, se carga el .pkl")
+    elif modo == "compacto":
+        ruta = os.path.join(COMPILADOS_DIR, f"{nombre}.npz")
+        if compilado_vigente(ruta, ruta_pkl):
+            return BosqueCompilado.cargar_compacto(ruta)
+        logger.warning(f"{nombre}: modelo compacto ausente o desactualizado, se carga el .pkl")
+    # Solo se conservan los árboles extraídos, no el objeto de scikit-learn
+    bosque = BosqueCompilado.desde_archivo(ruta_pkl)
+    bosque.origen = origen_modelo(ruta_pkl)
+    return bosque
+
+
+def version_motores(*motores):
+    """Versión corta derivada del contenido de los .pkl de origen"""
+    huellas = "|".join(str((m.origen or {}).get("sha256")) for m in motores)
+    return hashlib.sha256(huellas.encode()).hexdigest()[:12]
+
+
+class ModelosML:
+    """Motores de alerta y tipo de alerta, cargados una vez por proceso"""
+
+    def __init__(self, modo="pkl", intervalo_recarga=30.0):
+        self.modo = modo
+        self.intervalo_recarga = intervalo_recarga
+        self.estado = PENDIENTE
+        self.error = None
+        self.segundos_carga = None
+        self.recargas = 0
+        self.error_recarga = None
+        self._motores = None
+        # Firma de los .pkl en el último intento de carga
+        self._firma = None
+        self._proxima_revision = 0.0
+        self._lock = threading.Lock()
+        self._lock_recarga = threading.Lock()
+        self._pid = os.getpid()
+        # Funciones a llamar cuando termine la carga inicial
+        self._al_cargar = []
+
+    def _reiniciar_si_fork(self):
+        # Un fork a mitad de la carga deja al hijo sin el hilo que la hacía
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._lock_recarga = threading.Lock()
+            self._al_cargar = []
+            if self.estado == CARGANDO:
+                self.estado = PENDIENTE
+
+    @property
+    def listo(self):
+        return self.estado == LISTO
+
+    @property
+    def version(self):
+        """Versión de los modelos vigentes, sin esperar a que se carguen"""
+        motores = self._motores
+        return motores.version if motores else None
+
+    def _firma_archivos(self):
+        """(mtime, tamaño) de cada .pkl; None si falta"""
+        firma = []
+        for nombre in MODELOS:
+            try:
+                estado = os.stat(os.path.join(ML_DIR, f"{nombre}.pkl"))
+                firma.append((estado.st_mtime_ns, estado.st_size))
+            except OSError:
+                firma.append(None)
+        return tuple(firma)
+
+    def _cargar_motores(self):
+        alerta, tipo = (cargar_motor(nombre, self.modo) for nombre in MODELOS)
+        return Motores(alerta, tipo, version_motores(alerta, tipo))
+
+    def _cargar(self):
+        """Carga ambos modelos; se ejecuta con self._lock tomado"""
+        if self._motores is not None or self.estado == ERROR:
+            return
+        self.estado = CARGANDO
+        self._firma = self._firma_archivos()
+        inicio = time.perf_counter()
+        try:
+            self._motores = self._cargar_motores()
+        except Exception as e:
+            self.estado = ERROR
+            self.error = str(e)
+            logger.error(f"No se pudieron cargar los modelos de IA: {e}", exc_info=True)
+            return
+        self.segundos_carga = round(time.perf_counter() - inicio, 3)
+        self.estado = LISTO
+        logger.info(
+            f"Modelos de IA cargados en {self.segundos_carga}s "
+            f"(modo {self.modo}, versión {self._motores.version})"
+        )
+
+    @staticmethod
+    def _llamar(funcion):
+        try:
+            funcion()
+        except Exception as e:
+            logger.error(f"Error en la función al cargar los modelos de IA: {e}", exc_info=True)
+
+    def al_cargar(self, funcion):
+        """
+        Llama a funcion() cuando los modelos estén cargados: de inmediato si
+        ya lo están, o desde el hilo que termine la carga (nunca si falla).
+        """
+        self._reiniciar_si_fork()
+        with self._lock:
+            if not self.listo:
+                self._al_cargar.append(funcion)
+                return
+        self._llamar(funcion)
+
+    def _revisar_archivos(self):
+        """Inicia una recarga si los .pkl cambiaron desde la última carga"""
+        ahora = time.monotonic()
+        if self.intervalo_recarga <= 0 or ahora < self._proxima_revision:
+            return
+        self._proxima_revision = ahora + self.intervalo_recarga
+
+        firma = self._firma_archivos()
+        if firma == self._firma:
+            return
+        if self._motores is None:
+            # Una carga fallida se reintenta cuando los archivos cambian
+            if self.estado == ERROR:
+                self.estado = PENDIENTE
+            return
+        if not self._lock_recarga.acquire(blocking=False):
+            return  # recarga en curso
+        threading.Thread(
+            target=self.recargar, args=(firma,), name="recarga-modelos-ml", daemon=True
+        ).start()
+
+    def recargar(self, firma=None):
+        """
+        Carga los modelos de disco y, si todo sale bien, reemplaza los
+        vigentes. Retorna True si hubo reemplazo. El hilo de recarga la
+        llama con la firma ya leída y self._lock_recarga tomado; llamada
+        directa (sin firma) espera a cualquier recarga en curso.
+        """
+        if firma is None:
+            self._lock_recarga.acquire()
+            firma = self._firma_archivos()
+        try:
+            inicio = time.perf_counter()
+            try:
+                nuevos = self._cargar_motores()
+            except Exception as e:
+                # No se reintenta hasta que los archivos vuelvan a cambiar
+                self._firma = firma
+                self.error_recarga = str(e)
+                logger.error(f"No se pudieron recargar los modelos de IA: {e}", exc_info=True)
+                return False
+
+            if self._firma_archivos() != firma:
+                # Los archivos cambiaron durante la carga (escritura en curso)
+                logger.info("Modelos de IA modificados durante la recarga, se reintentará")
+                return False
+
+            anterior = self.version
+            # Una sola asignación: cada request ve los modelos anteriores o los nuevos
+            self._motores = nuevos
+            self._firma = firma
+            self.recargas += 1
+            self.error_recarga = None
+            self.segundos_carga = round(time.perf_counter() - inicio, 3)
+            logger.info(
+                f"Modelos de IA recargados en {self.segundos_carga}s "
+                f"(versión {anterior} → {nuevos.version})"
+            )
+            return True
+        finally:
+            self._lock_recarga.release()
+
+    def obtener(self):
+        """
+        Retorna Motores(alerta, tipo, version), cargándolos si aún no lo están
+        (espera a la precarga si está en curso). None si la carga falló.
+        """
+        self._reiniciar_si_fork()
+        self._revisar_archivos()
+        motores = self._motores
+        if motores is not None:
+            return motores
+        with self._lock:
+            self._cargar()
+            funciones = self._al_cargar if self.listo else []
+            if funciones:
+                self._al_cargar = []
+        # Fuera del lock: las funciones pueden volver a usar modelos_ml
+        for funcion in funciones:
+            self._llamar(funcion)
+        return self._motores
+
+    def precargar(self):
+        """Inicia la carga en un hilo en segundo plano"""
+        self._reiniciar_si_fork()
+        if self.estado != PENDIENTE:
+            return
+        self.estado = CARGANDO
+        threading.Thread(target=self.obtener, name="precarga-modelos-ml", daemon=True).start()
+
+    def resumen(self):
+        """Estado para /health"""
+        self._reiniciar_si_fork()
+        return {
+            "estado": self.estado,
+            "listo": self.listo,
+            "modo": self.modo,
+            "segundos_carga": self.segundos_carga,
+            "version": self.version,
+            "recargas": self.recargas,
+            "error": self.error,
+            "error_recarga": self.error_recarga
+        }
+
+
+modelos_ml = ModelosML(
+    modo=os.environ.get("ML_MODO_CARGA", "pkl").lower(),
+    intervalo_recarga=float(os.environ.get("ML_RECARGA_INTERVALO", 30))
+)
+
+
+def init_modelos(app):
+    """
+    Carga los modelos según ML_PRECARGA. Con GUNICORN_PRELOAD la app se crea
+    en el master y la carga es síncrona: si el master hiciera fork con la
+    carga en curso, cada worker volvería a cargar su propia copia.
+    """
+    if not env_bool("ML_PRECARGA", True):
+        return
+    if env_bool("GUNICORN_PRELOAD"):
+        modelos_ml.obtener()
+    else:
+        modelos_ml.precargar()
@@ -0,0 +1,80 @@
+"""
+Caché LRU de predicciones de los modelos de alertas.
+
+Entre actualizaciones de los sensores el dashboard consulta /api/analizar
+muchas veces con las mismas entradas. La clave incluye la versión de los
+modelos, así que un modelo nuevo nunca responde con resultados del
+anterior; al cambiar la versión se descarta todo lo guardado.
+Tamaño con ML_CACHE_PREDICCIONES (default: 4096; 0 desactiva la caché).
+"""
+import os
+import threading
+from collections import OrderedDict
+
+
+class CachePredicciones:
+    """LRU thread-safe con contadores de aciertos y fallos"""
+
+    def __init__(self, max_entradas=4096):
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._version = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def _verificar_version(self, version):
+        # Se ejecuta con el lock tomado
+        if version != self._version:
+            if self._entradas:
+                self.invalidaciones += 1
+            self._entradas.clear()
+            self._version = version
+
+    def obtener(self, version, clave):
+        """Retorna el resultado guardado o None (y cuenta el acierto o fallo)"""
+        with self._lock:
+            self._verificar_version(version)
+            resultado = self._entradas.get(clave)
+            if resultado is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+
+    def guardar(self, version, clave, resultado):
+        if self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._verificar_version(version)
+            self._entradas[clave] = resultado
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        """Descarta las entradas y reinicia los contadores"""
+        with self._lock:
+            self._entradas.clear()
+            self._version = None
+            self.aciertos = self.fallos = self.invalidaciones = 0
+
+    def metricas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "invalidaciones": self.invalidaciones,
+                "version_modelos": self._version
+            }
+
+
+cache_predicciones = CachePredicciones(
+    max_entradas=int(os.environ.get("ML_CACHE_PREDICCIONES", 4096))
+)
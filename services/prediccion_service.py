@@ -0,0 +1,175 @@
+"""
+Predicciones en el camino de escritura.
+
+Cada vez que una escritura completa o actualiza la terna (temperatura,
+presión, gas) de un proceso, los modelos se evalúan una vez y el resultado
+se guarda en la tabla predicciones. /api/analizar lee la predicción más
+reciente en lugar de volver a ejecutar los modelos en cada consulta.
+
+La evaluación no ocurre en el request que escribe: programar_prediccion la
+encola en el pool de inferencia (services/inferencia_pool.py) y el POST
+responde sin esperar a los modelos. Si el pool está saturado la evaluación
+se omite y la predicción guardada queda desactualizada: la próxima escritura
+la vuelve a programar, y /api/analizar también cuando la predicción es
+anterior a la última lectura combinada o de otra versión de los modelos
+(mientras tanto responde con la guardada).
+"""
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from database.connection import db
+from database.models.prediccion import Prediccion
+from database.db_service import (
+    obtener_ultima_lectura_combinada, obtener_fecha_inicio_proceso, LecturaException
+)
+from services.modelos_ml import modelos_ml
+from services.ai_service import predecir_lectura, construir_resultado, dia_desde_inicio
+from services.inferencia_pool import pool_inferencia, InferenciaPendiente
+from exceptions.custom_exceptions import DatabaseException
+
+logger = logging.getLogger(__name__)
+
+MAX_HISTORIAL_PREDICCIONES = 1000
+
+# Procesos con una evaluación encolada que aún no empezó
+_encoladas = set()
+_lock_encoladas = threading.Lock()
+
+
+def obtener_ultima_prediccion(proceso_id):
+    """Predicción más reciente del proceso o None"""
+    return (
+        Prediccion.query
+        .filter_by(proceso_id=proceso_id)
+        .order_by(Prediccion.fecha_hora.desc(), Prediccion.id.desc())
+        .first()
+    )
+
+
+def registrar_prediccion(proceso_id, fecha_inicio=None):
+    """
+    Evalúa la última lectura combinada del proceso y guarda la predicción.
+    Retorna la Prediccion creada, o None si la terna está incompleta, ya
+    fue evaluada o los modelos no están disponibles. Nunca lanza
+    excepciones: los errores se registran en el log.
+    """
+    try:
+        try:
+            temperatura, presion, gas, timestamp = obtener_ultima_lectura_combinada(proceso_id)
+        except LecturaException:
+            return None
+
+        motores = modelos_ml.obtener()
+        if motores is None:
+            return None
+
+        fecha_hora = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+
+        # Escrituras que no cambian la terna (otro sensor, reintentos) no duplican filas
+        ultima = obtener_ultima_prediccion(proceso_id)
+        if ultima is not None and (
+            ultima.fecha_hora, ultima.temperatura, ultima.presion, ultima.gas,
+            ultima.version_modelo
+        ) == (fecha_hora, temperatura, presion, gas, motores.version):
+            return None
+
+        if fecha_inicio is None:
+            fecha_inicio = obtener_fecha_inicio_proceso(proceso_id)
+        dia_proceso = dia_desde_inicio(timestamp, fecha_inicio)
+        alerta, tipo = predecir_lectura(motores, temperatura, presion, gas, dia_proceso)
+
+        prediccion = Prediccion(
+            proceso_id=proceso_id,
+            fecha_hora=fecha_hora,
+            temperatura=temperatura,
+            presion=presion,
+            gas=gas,
+            dia_proceso=dia_proceso,
+            alerta_ia=alerta,
+            tipo_alerta_modelo=tipo,
+            version_modelo=motores.version
+        )
+        db.session.add(prediccion)
+        db.session.commit()
+        logger.info(f"Predicción registrada: Proceso={proceso_id}, alerta={alerta}, tipo={tipo}")
+        return prediccion
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error al registrar predicción del proceso {proceso_id}: {e}", exc_info=True)
+        return None
+
+
+def _registrar_en_contexto(app, proceso_id, fecha_inicio):
+    with _lock_encoladas:
+        _encoladas.discard(proceso_id)
+    with app.app_context():
+        return registrar_prediccion(proceso_id, fecha_inicio)
+
+
+def programar_prediccion(proceso_id, fecha_inicio=None, app=None):
+    """
+    Encola registrar_prediccion en el pool de inferencia sin esperarla.
+    Como mucho una evaluación por proceso espera en la cola: la que ya está
+    encolada leerá la terna más reciente al empezar. Retorna True si quedó
+    encolada (o ya lo estaba). Requiere contexto de aplicación o `app`.
+    """
+    app = app or current_app._get_current_object()
+    with _lock_encoladas:
+        if proceso_id in _encoladas:
+            return True
+        _encoladas.add(proceso_id)
+    try:
+        pool_inferencia.enviar(_registrar_en_contexto, app, proceso_id, fecha_inicio)
+        return True
+    except InferenciaPendiente:
+        with _lock_encoladas:
+            _encoladas.discard(proceso_id)
+        logger.warning(f"Pool de inferencia saturado: predicción del proceso {proceso_id} omitida")
+        return False
+
+
+def prediccion_desactualizada(prediccion):
+    """
+    True si la predicción es de otra versión de los modelos o anterior a la
+    última lectura combinada del proceso (una evaluación omitida con el pool
+    saturado). Usa la caché de últimas lecturas.
+    """
+    if modelos_ml.version not in (None, prediccion.version_modelo):
+        return True
+    try:
+        timestamp = obtener_ultima_lectura_combinada(prediccion.proceso_id)[3]
+    except LecturaException:
+        return False
+    return prediccion.fecha_hora < datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+
+
+def resultado_prediccion(prediccion):
+    """Respuesta de /api/analizar a partir de una predicción guardada"""
+    resultado = construir_resultado(
+        prediccion.alerta_ia, prediccion.tipo_alerta_modelo,
+        prediccion.temperatura, prediccion.presion, prediccion.gas,
+        prediccion.dia_proceso, version_modelo=prediccion.version_modelo
+    )
+    resultado["fecha_hora"] = prediccion.fecha_hora.isoformat()
+    return resultado
+
+
+def obtener_historial_predicciones(proceso_id, limite=100, solo_alertas=False):
+    """Predicciones del proceso, más reciente primero"""
+    limite = max(1, min(limite, MAX_HISTORIAL_PREDICCIONES))
+    try:
+        consulta = Prediccion.query.filter_by(proceso_id=proceso_id)
+        if solo_alertas:
+            consulta = consulta.filter(Prediccion.alerta_ia == 1)
+        return (
+            consulta
+            .order_by(Prediccion.fecha_hora.desc(), Prediccion.id.desc())
+            .limit(limite)
+            .all()
+        )
+    except SQLAlchemyError as e:
+        logger.error(f"Error al obtener historial de predicciones: {e}")
+        raise DatabaseException("Error al obtener el historial de predicciones")
@@ -1,8 +1,16 @@
 from database.models.proceso_biodigestor import ProcesoBiodigestor
 from database.connection import db
+from database.lectura_cache import cache_lecturas
+from database.proceso_cache import cache_proceso
 from datetime import datetime
 
-def obtener_proceso_activo():
+def obtener_proceso_activo(usar_cache=False):
+    """
+    Retorna el proceso activo o None. Con usar_cache=True retorna la copia
+    en caché (ProcesoActivo); sin ella, el objeto ORM (para modificarlo).
+    """
+    if usar_cache:
+        return cache_proceso.obtener()
     return ProcesoBiodigestor.query.filter_by(estado='ACTIVO').first()
 
 def iniciar_proceso():
@@ -13,6 +21,8 @@ def iniciar_proceso():
         nuevo = ProcesoBiodigestor()
         db.session.add(nuevo)
         db.session.commit()
+        cache_proceso.invalidar()
+        cache_lecturas.invalidar()
         return nuevo
     except Exception as e:
         db.session.rollback()
@@ -27,6 +37,8 @@ def finalizar_proceso():
         activo.estado = "FINALIZADO"
         activo.fecha_fin = datetime.utcnow()
         db.session.commit()
+        cache_proceso.invalidar()
+        cache_lecturas.invalidar()
         return activo
     except Exception as e:
         db.session.rollback()
@@ -34,7 +46,7 @@ def finalizar_proceso():
 
 def hay_proceso_activo():
     """Retorna True si existe un proceso activo."""
-    return obtener_proceso_activo() is not None
+    return obtener_proceso_activo(usar_cache=True) is not None
 
 def proceso_to_dict(proceso: ProcesoBiodigestor):
     """Convierte un objeto ProcesoBiodigestor a diccionario JSON serializable."""
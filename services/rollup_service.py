@@ -0,0 +1,234 @@
+"""
+Rollups de lecturas por bucket de tiempo.
+
+Mantiene min/max/suma/conteo/último valor por proceso, sensor y bucket
+(ver ROLLUP_BUCKETS) para servir series históricas sin recorrer las
+lecturas crudas. Los agregados parciales se combinan con un upsert, por lo
+que la actualización incremental y la reconstrucción usan el mismo camino.
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import case, func
+from sqlalchemy.exc import SQLAlchemyError
+from database.connection import db
+from database.models.lectura import Lectura
+from database.models.lectura_rollup import LecturaRollup
+from exceptions.custom_exceptions import ValidationException, DatabaseException
+from config.constants import ROLLUP_BUCKETS, MIN_PUNTOS_SERIE, MAX_PUNTOS_SERIE
+from utils.datetime_utils import to_naive_utc
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+TAMANO_LOTE_RECONSTRUCCION = 5000
+# Dialectos con upsert (ver _sentencia_upsert)
+DIALECTOS_SOPORTADOS = ("mysql", "sqlite", "postgresql")
+_dialectos_avisados = set()
+
+
+def inicio_bucket(fecha_hora, segundos):
+    """Inicio (naive UTC) del bucket de `segundos` que contiene a fecha_hora"""
+    fecha_hora = to_naive_utc(fecha_hora)
+    transcurridos = int((fecha_hora - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=transcurridos - transcurridos % segundos)
+
+
+def agregar_filas(filas):
+    """
+    Agrega lecturas (dicts con proceso_id, sensor_id, valor, fecha_hora) en
+    agregados parciales por (proceso, sensor, bucket, inicio).
+    """
+    agregados = {}
+    for fila in filas:
+        fecha_hora = to_naive_utc(fila["fecha_hora"])
+        valor = float(fila["valor"])
+        for bucket, segundos in ROLLUP_BUCKETS.items():
+            clave = (fila["proceso_id"], fila["sensor_id"], bucket, inicio_bucket(fecha_hora, segundos))
+            actual = agregados.get(clave)
+            if actual is None:
+                agregados[clave] = {
+                    "minimo": valor, "maximo": valor, "suma": valor, "conteo": 1,
+                    "ultimo_valor": valor, "ultima_fecha": fecha_hora
+                }
+                continue
+            actual["minimo"] = min(actual["minimo"], valor)
+            actual["maximo"] = max(actual["maximo"], valor)
+            actual["suma"] += valor
+            actual["conteo"] += 1
+            if fecha_hora >= actual["ultima_fecha"]:
+                actual["ultimo_valor"] = valor
+                actual["ultima_fecha"] = fecha_hora
+    return agregados
+
+
+def _sentencia_upsert(dialecto):
+    """INSERT ... que combina el agregado nuevo con el existente"""
+    tabla = LecturaRollup.__table__
+
+    if dialecto == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(tabla)
+        nuevo = stmt.inserted
+        # MySQL evalúa las asignaciones en orden: ultimo_valor debe ir antes que ultima_fecha
+        return stmt.on_duplicate_key_update([
+            ("minimo", func.least(tabla.c.minimo, nuevo.minimo)),
+            ("maximo", func.greatest(tabla.c.maximo, nuevo.maximo)),
+            ("suma", tabla.c.suma + nuevo.suma),
+            ("conteo", tabla.c.conteo + nuevo.conteo),
+            ("ultimo_valor", case(
+                (nuevo.ultima_fecha >= tabla.c.ultima_fecha, nuevo.ultimo_valor),
+                else_=tabla.c.ultimo_valor
+            )),
+            ("ultima_fecha", func.greatest(tabla.c.ultima_fecha, nuevo.ultima_fecha)),
+        ])
+
+    if dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        minimo, maximo = func.min, func.max
+    elif dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        minimo, maximo = func.least, func.greatest
+    else:
+        raise NotImplementedError(f"Rollups no soportados para el dialecto {dialecto}")
+
+    stmt = dialect_insert(tabla)
+    nuevo = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["proceso_id", "sensor_id", "bucket", "inicio"],
+        set_={
+            "minimo": minimo(tabla.c.minimo, nuevo.minimo),
+            "maximo": maximo(tabla.c.maximo, nuevo.maximo),
+            "suma": tabla.c.suma + nuevo.suma,
+            "conteo": tabla.c.conteo + nuevo.conteo,
+            "ultimo_valor": case(
+                (nuevo.ultima_fecha >= tabla.c.ultima_fecha, nuevo.ultimo_valor),
+                else_=tabla.c.ultimo_valor
+            ),
+            "ultima_fecha": maximo(tabla.c.ultima_fecha, nuevo.ultima_fecha),
+        }
+    )
+
+
+def actualizar_rollups(filas):
+    """
+    Incorpora lecturas a los rollups dentro de la transacción actual
+    (el commit lo hace quien registra las lecturas). Con un dialecto sin
+    upsert soportado no hace nada: la lectura se registra igual.
+    """
+    dialecto = db.engine.dialect.name
+    if dialecto not in DIALECTOS_SOPORTADOS:
+        if dialecto not in _dialectos_avisados:
+            _dialectos_avisados.add(dialecto)
+            logger.warning(f"Rollups no soportados para el dialecto {dialecto}: no se actualizan")
+        return 0
+
+    agregados = agregar_filas(filas)
+    if not agregados:
+        return 0
+
+    parametros = [
+        {"proceso_id": p, "sensor_id": s, "bucket": b, "inicio": i, **valores}
+        for (p, s, b, i), valores in agregados.items()
+    ]
+    db.session.execute(_sentencia_upsert(dialecto), parametros)
+    return len(parametros)
+
+
+def reconstruir_rollups(proceso_id=None):
+    """
+    Recalcula los rollups desde las lecturas crudas (de un proceso o de todos).
+    Recorre las lecturas con un cursor del servidor en lotes de
+    TAMANO_LOTE_RECONSTRUCCION. Ejecutar con la ingesta del proceso detenida.
+    Retorna el número de lecturas procesadas.
+    """
+    logger.info(f"Reconstruyendo rollups (proceso={proceso_id or 'todos'})")
+    if db.engine.dialect.name not in DIALECTOS_SOPORTADOS:
+        raise DatabaseException(f"Rollups no soportados para el dialecto {db.engine.dialect.name}")
+
+    try:
+        borrado = LecturaRollup.query
+        if proceso_id is not None:
+            borrado = borrado.filter_by(proceso_id=proceso_id)
+        borrado.delete(synchronize_session=False)
+        db.session.commit()
+
+        consulta = (
+            db.select(Lectura.proceso_id, Lectura.sensor_id, Lectura.valor, Lectura.fecha_hora)
+            .where(Lectura.proceso_id.isnot(None))
+            .execution_options(yield_per=TAMANO_LOTE_RECONSTRUCCION)
+        )
+        if proceso_id is not None:
+            consulta = consulta.where(Lectura.proceso_id == proceso_id)
+
+        # Conexión propia para el cursor de lectura; los upserts van por la sesión
+        procesadas = 0
+        with db.engine.connect() as conexion:
+            resultado = conexion.execution_options(stream_results=True).execute(consulta)
+            for lote in resultado.mappings().partitions(TAMANO_LOTE_RECONSTRUCCION):
+                actualizar_rollups(lote)
+                db.session.commit()
+                procesadas += len(lote)
+                logger.info(f"Rollups: {procesadas} lecturas procesadas")
+
+        return procesadas
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Error al reconstruir rollups: {e}", exc_info=True)
+        raise DatabaseException(f"Error al reconstruir rollups: {str(e)}")
+
+
+def elegir_bucket(desde, hasta, max_puntos=MAX_PUNTOS_SERIE, min_puntos=MIN_PUNTOS_SERIE):
+    """
+    Elige el bucket más grueso que todavía da al menos min_puntos en el
+    rango sin superar max_puntos (menos filas que leer). Si ninguno llega a
+    min_puntos, el más fino que no supera max_puntos; si todos lo superan,
+    el más grueso.
+    """
+    segundos_rango = max((hasta - desde).total_seconds(), 0)
+    aptos = [
+        (bucket, segundos_rango / segundos) for bucket, segundos in ROLLUP_BUCKETS.items()
+        if segundos_rango / segundos <= max_puntos
+    ]
+    if not aptos:
+        return list(ROLLUP_BUCKETS)[-1]
+    for bucket, puntos in reversed(aptos):
+        if puntos >= min_puntos:
+            return bucket
+    return aptos[0][0]
+
+
+def obtener_serie(sensor_id, proceso_id, desde, hasta, bucket=None):
+    """
+    Serie agregada de un sensor entre desde y hasta (naive UTC).
+    Retorna (bucket, lista de LecturaRollup ordenada por inicio).
+    """
+    if hasta < desde:
+        raise ValidationException("'desde' debe ser anterior a 'hasta'", status_code=400)
+
+    if bucket is None:
+        bucket = elegir_bucket(desde, hasta)
+    elif bucket not in ROLLUP_BUCKETS:
+        raise ValidationException(
+            f"bucket inválido. Valores válidos: {', '.join(ROLLUP_BUCKETS)}",
+            status_code=400
+        )
+
+    try:
+        puntos = (
+            LecturaRollup.query
+            .filter(
+                LecturaRollup.proceso_id == proceso_id,
+                LecturaRollup.sensor_id == sensor_id,
+                LecturaRollup.bucket == bucket,
+                LecturaRollup.inicio >= inicio_bucket(desde, ROLLUP_BUCKETS[bucket]),
+                LecturaRollup.inicio <= hasta
+            )
+            .order_by(LecturaRollup.inicio)
+            .all()
+        )
+        return bucket, puntos
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error al obtener serie: {e}")
+        raise DatabaseException("Error al obtener la serie del sensor")
@@ -0,0 +1,343 @@
+"""
+Benchmark de inferencia del camino ML, sin BD ni red (solo los .pkl de ml/).
+
+Mediciones:
+  - carga: tiempo de la primera carga y mediana, memoria asignada y tamaño
+    en disco de cada modelo, en cada formato (sklearn, pkl → motor
+    compilado, mmap, compacto). Los formatos mmap y compacto se generan en
+    un directorio temporal a partir de los .pkl.
+  - latencia: percentiles (ms) de una fila en predecir_alerta (por modo de
+    carga, con la caché de predicciones fría y caliente),
+    SistemaAlertaOptimizado.predecir_con_ensemble, obtener_recomendacion y
+    cada modelo (sklearn y motor compilado).
+  - lotes: filas/s de cada modelo y de SistemaAlertaOptimizado.predecir_lote
+    con distintos tamaños de lote.
+
+La memoria se mide con tracemalloc: en modo mmap los arreglos son páginas
+mapeadas del archivo (compartidas entre workers) y no se cuentan.
+
+Uso (desde la raíz del proyecto):
+    python tests/benchmark/benchmark_ml.py --salida bench.json
+    python tests/benchmark/benchmark_ml.py --rapido
+    python tests/benchmark/benchmark_ml.py --base bench_v1.json --tolerancia 0.25
+
+Con --base compara contra un resultado anterior y termina con código 1 si
+alguna latencia o tiempo de carga empeora (o algún rendimiento cae) más que
+la tolerancia relativa.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from unittest import mock
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, RAIZ)
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from ml.ensemble_system import COLUMNAS, SistemaAlertaOptimizado
+from ml.motor_inferencia import BosqueCompilado
+from ml.utils import obtener_recomendacion
+from services import ai_service
+from services.modelos_ml import ML_DIR, MODELOS, Motores, version_motores
+from services.prediccion_cache import cache_predicciones
+
+ARCHIVOS = MODELOS + ("modelo_alerta_optimizado", "modelo_tipo_alerta_optimizado")
+FORMATOS = ("sklearn", "pkl", "mmap", "compacto")
+MODOS = ("pkl", "mmap", "compacto")
+TAMANOS_LOTE = (1, 10, 100, 1000, 10000)
+PERCENTILES = (50, 90, 99)
+DIA_PROCESO = 15
+
+
+def entradas(n, semilla=0):
+    """Lecturas aleatorias en los rangos de operación: (n, 4) en el orden de COLUMNAS"""
+    rng = np.random.default_rng(semilla)
+    return np.column_stack([
+        rng.uniform(20, 42, n),
+        rng.uniform(80, 900, n),
+        rng.uniform(200, 7000, n),
+        rng.integers(1, 40, n)
+    ])
+
+
+# --- Carga ---
+
+def preparar_formatos(directorio):
+    """Genera los formatos mmap y compacto de cada .pkl; retorna sus rutas"""
+    rutas = {}
+    for nombre in ARCHIVOS:
+        motor = BosqueCompilado.desde_archivo(os.path.join(ML_DIR, f"{nombre}.pkl"))
+        motor.guardar(os.path.join(directorio, nombre))
+        motor.compactar().guardar_compacto(os.path.join(directorio, f"{nombre}.npz"))
+        rutas[nombre] = {
+            "sklearn": os.path.join(ML_DIR, f"{nombre}.pkl"),
+            "pkl": os.path.join(ML_DIR, f"{nombre}.pkl"),
+            "mmap": os.path.join(directorio, nombre),
+            "compacto": os.path.join(directorio, f"{nombre}.npz"),
+        }
+    return rutas
+
+
+def cargador(formato):
+    """Función ruta → modelo para un formato"""
+    return {
+        "sklearn": joblib.load,
+        "pkl": BosqueCompilado.desde_archivo,
+        "mmap": lambda ruta: BosqueCompilado.cargar(ruta, mmap=True),
+        "compacto": BosqueCompilado.cargar_compacto,
+    }[formato]
+
+
+def tamano_en_disco(ruta):
+    if os.path.isdir(ruta):
+        return sum(os.path.getsize(os.path.join(ruta, f)) for f in os.listdir(ruta))
+    return os.path.getsize(ruta)
+
+
+def medir_carga(rutas, repeticiones):
+    """Tiempo (ms) y memoria (KB) de carga por modelo y formato"""
+    resultado = {}
+    for nombre, por_formato in rutas.items():
+        resultado[nombre] = {}
+        for formato in FORMATOS:
+            cargar, ruta = cargador(formato), por_formato[formato]
+            tiempos = []
+            for _ in range(repeticiones):
+                gc.collect()
+                inicio = time.perf_counter()
+                cargar(ruta)
+                tiempos.append(time.perf_counter() - inicio)
+
+            gc.collect()
+            tracemalloc.start()
+            modelo = cargar(ruta)
+            memoria, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del modelo
+
+            resultado[nombre][formato] = {
+                "primera_ms": round(tiempos[0] * 1000, 3),
+                "mediana_ms": round(float(np.median(tiempos)) * 1000, 3),
+                "memoria_kb": round(memoria / 1024, 1),
+                "disco_kb": round(tamano_en_disco(ruta) / 1024, 1),
+            }
+    return resultado
+
+
+# --- Latencia de una fila ---
+
+def percentiles(funcion, argumentos, calentamiento=20):
+    """Percentiles (ms) de funcion(arg) para cada arg; las primeras llamadas no se miden"""
+    for arg in argumentos[:calentamiento]:
+        funcion(arg)
+    tiempos = np.empty(len(argumentos))
+    for i, arg in enumerate(argumentos):
+        inicio = time.perf_counter()
+        funcion(arg)
+        tiempos[i] = time.perf_counter() - inicio
+    tiempos *= 1000
+    resumen = {f"p{p}_ms": round(float(np.percentile(tiempos, p)), 4) for p in PERCENTILES}
+    resumen["max_ms"] = round(float(tiempos.max()), 4)
+    resumen["llamadas"] = len(argumentos)
+    return resumen
+
+
+class ModelosFijos:
+    """Reemplaza a modelos_ml en ai_service con motores ya cargados"""
+
+    def __init__(self, alerta, tipo):
+        self.motores = Motores(alerta, tipo, version_motores(alerta, tipo))
+
+    @property
+    def version(self):
+        return self.motores.version
+
+    def obtener(self):
+        return self.motores
+
+
+def latencia_predecir_alerta(motores, filas):
+    """predecir_alerta con la caché de predicciones fría (entradas distintas) y caliente"""
+    argumentos = [tuple(fila[:3]) + ("2030-01-15 10:00:00",) for fila in filas]
+    # El día de proceso sale de la BD; aquí es fijo para medir solo el camino ML
+    with mock.patch.object(ai_service, "modelos_ml", motores), \
+            mock.patch.object(ai_service, "calcular_dia_proceso", return_value=DIA_PROCESO):
+        cache_predicciones.limpiar()
+        fria = percentiles(lambda a: ai_service.predecir_alerta(*a), argumentos)
+        caliente = percentiles(lambda a: ai_service.predecir_alerta(*a), [argumentos[0]] * len(argumentos))
+    cache_predicciones.limpiar()
+    return {"cache_fria": fria, "cache_caliente": caliente}
+
+
+def medir_latencia(rutas, sistema, filas):
+    """Percentiles de latencia de una fila en cada punto de entrada del camino ML"""
+    resultado = {}
+    for modo in MODOS:
+        alerta, tipo = (cargador(modo)(rutas[nombre][modo]) for nombre in MODELOS)
+        resultado[f"predecir_alerta[{modo}]"] = latencia_predecir_alerta(ModelosFijos(alerta, tipo), filas)
+
+    resultado["predecir_con_ensemble"] = percentiles(sistema.predecir_con_ensemble, filas.tolist())
+    estados = [(i % 2, *fila[:3]) for i, fila in enumerate(filas.tolist())]
+    resultado["obtener_recomendacion"] = percentiles(lambda a: obtener_recomendacion(*a), estados)
+
+    for nombre in ARCHIVOS:
+        modelo = joblib.load(rutas[nombre]["sklearn"])
+        modelo.n_jobs = 1
+        marcos = [pd.DataFrame([fila], columns=COLUMNAS) for fila in filas]
+        resultado[f"{nombre}[sklearn]"] = percentiles(modelo.predict, marcos)
+        for modo in MODOS:
+            motor = cargador(modo)(rutas[nombre][modo])
+            resultado[f"{nombre}[{modo}]"] = percentiles(motor.predict, list(filas))
+    return resultado
+
+
+# --- Rendimiento por lotes ---
+
+def filas_por_segundo(funcion, lote, segundos_minimos):
+    """Filas/s de funcion(lote), repitiendo hasta acumular segundos_minimos"""
+    funcion(lote)
+    repeticiones, transcurrido = 0, 0.0
+    while transcurrido < segundos_minimos:
+        inicio = time.perf_counter()
+        funcion(lote)
+        transcurrido += time.perf_counter() - inicio
+        repeticiones += 1
+    return {
+        "filas_por_segundo": round(len(lote) * repeticiones / transcurrido),
+        "ms_por_lote": round(transcurrido / repeticiones * 1000, 4),
+    }
+
+
+def medir_lotes(rutas, sistema, tamanos, segundos_minimos):
+    """Filas/s por tamaño de lote del ensemble y de cada modelo en cada formato"""
+    datos = entradas(max(tamanos), semilla=1)
+    funciones = {"predecir_lote": lambda X: sistema.predecir_lote(pd.DataFrame(X, columns=COLUMNAS))}
+    for nombre in ARCHIVOS:
+        modelo = joblib.load(rutas[nombre]["sklearn"])
+        modelo.n_jobs = 1
+        funciones[f"{nombre}[sklearn]"] = lambda X, m=modelo: m.predict(pd.DataFrame(X, columns=COLUMNAS))
+        for modo in MODOS:
+            funciones[f"{nombre}[{modo}]"] = cargador(modo)(rutas[nombre][modo]).predict
+
+    return {
+        objetivo: {str(n): filas_por_segundo(funcion, datos[:n], segundos_minimos) for n in tamanos}
+        for objetivo, funcion in funciones.items()
+    }
+
+
+# --- Comparación entre versiones ---
+
+def _metricas(resultado):
+    """(nombre, valor, mayor_es_mejor) de las métricas comparables de un resultado"""
+    for nombre, formatos in resultado.get("carga", {}).items():
+        for formato, valores in formatos.items():
+            yield f"carga.{nombre}[{formato}].mediana_ms", valores["mediana_ms"], False
+    for objetivo, valores in resultado.get("latencia", {}).items():
+        por_cache = valores if "cache_fria" in valores else {"": valores}
+        for cache, percentil in por_cache.items():
+            sufijo = f".{cache}" if cache else ""
+            for clave in ("p50_ms", "p99_ms"):
+                yield f"latencia.{objetivo}{sufijo}.{clave}", percentil[clave], False
+    for objetivo, tamanos in resultado.get("lotes", {}).items():
+        for n, valores in tamanos.items():
+            yield f"lotes.{objetivo}.{n}.filas_por_segundo", valores["filas_por_segundo"], True
+
+
+def comparar(actual, base, tolerancia):
+    """Métricas que empeoraron más que `tolerancia` (relativa) respecto de base"""
+    anteriores = {nombre: valor for nombre, valor, _ in _metricas(base)}
+    regresiones = []
+    for nombre, valor, mayor_es_mejor in _metricas(actual):
+        anterior = anteriores.get(nombre)
+        if not anterior:
+            continue
+        cambio = (valor - anterior) / anterior
+        if (-cambio if mayor_es_mejor else cambio) > tolerancia:
+            regresiones.append({"metrica": nombre, "base": anterior, "actual": valor,
+                                "cambio": round(cambio, 3)})
+    return regresiones
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inferencia del camino ML")
+    parser.add_argument("--filas", type=int, default=2000, help="Llamadas por medición de latencia")
+    parser.add_argument("--repeticiones-carga", type=int, default=5)
+    parser.add_argument("--segundos-lote", type=float, default=0.5,
+                        help="Tiempo mínimo medido por tamaño de lote")
+    parser.add_argument("--tamanos-lote", type=int, nargs="+", default=list(TAMANOS_LOTE))
+    parser.add_argument("--rapido", action="store_true", help="Menos repeticiones (para verificar el script)")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--base", help="Resultado JSON anterior con el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Empeoramiento relativo permitido respecto de --base")
+    args = parser.parse_args(argv)
+    if args.rapido:
+        args.filas, args.repeticiones_carga, args.segundos_lote = 200, 2, 0.05
+
+    filas = entradas(args.filas)
+    sistema = SistemaAlertaOptimizado(ML_DIR)
+    with tempfile.TemporaryDirectory(prefix="benchmark_ml_") as directorio:
+        rutas = preparar_formatos(directorio)
+        print("⏱️  Carga de modelos...", file=sys.stderr)
+        carga = medir_carga(rutas, args.repeticiones_carga)
+        print("⏱️  Latencia de una fila...", file=sys.stderr)
+        latencia = medir_latencia(rutas, sistema, filas)
+        print("⏱️  Rendimiento por lotes...", file=sys.stderr)
+        lotes = medir_lotes(rutas, sistema, args.tamanos_lote, args.segundos_lote)
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {
+            "filas": args.filas,
+            "repeticiones_carga": args.repeticiones_carga,
+            "segundos_lote": args.segundos_lote,
+            "tamanos_lote": args.tamanos_lote,
+        },
+        "carga": carga,
+        "latencia": latencia,
+        "lotes": lotes,
+    }
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            regresiones = comparar(resultado, json.load(f), args.tolerancia)
+        for r in regresiones:
+            print(f"⚠️  {r['metrica']}: {r['base']} → {r['actual']} ({r['cambio']:+.1%})", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+        print(f"✅ Sin regresiones mayores a {args.tolerancia:.0%} respecto de {args.base}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
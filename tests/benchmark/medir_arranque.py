@@ -0,0 +1,121 @@
+"""
+Mide el tiempo de arranque de la aplicación en procesos nuevos (en frío).
+
+Fases medidas en cada repetición:
+  - interprete: arranque de Python hasta el primer import
+  - import_main: importar main (blueprints, servicios)
+  - create_app: crear la app
+  - primer_health: primera respuesta de /health
+  - modelos_listos: hasta que los modelos ML están cargados
+  - total: desde que se lanza el proceso hasta modelos_listos
+
+Uso (desde la raíz del proyecto):
+    python tests/benchmark/medir_arranque.py --repeticiones 5 --modo pkl
+    python tests/benchmark/medir_arranque.py --modo mmap --salida arranque.json
+
+No requiere una BD accesible: /health reporta la BD como no disponible,
+pero los tiempos de arranque son los mismos.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+CODIGO_HIJO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {raiz!r})
+from main import create_app
+t_import = time.perf_counter()
+app = create_app()
+t_app = time.perf_counter()
+app.test_client().get("/health")
+t_health = time.perf_counter()
+from services.modelos_ml import modelos_ml
+modelos_ml.obtener()
+t_ml = time.perf_counter()
+print("RESULTADO " + json.dumps({{
+    "import_main": t_import - inicio,
+    "create_app": t_app - t_import,
+    "primer_health": t_health - t_app,
+    "modelos_listos": t_ml - t_app,
+    "estado_ml": modelos_ml.estado,
+}}))
+"""
+
+
+def medir_una_vez(modo):
+    """Lanza un proceso nuevo y retorna los tiempos de cada fase (segundos)"""
+    entorno = dict(os.environ, ML_MODO_CARGA=modo)
+    # La app arma la URI de la BD al crearse; sin BD real basta con valores de relleno
+    for clave, valor in (("DB_USER", "bench"), ("DB_PASSWORD", "bench"), ("DB_HOST", "127.0.0.1"),
+                         ("DB_PORT", "3306"), ("DB_NAME", "bench")):
+        entorno.setdefault(clave, valor)
+
+    lanzado = time.perf_counter()
+    proceso = subprocess.run(
+        [sys.executable, "-c", CODIGO_HIJO.format(raiz=RAIZ)],
+        cwd=RAIZ, env=entorno, capture_output=True, text=True, timeout=300
+    )
+    total = time.perf_counter() - lanzado
+
+    for linea in proceso.stdout.splitlines():
+        if linea.startswith("RESULTADO "):
+            resultado = json.loads(linea[len("RESULTADO "):])
+            break
+    else:
+        raise RuntimeError(f"El proceso de medición falló:\n{proceso.stderr[-2000:]}")
+
+    medido = resultado["import_main"] + resultado["create_app"] + resultado["modelos_listos"]
+    resultado["interprete"] = max(total - medido, 0.0)
+    resultado["total"] = total
+    return resultado
+
+
+def resumir(mediciones):
+    """Mediana, mínimo y máximo (ms) de cada fase"""
+    fases = [f for f in mediciones[0] if isinstance(mediciones[0][f], float)]
+    return {
+        fase: {
+            "mediana_ms": round(statistics.median(m[fase] for m in mediciones) * 1000, 1),
+            "min_ms": round(min(m[fase] for m in mediciones) * 1000, 1),
+            "max_ms": round(max(m[fase] for m in mediciones) * 1000, 1),
+        }
+        for fase in fases
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la aplicación")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--modo", choices=("pkl", "mmap", "compacto"), default="pkl",
+                        help="ML_MODO_CARGA a medir")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resultado")
+    args = parser.parse_args(argv)
+
+    mediciones = []
+    for i in range(args.repeticiones):
+        mediciones.append(medir_una_vez(args.modo))
+        print(f"⏱️  Repetición {i + 1}/{args.repeticiones}: "
+              f"{mediciones[-1]['total'] * 1000:.0f} ms", file=sys.stderr)
+
+    resultado = {
+        "modo": args.modo,
+        "repeticiones": args.repeticiones,
+        "python": sys.version.split()[0],
+        "fases": resumir(mediciones),
+    }
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,4 +36,21 @@ def session(app):
     from database.connection import db
     with app.app_context():
         yield db.session
-        db.session.rollback()
\ No newline at end of file
+        db.session.rollback()
+
+@pytest.fixture(autouse=True)
+def limpiar_caches():
+    """Evita que las cachés en memoria (lecturas, proceso, sensores, predicciones) se compartan entre tests"""
+    from database.lectura_cache import cache_lecturas
+    from database.proceso_cache import cache_proceso
+    from database.sensor_cache import cache_sensores
+    from services.prediccion_cache import cache_predicciones
+    cache_lecturas.invalidar()
+    cache_sensores.invalidar()
+    cache_proceso.invalidar()
+    cache_predicciones.limpiar()
+    yield
+    cache_lecturas.invalidar()
+    cache_sensores.invalidar()
+    cache_proceso.invalidar()
+    cache_predicciones.limpiar()
@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime, timedelta
+from database.models.lectura import Lectura
+from database.models.sensor import Sensor
+from database.models.proceso_biodigestor import ProcesoBiodigestor
+from database.db_service import (
+    obtener_ultimas_lecturas,
+    obtener_ultima_lectura_combinada,
+    LecturaException
+)
+
+
+@pytest.fixture
+def sensores(session):
+    sensores = [
+        Sensor(nombre="temperatura", tipo="temperatura", unidad="°C"),
+        Sensor(nombre="presion", tipo="presion", unidad="kPa"),
+        Sensor(nombre="gas", tipo="gas", unidad="ppm"),
+        Sensor(nombre="ph", tipo="ph", unidad="pH")
+    ]
+    session.add_all(sensores)
+    session.commit()
+    return sensores
+
+
+class TestUltimasLecturas:
+    """Pruebas de la consulta única de últimas lecturas"""
+
+    def test_ultima_lectura_por_sensor(self, session, sensores):
+        proceso = ProcesoBiodigestor(estado='ACTIVO')
+        session.add(proceso)
+        session.commit()
+
+        base = datetime(2025, 1, 10, 8, 0, 0)
+        for i in range(3):
+            for sensor in sensores:
+                session.add(Lectura(
+                    sensor_id=sensor.id, proceso_id=proceso.id,
+                    valor=sensor.id * 100 + i, fecha_hora=base + timedelta(minutes=i)
+                ))
+        session.commit()
+
+        ultimas = obtener_ultimas_lecturas()
+
+        assert set(ultimas) == {"temperatura", "presion", "gas", "ph"}
+        assert ultimas["ph"]["valor"] == 402
+        assert ultimas["gas"]["fecha_hora"] == base + timedelta(minutes=2)
+
+    def test_ignora_procesos_finalizados(self, session, sensores):
+        anterior = ProcesoBiodigestor(estado='FINALIZADO', fecha_fin=datetime(2025, 1, 1))
+        activo = ProcesoBiodigestor(estado='ACTIVO')
+        session.add_all([anterior, activo])
+        session.commit()
+
+        session.add(Lectura(sensor_id=sensores[0].id, proceso_id=anterior.id,
+                            valor=99, fecha_hora=datetime(2025, 2, 1)))
+        session.add(Lectura(sensor_id=sensores[0].id, proceso_id=activo.id,
+                            valor=30, fecha_hora=datetime(2025, 1, 15)))
+        session.commit()
+
+        assert obtener_ultimas_lecturas()["temperatura"]["valor"] == 30
+        assert obtener_ultimas_lecturas(anterior.id)["temperatura"]["valor"] == 99
+
+    def test_empate_fecha_toma_mayor_id(self, session, sensores):
+        proceso = ProcesoBiodigestor(estado='ACTIVO')
+        session.add(proceso)
+        session.commit()
+
+        fecha = datetime(2025, 1, 10, 8, 0, 0)
+        session.add(Lectura(sensor_id=sensores[0].id, proceso_id=proceso.id, valor=1, fecha_hora=fecha))
+        session.add(Lectura(sensor_id=sensores[0].id, proceso_id=proceso.id, valor=2, fecha_hora=fecha))
+        session.commit()
+
+        assert obtener_ultimas_lecturas()["temperatura"]["valor"] == 2
+
+    def test_sin_proceso_activo(self, session, sensores):
+        assert obtener_ultimas_lecturas() == {}
+
+    def test_combinada_completa(self, session, sensores):
+        proceso = ProcesoBiodigestor(estado='ACTIVO')
+        session.add(proceso)
+        session.commit()
+
+        for sensor, valor in zip(sensores[:3], (35.0, 95.0, 400.0)):
+            session.add(Lectura(sensor_id=sensor.id, proceso_id=proceso.id, valor=valor,
+                                fecha_hora=datetime(2025, 1, 10, 8, sensor.id, 0, 123)))
+        session.commit()
+
+        assert obtener_ultima_lectura_combinada() == (35.0, 95.0, 400.0, "2025-01-10 08:03:00")
+
+    def test_combinada_incompleta(self, session, sensores):
+        proceso = ProcesoBiodigestor(estado='ACTIVO')
+        session.add(proceso)
+        session.commit()
+        session.add(Lectura(sensor_id=sensores[0].id, proceso_id=proceso.id, valor=35.0))
+        session.commit()
+
+        with pytest.raises(LecturaException):
+            obtener_ultima_lectura_combinada()
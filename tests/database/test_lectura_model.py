@@ -114,4 +114,14 @@ class TestLecturaModel:
         lectura_db = session.query(Lectura).filter_by(sensor_id=sensor.id).first()
         assert lectura_db is not None
         assert lectura_db.valor == 7.2
-        assert lectura_db.proceso_id == proceso.id
\ No newline at end of file
+        assert lectura_db.proceso_id == proceso.id
+    def test_indices_consultas_frecuentes(self, session):
+        """Test: La tabla declara los índices compuesto y por fecha"""
+        from sqlalchemy import inspect
+        indices = {
+            i["name"]: i["column_names"]
+            for i in inspect(session.get_bind()).get_indexes("lecturas")
+        }
+
+        assert indices["ix_lecturas_proceso_sensor_fecha"] == ["proceso_id", "sensor_id", "fecha_hora"]
+        assert indices["ix_lecturas_fecha_hora"] == ["fecha_hora"]
@@ -5,6 +5,13 @@ from database.models.sensor import Sensor
 from database.models.proceso_biodigestor import ProcesoBiodigestor
 
 
+@pytest.fixture(autouse=True)
+def inferencia_en_linea(monkeypatch):
+    """Evalúa las predicciones en el hilo del request para que las pruebas sean deterministas"""
+    from services.inferencia_pool import pool_inferencia
+    monkeypatch.setattr(pool_inferencia, "max_hilos", 0)
+
+
 @pytest.fixture
 def app():
     """Crea la app en modo testing con DB en memoria"""
@@ -1,3 +1,9 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+
 class TestAnalisisIA:
 
     def test_analizar_sin_proceso(self, client):
@@ -9,3 +15,234 @@ class TestAnalisisIA:
     def test_analizar_con_proceso_activo(self, client, proceso_activo):
         r = client.get('/api/analizar')
         assert r.status_code == 200
+
+
+class TestAnalisisLote:
+
+    LECTURAS = [
+        {"temperatura": 35.0, "presion": 100.0, "gas": 300, "timestamp": "2030-01-01 08:00:00"},
+        [55.0, 80.0, 900, "2030-01-03 10:00:00"],
+        {"temperatura": 18.5, "presion": 140.0, "gas": 50, "timestamp": "01/01/2030 12:00"}
+    ]
+
+    def test_lote_coincide_con_prediccion_individual(self, app, client, proceso_activo):
+        from services.ai_service import predecir_alerta
+
+        r = client.post('/api/analizar/batch', json={"lecturas": self.LECTURAS})
+        data = r.get_json()
+
+        assert r.status_code == 200
+        assert data["evaluadas"] == 3
+        for indice, item in enumerate(self.LECTURAS):
+            if isinstance(item, dict):
+                item = [item["temperatura"], item["presion"], item["gas"], item["timestamp"]]
+            # /analizar también entrega los valores de sensores como float
+            individual = predecir_alerta(*map(float, item[:3]), item[3])
+            resultado = data["resultados"][indice]
+            assert resultado["indice"] == indice
+            assert {k: resultado[k] for k in individual} == individual
+
+    def test_lote_parcial(self, client, proceso_activo):
+        r = client.post('/api/analizar/batch', json={"lecturas": [
+            self.LECTURAS[0],
+            {"temperatura": "abc", "presion": 1, "gas": 1, "timestamp": "2030-01-01 08:00:00"},
+            [1, 2, 3]
+        ]})
+        data = r.get_json()
+
+        assert r.status_code == 207
+        assert "alerta_ia" in data["resultados"][0]
+        assert "error" in data["resultados"][1]
+        assert "error" in data["resultados"][2]
+
+    def test_lote_timestamp_no_reconocido(self, client, proceso_activo):
+        r = client.post('/api/analizar/batch', json={"lecturas": [
+            self.LECTURAS[0],
+            {"temperatura": 35.0, "presion": 100.0, "gas": 300, "timestamp": "2030-01-01T08:00:00Z"},
+            [35.0, 100.0, 300, "ayer"]
+        ]})
+        data = r.get_json()
+
+        assert r.status_code == 207
+        assert data["evaluadas"] == 1
+        assert "timestamp" in data["resultados"][1]["error"]
+        assert "timestamp" in data["resultados"][2]["error"]
+
+    def test_lote_sin_proceso_activo(self, client):
+        r = client.post('/api/analizar/batch', json={"lecturas": self.LECTURAS})
+        assert r.status_code == 409
+
+    def test_lote_proceso_explicito(self, client):
+        client.post('/api/proceso/iniciar')
+        client.post('/api/proceso/finalizar')
+
+        r = client.post('/api/analizar/batch', json={"proceso_id": 1, "lecturas": self.LECTURAS})
+        assert r.status_code == 200
+
+        r = client.post('/api/analizar/batch', json={"proceso_id": 99, "lecturas": self.LECTURAS})
+        assert r.status_code == 404
+
+    def test_lote_grande(self, client, proceso_activo):
+        lecturas = [[20 + i % 30, 80 + i % 60, i % 1000, "2030-01-02 00:00:00"] for i in range(3000)]
+
+        r = client.post('/api/analizar/batch', json={"lecturas": lecturas})
+
+        assert r.status_code == 200
+        assert len(r.get_json()["resultados"]) == 3000
+
+    def test_lote_vacio(self, client, proceso_activo):
+        assert client.post('/api/analizar/batch', json={"lecturas": []}).status_code == 400
+
+
+class TestPrediccionesGuardadas:
+
+    def _registrar_terna(self, client, temperatura=35, presion=100, gas=300):
+        for sensor_id, valor in ((1, temperatura), (2, presion), (3, gas)):
+            client.post('/api/lecturas', json={"sensor_id": sensor_id, "valor": valor})
+
+    def test_terna_incompleta_no_guarda_prediccion(self, client, init_sensores, proceso_activo):
+        client.post('/api/lecturas', json={"sensor_id": 1, "valor": 35})
+
+        data = client.get('/api/analizar/historial').get_json()
+        assert data["total"] == 0
+
+    def test_terna_completa_guarda_prediccion(self, client, init_sensores, proceso_activo):
+        self._registrar_terna(client)
+
+        data = client.get('/api/analizar/historial').get_json()
+        assert data["total"] == 1
+        prediccion = data["predicciones"][0]
+        assert (prediccion["temperatura"], prediccion["presion"], prediccion["gas"]) == (35, 100, 300)
+        assert prediccion["version_modelo"]
+
+    def test_analizar_devuelve_prediccion_guardada(self, client, init_sensores, proceso_activo):
+        from services.ai_service import predecir_alerta
+        self._registrar_terna(client)
+        guardada = client.get('/api/analizar/historial').get_json()["predicciones"][0]
+
+        with patch('routes.ai_bp.predecir_alerta') as mock_predecir:
+            data = client.get('/api/analizar').get_json()
+
+        mock_predecir.assert_not_called()
+        assert data["fecha_hora"] == guardada["fecha_hora"]
+        assert data["version_modelo"] == guardada["version_modelo"]
+        timestamp = guardada["fecha_hora"].replace("T", " ")
+        esperado = predecir_alerta(35.0, 100.0, 300.0, timestamp)
+        assert {k: data[k] for k in esperado} == esperado
+
+    def test_modelos_recargados_reevaluan_ultima_lectura(self, app, client, init_sensores, proceso_activo):
+        from database.connection import db
+        from database.models.prediccion import Prediccion
+        from services.modelos_ml import modelos_ml
+        self._registrar_terna(client)
+        with app.app_context():
+            Prediccion.query.update({"version_modelo": "anterior"})
+            db.session.commit()
+
+        # Responde con la predicción guardada y reevalúa la terna en el pool
+        data = client.get('/api/analizar').get_json()
+
+        assert data["version_modelo"] == "anterior"
+        historial = client.get('/api/analizar/historial').get_json()
+        assert [p["version_modelo"] for p in historial["predicciones"]] == [modelos_ml.version, "anterior"]
+
+    def test_historial_solo_alertas_y_limite(self, client, init_sensores, proceso_activo):
+        self._registrar_terna(client)
+
+        data = client.get('/api/analizar/historial?solo_alertas=true&limit=5').get_json()
+        assert all(p["alerta_ia"] == 1 for p in data["predicciones"])
+
+        r = client.get('/api/analizar/historial?proceso_id=99')
+        assert r.status_code == 200
+        assert r.get_json()["total"] == 0
+
+    def test_historial_sin_proceso_activo(self, client):
+        assert client.get('/api/analizar/historial').status_code == 404
+
+
+class TestMetricasAnalisis:
+
+    def test_metricas_cuentan_aciertos(self, client, init_sensores, proceso_activo):
+        # La terna completa se evalúa una vez al registrarla (fallo)
+        for sensor_id, valor in ((1, 35), (2, 100), (3, 300)):
+            client.post('/api/lecturas', json={"sensor_id": sensor_id, "valor": valor})
+        # /analizar lee la predicción guardada sin pasar por los modelos
+        client.get('/api/analizar')
+        client.get('/api/analizar')
+        # Una lectura equivalente tras cuantizar reutiliza la entrada (acierto)
+        client.post('/api/lecturas', json={"sensor_id": 1, "valor": 35.04})
+        data = client.get('/api/analizar/metricas').get_json()
+
+        assert data["cache_predicciones"]["fallos"] == 1
+        assert data["cache_predicciones"]["aciertos"] == 1
+        assert data["modelos"]["listo"] is True
+        assert data["pool_inferencia"]["pendientes"] == 0
+        assert data["cache_predicciones"]["version_modelos"] == data["modelos"]["version"]
+
+
+class TestPrediccionEnPool:
+    """Evaluación en un pool con hilos reales (el resto de las pruebas evalúa en línea)"""
+
+    @pytest.fixture
+    def pool(self):
+        from services.inferencia_pool import PoolInferencia
+        pool = PoolInferencia(max_hilos=1, max_pendientes=2, timeout=1)
+        with patch('services.prediccion_service.pool_inferencia', pool):
+            yield pool
+        pool._executor.shutdown(wait=True)
+
+    @pytest.fixture
+    def bloqueo(self):
+        evento = threading.Event()
+        yield evento
+        evento.set()
+
+    def _esperar(self, pool):
+        limite = time.monotonic() + 5
+        while pool.metricas()["pendientes"] and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert pool.metricas()["pendientes"] == 0
+
+    def _registrar(self, client, *lecturas):
+        r = client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": sensor_id, "valor": valor, "fecha_hora": fecha_hora}
+            for sensor_id, valor, fecha_hora in lecturas
+        ]})
+        assert r.status_code == 201
+
+    def _historial(self, client):
+        return client.get('/api/analizar/historial').get_json()["predicciones"]
+
+    def test_escritura_no_espera_a_los_modelos(self, client, init_sensores, proceso_activo, pool, bloqueo):
+        pool.enviar(bloqueo.wait, 5)
+
+        self._registrar(client, (1, 35, "2030-01-01 08:00:00"), (2, 100, "2030-01-01 08:00:00"),
+                        (3, 300, "2030-01-01 08:00:00"))
+        assert self._historial(client) == []
+
+        bloqueo.set()
+        self._esperar(pool)
+        assert [p["temperatura"] for p in self._historial(client)] == [35]
+
+    def test_evaluacion_omitida_se_recupera_en_analizar(self, client, init_sensores, proceso_activo,
+                                                          pool, bloqueo):
+        self._registrar(client, (1, 35, "2030-01-01 08:00:00"), (2, 100, "2030-01-01 08:00:00"),
+                        (3, 300, "2030-01-01 08:00:00"))
+        self._esperar(pool)
+
+        # Pool lleno: la evaluación de la lectura nueva se omite
+        pool.enviar(bloqueo.wait, 5)
+        pool.enviar(bloqueo.wait, 5)
+        self._registrar(client, (1, 20, "2030-01-01 08:05:00"))
+        assert pool.metricas()["rechazadas"] == 1
+        assert client.get('/api/analizar').get_json()["fecha_hora"] == "2030-01-01T08:00:00"
+        assert pool.metricas()["rechazadas"] == 2
+
+        # Con lugar en el pool /analizar vuelve a programar la evaluación
+        bloqueo.set()
+        self._esperar(pool)
+        assert client.get('/api/analizar').get_json()["fecha_hora"] == "2030-01-01T08:00:00"
+        self._esperar(pool)
+
+        assert client.get('/api/analizar').get_json()["fecha_hora"] == "2030-01-01T08:05:00"
+        assert [p["temperatura"] for p in self._historial(client)] == [20, 35]
@@ -0,0 +1,65 @@
+import pandas as pd
+from ml.extractor_lecturas import cargar_dataset, volcar_dataset, etiquetar_con_reglas
+
+
+class TestExtractorLecturas:
+
+    def _registrar(self, client):
+        client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": 1, "valor": 25.0, "fecha_hora": "2030-01-01 08:00:05"},
+            {"sensor_id": 2, "valor": 100.0, "fecha_hora": "2030-01-01 08:00:10"},
+            {"sensor_id": 3, "valor": 300.0, "fecha_hora": "2030-01-01 08:00:15"},
+            {"sensor_id": 1, "valor": 36.0, "fecha_hora": "2030-01-01 08:01:05"},
+            {"sensor_id": 2, "valor": 120.0, "fecha_hora": "2030-01-01 08:02:05"}
+        ]})
+
+    def test_dataset_desde_lecturas(self, app, client, init_sensores, proceso_activo):
+        self._registrar(client)
+
+        with app.app_context():
+            dataset = cargar_dataset(ventana=60, tamano_lote=2, etiquetador=etiquetar_con_reglas)
+
+        assert len(dataset) == 3
+        assert dataset["temperatura_celsius"].tolist() == [25.0, 36.0, 36.0]
+        assert dataset["presion_biogas_kpa"].tolist() == [100.0, 100.0, 120.0]
+        assert (dataset["mq4_ppm"] == 300.0).all()
+        # Lecturas años después del inicio del proceso con CH4 bajo
+        assert (dataset["dia_proceso"] > 7).all()
+        assert dataset["tipo_alerta"].tolist() == ["Temperatura Anormal", "Baja Producción", "Baja Producción"]
+
+    def test_dataset_por_proceso(self, app, init_sensores, proceso_activo):
+        with app.app_context():
+            assert cargar_dataset(procesos=[99]).empty
+
+    def test_sin_etiquetador_no_etiqueta(self, app, client, init_sensores, proceso_activo):
+        self._registrar(client)
+
+        with app.app_context():
+            dataset = cargar_dataset(ventana=60)
+
+        assert len(dataset) == 3
+        assert "alerta_ia" not in dataset.columns
+        assert "tipo_alerta" not in dataset.columns
+
+    def test_volcar_dataset_a_csv(self, app, client, init_sensores, proceso_activo, tmp_path):
+        self._registrar(client)
+        ruta = str(tmp_path / "dataset.csv")
+
+        with app.app_context():
+            total = volcar_dataset(ruta, ventana=60, tamano_lote=2, etiquetador=etiquetar_con_reglas)
+            esperado = cargar_dataset(ventana=60, etiquetador=etiquetar_con_reglas)
+
+        assert total == 3
+        volcado = pd.read_csv(ruta)
+        assert volcado["temperatura_celsius"].tolist() == esperado["temperatura_celsius"].tolist()
+        assert volcado["tipo_alerta"].tolist() == esperado["tipo_alerta"].tolist()
+
+    def test_volcar_dataset_vacio_escribe_encabezado(self, app, init_sensores, proceso_activo, tmp_path):
+        ruta = str(tmp_path / "vacio.csv")
+
+        with app.app_context():
+            assert volcar_dataset(ruta, procesos=[99]) == 0
+
+        assert pd.read_csv(ruta).columns.tolist() == [
+            "proceso_id", "fecha_hora", "temperatura_celsius", "presion_biogas_kpa", "mq4_ppm", "dia_proceso"
+        ]
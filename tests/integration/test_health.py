@@ -4,3 +4,13 @@ def test_health_check_ok(client):
     data = response.get_json()
     assert data['status'] == 'ok'
     assert data['database'] == 'healthy'
+
+
+def test_health_informa_estado_ml(client):
+    from services.modelos_ml import modelos_ml
+    modelos_ml.obtener()
+
+    data = client.get('/health').get_json()
+
+    assert data['ml']['estado'] == 'listo'
+    assert data['ml']['listo'] is True
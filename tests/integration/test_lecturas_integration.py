@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+
 class TestLecturas:
 
     def test_registrar_lectura_exitosa(self, client, init_sensores, proceso_activo):
@@ -31,3 +34,117 @@ class TestLecturas:
         r = client.get('/api/lecturas/1')
         assert r.status_code == 200
         assert len(r.get_json()) == 5
+
+    def test_registrar_lote_exitoso(self, client, init_sensores, proceso_activo):
+        r = client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": 1, "valor": 35.5},
+            {"sensor_id": 2, "valor": 95.0, "fecha_hora": "2025-01-10 08:30:00"},
+            {"sensor_id": 3, "valor": 410}
+        ]})
+        data = r.get_json()
+
+        assert r.status_code == 201
+        assert data["registradas"] == 3
+        assert len(client.get('/api/lecturas/2').get_json()) == 1
+
+    def test_registrar_lote_parcial(self, client, init_sensores, proceso_activo):
+        r = client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": 1, "valor": 35.5},
+            {"sensor_id": 99, "valor": 1}
+        ]})
+        data = r.get_json()
+
+        assert r.status_code == 207
+        assert data["resultados"][1]["estado"] == "rechazada"
+
+    def test_registrar_lote_sin_proceso(self, client, init_sensores):
+        r = client.post('/api/lecturas/batch', json={"lecturas": [{"sensor_id": 1, "valor": 1}]})
+        assert r.status_code == 409
+
+    def test_registrar_lectura_modo_buffer(self, client, init_sensores, proceso_activo):
+        from services.lectura_buffer import buffer_lecturas
+        buffer_lecturas.activo = True
+        try:
+            with patch.object(buffer_lecturas, '_asegurar_hilo'):
+                r = client.post('/api/lecturas', json={"sensor_id": 1, "valor": 35.5})
+            assert r.status_code == 202
+            assert r.get_json()["estado"] == "aceptada"
+
+            assert buffer_lecturas.flush() == 1
+            assert len(client.get('/api/lecturas/1').get_json()) == 1
+        finally:
+            buffer_lecturas.activo = False
+
+    def test_modo_buffer_rechaza_sensor_inexistente(self, client, init_sensores, proceso_activo):
+        from services.lectura_buffer import buffer_lecturas
+        buffer_lecturas.activo = True
+        try:
+            with patch.object(buffer_lecturas, '_asegurar_hilo'):
+                r = client.post('/api/lecturas', json={"sensor_id": 99, "valor": 35.5})
+            assert r.status_code == 404
+            assert buffer_lecturas.pendientes == 0
+        finally:
+            buffer_lecturas.activo = False
+
+    def test_modo_buffer_lleno_responde_503(self, client, init_sensores, proceso_activo):
+        from services.lectura_buffer import buffer_lecturas, FACTOR_CAPACIDAD
+        buffer_lecturas.activo = True
+        try:
+            with patch.object(buffer_lecturas, '_asegurar_hilo'), \
+                    patch.object(buffer_lecturas, '_filas', [{}] * (buffer_lecturas.max_filas * FACTOR_CAPACIDAD)):
+                r = client.post('/api/lecturas', json={"sensor_id": 1, "valor": 35.5})
+            assert r.status_code == 503
+            assert int(r.headers["Retry-After"]) >= 1
+        finally:
+            buffer_lecturas.activo = False
+
+    def test_lecturas_por_sensor_refleja_nuevas_escrituras(self, client, init_sensores, proceso_activo):
+        client.post('/api/lecturas', json={"sensor_id": 1, "valor": 1})
+        assert len(client.get('/api/lecturas/1').get_json()) == 1
+
+        # La segunda lectura se incorpora a la caché sin esperar al TTL
+        client.post('/api/lecturas', json={"sensor_id": 1, "valor": 2})
+        data = client.get('/api/lecturas/1').get_json()
+
+        assert [l["valor"] for l in data] == [2, 1]
+
+    def test_listado_por_cursor_recorre_todo(self, client, init_sensores, proceso_activo):
+        client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": 1, "valor": i, "fecha_hora": f"2025-01-10 08:{i // 2:02d}:00"}
+            for i in range(25)
+        ]})
+
+        vistos = []
+        r = client.get('/api/lecturas?after=&per_page=10')
+        data = r.get_json()
+        assert r.status_code == 200
+        assert data["total"] is None
+        vistos += [l["id"] for l in data["lecturas"]]
+
+        while data["next_cursor"]:
+            data = client.get('/api/lecturas', query_string={
+                "after": data["next_cursor"], "per_page": 10
+            }).get_json()
+            vistos += [l["id"] for l in data["lecturas"]]
+
+        assert len(vistos) == 25
+        assert len(set(vistos)) == 25
+
+    def test_listado_por_cursor_con_conteo(self, client, init_sensores, proceso_activo):
+        for i in range(3):
+            client.post('/api/lecturas', json={"sensor_id": 1, "valor": i})
+
+        data = client.get('/api/lecturas?after=&count=exacto').get_json()
+        assert data["total"] == 3
+
+    def test_listado_cursor_invalido(self, client):
+        r = client.get('/api/lecturas?after=no-es-un-cursor')
+        assert r.status_code == 400
+
+    def test_listado_paginado_sin_conteo(self, client, init_sensores, proceso_activo):
+        client.post('/api/lecturas', json={"sensor_id": 1, "valor": 1})
+
+        data = client.get('/api/lecturas?page=1&count=ninguno').get_json()
+
+        assert len(data["lecturas"]) == 1
+        assert data["total"] is None
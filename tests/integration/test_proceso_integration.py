@@ -1,3 +1,9 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+
 class TestProceso:
 
     def test_iniciar_proceso(self, client):
@@ -25,3 +31,93 @@ class TestProceso:
     def test_finalizar_sin_proceso(self, client):
         r = client.post('/api/proceso/finalizar')
         assert r.status_code == 400
+
+
+class TestExportarLecturas:
+
+    def _registrar(self, client):
+        client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": 1, "valor": 35.5, "fecha_hora": "2025-01-10 08:00:00"},
+            {"sensor_id": 2, "valor": 98.1, "fecha_hora": "2025-01-10 08:00:05"},
+            {"sensor_id": 3, "valor": 410, "fecha_hora": "2025-01-10 08:00:10"}
+        ]})
+
+    def test_exportar_ndjson(self, client, init_sensores, proceso_activo):
+        self._registrar(client)
+
+        r = client.get('/api/proceso/1/lecturas/export')
+        lineas = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+
+        assert r.status_code == 200
+        assert r.mimetype == "application/x-ndjson"
+        assert [l["sensor"] for l in lineas] == ["temperatura", "presion", "gas"]
+        assert lineas[0]["valor"] == 35.5
+        assert lineas[0]["fecha_hora"] == "2025-01-10T08:00:00"
+
+    def test_exportar_csv_por_lotes(self, client, init_sensores, proceso_activo):
+        self._registrar(client)
+
+        with patch('services.lectura_service.TAMANO_LOTE_EXPORTACION', 2):
+            r = client.get('/api/proceso/1/lecturas/export?format=csv')
+            filas = list(csv.reader(io.StringIO(r.get_data(as_text=True))))
+
+        assert r.status_code == 200
+        assert "proceso_1_lecturas.csv" in r.headers["Content-Disposition"]
+        assert filas[0] == ["id", "sensor_id", "sensor", "valor", "fecha_hora", "observaciones"]
+        assert len(filas) == 4
+        assert filas[3][2] == "gas"
+
+    def test_exportar_proceso_sin_lecturas(self, client, proceso_activo):
+        r = client.get('/api/proceso/1/lecturas/export')
+        assert r.status_code == 200
+        assert r.get_data() == b""
+
+    def test_exportar_proceso_inexistente(self, client):
+        r = client.get('/api/proceso/99/lecturas/export')
+        assert r.status_code == 404
+
+    def test_exportar_formato_invalido(self, client, proceso_activo):
+        r = client.get('/api/proceso/1/lecturas/export?format=xml')
+        assert r.status_code == 400
+
+
+class TestCacheProcesoActivo:
+
+    def test_analizar_una_consulta_de_proceso(self, app, client, init_sensores, proceso_activo):
+        from sqlalchemy import event
+        from database.connection import db
+        from database.proceso_cache import cache_proceso
+
+        for sensor_id, valor in ((1, 35), (2, 100), (3, 300)):
+            client.post('/api/lecturas', json={"sensor_id": sensor_id, "valor": valor})
+        cache_proceso.invalidar()
+
+        consultas = []
+
+        def contar(conn, cursor, sentencia, parametros, context, executemany):
+            if "FROM proceso_biodigestor" in sentencia:
+                consultas.append(sentencia)
+
+        event.listen(db.engine, "before_cursor_execute", contar)
+        try:
+            assert client.get('/api/analizar').status_code == 200
+            assert client.get('/api/analizar').status_code == 200
+        finally:
+            event.remove(db.engine, "before_cursor_execute", contar)
+
+        assert len(consultas) == 1
+
+    def test_finalizar_invalida_cache(self, client, proceso_activo):
+        assert client.get('/api/proceso/estado').get_json()['proceso_activo'] is True
+
+        client.post('/api/proceso/finalizar')
+
+        assert client.get('/api/proceso/estado').get_json()['proceso_activo'] is False
+        assert client.post('/api/lecturas', json={"sensor_id": 1, "valor": 1}).status_code != 201
+
+    def test_iniciar_invalida_cache(self, client):
+        assert client.get('/api/proceso/estado').get_json()['proceso_activo'] is False
+
+        client.post('/api/proceso/iniciar')
+
+        assert client.get('/api/proceso/estado').get_json()['proceso_activo'] is True
@@ -0,0 +1,118 @@
+import pytest
+from database.connection import db
+from database.models.lectura_rollup import LecturaRollup
+
+
+class TestSeries:
+
+    def _lote(self, client, valores, sensor_id=1):
+        return client.post('/api/lecturas/batch', json={"lecturas": [
+            {"sensor_id": sensor_id, "valor": v, "fecha_hora": f}
+            for v, f in valores
+        ]})
+
+    def test_serie_por_minuto(self, client, init_sensores, proceso_activo):
+        self._lote(client, [
+            (10, "2025-01-10 08:00:10"),
+            (20, "2025-01-10 08:00:40"),
+            (40, "2025-01-10 08:01:05")
+        ])
+
+        r = client.get('/api/lecturas/1/serie', query_string={
+            "desde": "2025-01-10 08:00:00", "hasta": "2025-01-10 08:05:00"
+        })
+        data = r.get_json()
+
+        assert r.status_code == 200
+        assert data["bucket"] == "1m"
+        assert data["puntos"][0] == {
+            "inicio": "2025-01-10T08:00:00", "min": 10, "max": 20,
+            "avg": 15, "count": 2, "last": 20
+        }
+        assert data["puntos"][1]["count"] == 1
+
+    def test_serie_incremental_y_bucket_explicito(self, client, init_sensores, proceso_activo):
+        self._lote(client, [(10, "2025-01-10 08:00:00")])
+        self._lote(client, [(30, "2025-01-10 08:59:00")])
+
+        data = client.get('/api/lecturas/1/serie', query_string={
+            "desde": "2025-01-10 00:00:00", "hasta": "2025-01-10 23:59:59", "bucket": "1h"
+        }).get_json()
+
+        assert len(data["puntos"]) == 1
+        assert data["puntos"][0]["avg"] == 20
+        assert data["puntos"][0]["last"] == 30
+
+    def test_serie_lectura_individual(self, client, init_sensores, proceso_activo):
+        client.post('/api/lecturas', json={"sensor_id": 2, "valor": 95})
+
+        data = client.get('/api/lecturas/2/serie?bucket=1d').get_json()
+
+        assert data["puntos"][0]["count"] == 1
+
+    def test_serie_bucket_invalido(self, client, init_sensores, proceso_activo):
+        r = client.get('/api/lecturas/1/serie?bucket=5m')
+        assert r.status_code == 400
+
+    def test_serie_sin_proceso(self, client, init_sensores):
+        r = client.get('/api/lecturas/1/serie')
+        assert r.status_code == 200
+        assert r.get_json()["puntos"] == []
+
+    def test_reconstruir_rollups(self, app, client, init_sensores, proceso_activo):
+        from services.rollup_service import reconstruir_rollups
+        self._lote(client, [(10, "2025-01-10 08:00:00"), (20, "2025-01-10 09:00:00")])
+
+        with app.app_context():
+            LecturaRollup.query.delete()
+            db.session.commit()
+
+            assert reconstruir_rollups() == 2
+            # Reconstruir de nuevo no duplica conteos
+            reconstruir_rollups()
+            dia = LecturaRollup.query.filter_by(bucket="1d").one()
+            assert dia.conteo == 2
+            assert dia.ultimo_valor == 20
+
+    def test_serie_cruda_reducida_con_lttb(self, client, init_sensores, proceso_activo):
+        self._lote(client, [
+            (i % 7, f"2025-01-10 {8 + i // 60:02d}:{i % 60:02d}:00") for i in range(300)
+        ])
+
+        data = client.get('/api/lecturas/1/serie', query_string={
+            "bucket": "raw", "max_puntos": 50,
+            "desde": "2025-01-10 00:00:00", "hasta": "2025-01-11 00:00:00"
+        }).get_json()
+
+        assert data["downsampling"] == "lttb"
+        assert data["total_lecturas"] == 300
+        assert len(data["puntos"]) == 50
+        assert data["puntos"][0]["fecha_hora"] == "2025-01-10T08:00:00"
+
+    def test_serie_cruda_promedio_para_barras(self, client, init_sensores, proceso_activo):
+        client.post('/api/graficas/update', json={"sensor_id": 1, "tipo_grafica": "barra"})
+        self._lote(client, [(i, f"2025-01-10 08:{i:02d}:00") for i in range(10)])
+
+        data = client.get('/api/lecturas/1/serie', query_string={
+            "bucket": "raw", "max_puntos": 5,
+            "desde": "2025-01-10 00:00:00", "hasta": "2025-01-11 00:00:00"
+        }).get_json()
+
+        assert data["downsampling"] == "promedio"
+        assert [p["valor"] for p in data["puntos"]] == [0.5, 2.5, 4.5, 6.5, 8.5]
+        assert data["puntos"][0]["fecha_hora"] == "2025-01-10T08:00:30"
+
+    def test_serie_cruda_rango_excesivo(self, app, client, init_sensores, proceso_activo):
+        from datetime import datetime
+        from exceptions.custom_exceptions import ValidationException
+        from services.lectura_service import obtener_serie_cruda
+        self._lote(client, [(i, f"2025-01-10 08:{i:02d}:00") for i in range(10)])
+
+        with app.app_context():
+            desde, hasta = datetime(2025, 1, 10), datetime(2025, 1, 11)
+            assert obtener_serie_cruda(1, 1, desde, hasta, max_lecturas=10)[2] == 10
+            with pytest.raises(ValidationException) as exc:
+                obtener_serie_cruda(1, 1, desde, hasta, max_lecturas=9)
+
+        assert exc.value.status_code == 400
+        assert "bucket=1h" in str(exc.value)
@@ -1,9 +1,32 @@
 """
 locustfile_fixed.py - RUTAS CORRECTAS para tu backend
+
+Escenarios:
+  - FixedLoadUser: consultas GET de lectura general.
+  - BiodigestorUser: cada usuario es un biodigestor que envía temperatura,
+    presión y gas cada CARGA_INTERVALO_LECTURAS segundos (una lectura por
+    sensor o un solo POST /api/lecturas/batch, según CARGA_ENVIO).
+  - DashboardUser: dashboards que consultan /api/analizar cada
+    CARGA_INTERVALO_DASHBOARD segundos y, a veces, la serie de un sensor.
+
+Variables: CARGA_BIODIGESTORES (default 10), CARGA_DASHBOARDS (default 5),
+CARGA_INTERVALO_LECTURAS (10), CARGA_INTERVALO_DASHBOARD (5),
+CARGA_ENVIO (individual | batch) y CARGA_SALIDA (JSON con el reporte).
+
+Al terminar se imprimen p50/p95/p99 por endpoint y, si el servidor es
+tests/load_test/servidor_local.py, las consultas SQL por request.
+
+Uso (desde la raíz del proyecto):
+    python tests/load_test/servidor_local.py --nueva
+    CARGA_BIODIGESTORES=50 CARGA_DASHBOARDS=10 locust -f tests/load_test/locustfile.py \
+        --headless -u 60 -r 10 -t 5m BiodigestorUser DashboardUser
 """
 
-from locust import HttpUser, task, between
+from locust import HttpUser, task, between, constant_pacing, events
+import json
+import os
 import random
+import requests
 from datetime import datetime
 
 BASE_URL = "http://localhost:5000"
@@ -78,4 +101,138 @@ class FixedLoadUser(HttpUser):
         # Primero verificar si existe
         with self.client.get("/api/graficas", headers=HEADERS, catch_response=True) as response:
             if response.status_code != 404:
-                response.success()
\ No newline at end of file
+                response.success()
+
+
+SENSORES_DEFAULT = {"temperatura": 1, "presion": 2, "gas": 3}
+PERCENTILES_REPORTE = (0.50, 0.95, 0.99)
+
+
+def _entero_env(nombre, default):
+    return int(os.environ.get(nombre, default))
+
+
+class BiodigestorUser(HttpUser):
+    """Un biodigestor que envía sus tres sensores a ritmo constante"""
+    host = BASE_URL
+    fixed_count = _entero_env("CARGA_BIODIGESTORES", 10)
+    wait_time = constant_pacing(float(os.environ.get("CARGA_INTERVALO_LECTURAS", 10)))
+
+    def on_start(self):
+        self.sensores = dict(SENSORES_DEFAULT)
+        respuesta = self.client.get("/api/sensores", headers=HEADERS, name="/api/sensores")
+        if respuesta.status_code == 200:
+            for sensor in respuesta.json():
+                if sensor.get("nombre") in self.sensores:
+                    self.sensores[sensor["nombre"]] = sensor["id"]
+        # Cada biodigestor parte de un estado propio y deriva lentamente
+        self.valores = {
+            "temperatura": random.uniform(33, 38),
+            "presion": random.uniform(100, 600),
+            "gas": random.uniform(2500, 6000),
+        }
+
+    def _siguiente_lectura(self):
+        limites = {"temperatura": (20, 42), "presion": (60, 900), "gas": (200, 7000)}
+        pasos = {"temperatura": 0.3, "presion": 15, "gas": 120}
+        for nombre, valor in self.valores.items():
+            minimo, maximo = limites[nombre]
+            self.valores[nombre] = min(max(valor + random.gauss(0, pasos[nombre]), minimo), maximo)
+        return [
+            {"sensor_id": self.sensores[nombre], "valor": round(valor, 2)}
+            for nombre, valor in self.valores.items()
+        ]
+
+    @task
+    def enviar_lecturas(self):
+        """POST /api/lecturas por sensor o un POST /api/lecturas/batch"""
+        lecturas = self._siguiente_lectura()
+        if os.environ.get("CARGA_ENVIO", "individual") == "batch":
+            with self.client.post("/api/lecturas/batch", json={"lecturas": lecturas}, headers=HEADERS,
+                                  name="/api/lecturas/batch", catch_response=True) as response:
+                if response.status_code == 201:
+                    response.success()
+                else:
+                    response.failure(f"Batch: {response.status_code}")
+            return
+
+        for lectura in lecturas:
+            with self.client.post("/api/lecturas", json=lectura, headers=HEADERS,
+                                  name="/api/lecturas", catch_response=True) as response:
+                # 202: aceptada por el buffer write-behind
+                if response.status_code in (201, 202):
+                    response.success()
+                else:
+                    response.failure(f"Lectura: {response.status_code}")
+
+
+class DashboardUser(HttpUser):
+    """Un dashboard abierto que consulta el análisis IA periódicamente"""
+    host = BASE_URL
+    fixed_count = _entero_env("CARGA_DASHBOARDS", 5)
+    wait_time = constant_pacing(float(os.environ.get("CARGA_INTERVALO_DASHBOARD", 5)))
+
+    @task(5)
+    def analizar(self):
+        """GET /api/analizar"""
+        with self.client.get("/api/analizar", headers=HEADERS, name="/api/analizar",
+                             catch_response=True) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"Analizar: {response.status_code}")
+
+    @task(1)
+    def serie_sensor(self):
+        """GET /api/lecturas/<sensor_id>/serie de la gráfica"""
+        sensor_id = random.choice(list(SENSORES_DEFAULT.values()))
+        with self.client.get(f"/api/lecturas/{sensor_id}/serie", headers=HEADERS,
+                             name="/api/lecturas/<int:sensor_id>/serie", catch_response=True) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"Serie: {response.status_code}")
+
+
+@events.test_start.add_listener
+def reiniciar_conteo(environment, **kwargs):
+    """Pone en cero el conteo de consultas del servidor local (si existe)"""
+    try:
+        requests.post(f"{environment.host or BASE_URL}/_carga/reiniciar", timeout=5)
+    except requests.RequestException:
+        pass
+
+
+@events.test_stop.add_listener
+def reportar(environment, **kwargs):
+    """p50/p95/p99 por endpoint y consultas SQL por request (servidor local)"""
+    try:
+        respuesta = requests.get(f"{environment.host or BASE_URL}/_carga/consultas", timeout=5)
+        consultas = respuesta.json() if respuesta.status_code == 200 else {}
+    except (requests.RequestException, ValueError):
+        consultas = {}
+
+    reporte = {}
+    for (nombre, metodo), entrada in sorted(environment.stats.entries.items()):
+        if not entrada.num_requests:
+            continue
+        reporte[f"{metodo} {nombre}"] = {
+            "requests": entrada.num_requests,
+            "fallos": entrada.num_failures,
+            "rps": round(entrada.total_rps, 2),
+            **{f"p{int(p * 100)}_ms": entrada.get_response_time_percentile(p) for p in PERCENTILES_REPORTE},
+            "consultas_por_request": consultas.get(f"{metodo} {nombre}", {}).get("consultas_por_request"),
+        }
+
+    print(f"\n{'endpoint':<48}{'req':>8}{'fallos':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'SQL/req':>9}")
+    for endpoint, fila in reporte.items():
+        sql = fila["consultas_por_request"]
+        print(f"{endpoint:<48}{fila['requests']:>8}{fila['fallos']:>8}{fila['p50_ms']:>8}"
+              f"{fila['p95_ms']:>8}{fila['p99_ms']:>8}{sql if sql is not None else '-':>9}")
+    if consultas.get("(segundo plano)"):
+        print(f"Consultas en segundo plano (buffer, recargas): {consultas['(segundo plano)']['consultas']}")
+
+    salida = os.environ.get("CARGA_SALIDA")
+    if salida:
+        with open(salida, "w", encoding="utf-8") as f:
+            json.dump({"endpoints": reporte, "consultas_servidor": consultas}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,146 @@
+"""
+Servidor local para las pruebas de carga, con SQLite en lugar de MySQL.
+
+Crea las tablas, los sensores temperatura/presion/gas y un proceso ACTIVO,
+y cuenta las consultas SQL que hace cada endpoint (más las de los hilos en
+segundo plano, como el vaciado del buffer de lecturas):
+
+    GET  /_carga/consultas   requests, consultas y consultas por request por endpoint
+    POST /_carga/reiniciar   pone los contadores en cero
+
+Las latencias con SQLite solo son orientativas; el número de consultas por
+request es el mismo que con MySQL. Para dimensionar con la BD real se corre
+locust contra el despliegue (sin conteo de consultas).
+
+Uso (desde la raíz del proyecto):
+    python tests/load_test/servidor_local.py --puerto 5000
+    LECTURAS_BUFFER_ACTIVO=true python tests/load_test/servidor_local.py --nueva
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, RAIZ)
+
+from flask import jsonify, request, has_request_context
+from sqlalchemy import event
+
+SEGUNDO_PLANO = "(segundo plano)"
+
+
+class ContadorConsultas:
+    """Requests y consultas SQL por endpoint (regla de URL y método)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.requests = defaultdict(int)
+            self.consultas = defaultdict(int)
+
+    @staticmethod
+    def endpoint():
+        if not has_request_context():
+            return SEGUNDO_PLANO
+        regla = request.url_rule.rule if request.url_rule else request.path
+        return f"{request.method} {regla}"
+
+    def contar_request(self):
+        with self._lock:
+            self.requests[self.endpoint()] += 1
+
+    def contar_consulta(self, *_):
+        with self._lock:
+            self.consultas[self.endpoint()] += 1
+
+    def resumen(self):
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": self.requests.get(endpoint, 0),
+                    "consultas": self.consultas.get(endpoint, 0),
+                    "consultas_por_request": (
+                        round(self.consultas.get(endpoint, 0) / self.requests[endpoint], 2)
+                        if self.requests.get(endpoint) else None
+                    )
+                }
+                for endpoint in sorted(set(self.requests) | set(self.consultas))
+                if not endpoint.startswith(("GET /_carga", "POST /_carga"))
+            }
+
+
+def _sqlite_concurrente(conexion, _):
+    # WAL permite leer mientras otro hilo escribe; las escrituras esperan al lock
+    cursor = conexion.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def poblar(db, dias_proceso=10):
+    """Sensores del modelo y un proceso ACTIVO (si aún no existen)"""
+    from database.models.sensor import Sensor
+    from database.models.proceso_biodigestor import ProcesoBiodigestor
+
+    db.create_all()
+    for nombre, unidad in (("temperatura", "°C"), ("presion", "kPa"), ("gas", "ppm")):
+        if not Sensor.query.filter_by(nombre=nombre).first():
+            db.session.add(Sensor(nombre=nombre, tipo=nombre, unidad=unidad))
+    if not ProcesoBiodigestor.query.filter_by(estado="ACTIVO").first():
+        db.session.add(ProcesoBiodigestor(
+            estado="ACTIVO", fecha_inicio=datetime.now() - timedelta(days=dias_proceso)
+        ))
+    db.session.commit()
+
+
+def crear_app_local(ruta_bd):
+    """App con SQLite en ruta_bd, datos iniciales y conteo de consultas"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(ruta_bd)}?timeout=30"
+    from main import create_app
+    from database.connection import db
+
+    app = create_app()
+    contador = ContadorConsultas()
+    with app.app_context():
+        event.listen(db.engine, "connect", _sqlite_concurrente)
+        db.engine.dispose()
+        poblar(db)
+        event.listen(db.engine, "before_cursor_execute", contador.contar_consulta)
+
+    app.before_request(contador.contar_request)
+
+    @app.get("/_carga/consultas")
+    def consultas_carga():
+        return jsonify(contador.resumen()), 200
+
+    @app.post("/_carga/reiniciar")
+    def reiniciar_carga():
+        contador.reiniciar()
+        return jsonify({"message": "Contadores reiniciados"}), 200
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local (SQLite) para las pruebas de carga")
+    parser.add_argument("--bd", default=os.path.join(tempfile.gettempdir(), "bmis_carga.db"),
+                        help="Archivo SQLite")
+    parser.add_argument("--puerto", type=int, default=5000)
+    parser.add_argument("--nueva", action="store_true", help="Borrar la BD antes de iniciar")
+    args = parser.parse_args()
+
+    if args.nueva:
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(args.bd + sufijo):
+                os.remove(args.bd + sufijo)
+
+    app = crear_app_local(args.bd)
+    print(f"🧪 Servidor de carga en http://localhost:{args.puerto} (BD {args.bd})")
+    app.run(host="0.0.0.0", port=args.puerto, threaded=True)
@@ -0,0 +1,104 @@
+"""
+Pruebas Unitarias para la búsqueda de hiperparámetros
+Ejecutar: pytest tests/unit/test_buscar_hiperparametros.py -v
+"""
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from ml.buscar_hiperparametros import buscar, candidatos, elegir_modelo, guardar_modelo
+
+
+def resultado(nombre, precision, latencia, compilado=None, tamano=10.0):
+    return {
+        "nombre": nombre, "precision": precision, "latencia_ms": latencia,
+        "latencia_compilado_ms": compilado, "tamano_kb": tamano, "servible": compilado is not None
+    }
+
+
+def datos():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(120, 4))
+    return X, (X[:, 0] > 5).astype(int)
+
+
+class TestBuscarHiperparametros:
+    """Pruebas para la comparación de candidatos"""
+
+    def test_elige_el_mas_barato_que_cumple(self):
+        """Test: Se prefiere el candidato apto de menor latencia, no el más preciso"""
+        resultados = [
+            resultado("grande", 0.99, 5.0, compilado=0.20),
+            resultado("mediano", 0.96, 2.0, compilado=0.05),
+            resultado("arbol", 0.97, 0.10),
+            resultado("impreciso", 0.80, 0.01),
+        ]
+
+        assert elegir_modelo(resultados, 0.95)["nombre"] == "mediano"
+        assert elegir_modelo(resultados, 0.98)["nombre"] == "grande"
+        assert elegir_modelo(resultados, 0.999) is None
+
+    def test_empate_por_tamano(self):
+        """Test: Con la misma latencia gana el modelo más pequeño"""
+        resultados = [
+            resultado("a", 0.96, 1.0, compilado=0.1, tamano=50.0),
+            resultado("b", 0.96, 1.0, compilado=0.1, tamano=5.0)
+        ]
+
+        assert elegir_modelo(resultados, 0.9)["nombre"] == "b"
+
+    def test_solo_recomienda_modelos_servibles(self):
+        """Test: Un árbol o gradient boosting más barato no se recomienda: la app solo sirve bosques"""
+        resultados = [resultado("arbol", 0.99, 0.01), resultado("rf", 0.96, 2.0, compilado=0.05)]
+
+        assert elegir_modelo(resultados, 0.95)["nombre"] == "rf"
+        assert elegir_modelo(resultados, 0.98) is None
+
+    def test_candidatos_incluyen_modelos_pequenos(self):
+        """Test: La grilla incluye bosques y alternativas más baratas"""
+        modelos = {clase.__name__ for _, clase, _ in candidatos()}
+
+        assert {"RandomForestClassifier", "DecisionTreeClassifier", "HistGradientBoostingClassifier"} <= modelos
+
+    def test_buscar_reporta_precision_latencia_y_tamano(self):
+        """Test: Cada candidato reporta precisión, latencia y tamaño"""
+        X, y = datos()
+        lista = [
+            ("rf", RandomForestClassifier, {"n_estimators": 5, "random_state": 0, "n_jobs": 1}),
+            ("arbol", DecisionTreeClassifier, {"random_state": 0}),
+        ]
+
+        modelos = {}
+        resultados = buscar(X, y, lista=lista, procesos=2, modelos=modelos)
+
+        assert [r["nombre"] for r in resultados] == ["rf", "arbol"]
+        for r in resultados:
+            assert 0.8 <= r["precision"] <= 1.0
+            assert r["latencia_ms"] > 0 and r["tamano_kb"] > 0
+        assert resultados[0]["latencia_compilado_ms"] > 0
+        assert resultados[1]["latencia_compilado_ms"] is None
+        assert [r["servible"] for r in resultados] == [True, False]
+        assert isinstance(modelos["rf"], RandomForestClassifier)
+        assert isinstance(modelos["arbol"], DecisionTreeClassifier)
+
+    def test_guardar_modelo_reemplaza_pkl(self, tmp_path):
+        """Test: El modelo se escribe completo y no deja el temporal"""
+        X, y = datos()
+        ruta = str(tmp_path / "modelo_alerta.pkl")
+        joblib.dump("anterior", ruta)
+        modelo = RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y)
+
+        guardar_modelo(modelo, ruta)
+
+        assert (joblib.load(ruta).predict(X) == modelo.predict(X)).all()
+        assert not (tmp_path / "modelo_alerta.pkl.tmp").exists()
+
+    def test_guardar_modelo_no_servible_falla(self, tmp_path):
+        """Test: Un modelo que la app no puede servir no reemplaza al .pkl"""
+        X, y = datos()
+        ruta = tmp_path / "modelo_alerta.pkl"
+
+        with pytest.raises(ValueError):
+            guardar_modelo(DecisionTreeClassifier().fit(X, y), str(ruta))
+        assert not ruta.exists()
@@ -32,6 +32,20 @@ class TestDatetimeUtils:
         assert resultado.tzinfo is not None
         assert resultado.tzinfo == timezone.utc
     
+    @pytest.mark.parametrize("timestamp_str,esperado", [
+        ("2025-11-15T19:30:00Z", datetime(2025, 11, 15, 19, 30, tzinfo=timezone.utc)),
+        ("2025-11-15T19:30:00+00:00", datetime(2025, 11, 15, 19, 30, tzinfo=timezone.utc)),
+        ("2025-11-15T21:30:00.250+02:00", datetime(2025, 11, 15, 19, 30, 0, 250000, tzinfo=timezone.utc)),
+    ])
+    def test_parse_timestamp_iso_con_zona(self, timestamp_str, esperado):
+        """Test: Parsear ISO 8601 con Z u offset"""
+        from utils.datetime_utils import parse_timestamp
+
+        resultado = parse_timestamp(timestamp_str)
+
+        assert resultado == esperado
+        assert resultado.tzinfo is not None
+
     def test_parse_timestamp_formato_invalido(self):
         """Test: Error al parsear formato inválido"""
         from utils.datetime_utils import parse_timestamp
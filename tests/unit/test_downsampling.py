@@ -0,0 +1,73 @@
+"""
+Pruebas Unitarias para utilidades de downsampling
+Ejecutar: pytest tests/unit/test_downsampling.py -v
+"""
+import pytest
+import numpy as np
+from utils.downsampling import lttb, promedio_por_bucket
+
+
+def lttb_referencia(x, y, n_puntos):
+    """Implementación directa (bucle puro) del algoritmo LTTB"""
+    n = len(x)
+    cada = (n - 2) / (n_puntos - 2)
+    seleccion = [0]
+    a = 0
+    for i in range(n_puntos - 2):
+        inicio = int(np.floor(i * cada)) + 1
+        fin = int(np.floor((i + 1) * cada)) + 1
+        sig_inicio, sig_fin = fin, min(int(np.floor((i + 2) * cada)) + 1, n)
+        if i == n_puntos - 3:
+            sig_inicio, sig_fin = n - 1, n
+        cx = sum(x[sig_inicio:sig_fin]) / (sig_fin - sig_inicio)
+        cy = sum(y[sig_inicio:sig_fin]) / (sig_fin - sig_inicio)
+        mejor, mejor_area = inicio, -1
+        for j in range(inicio, fin):
+            area = abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a]))
+            if area > mejor_area:
+                mejor, mejor_area = j, area
+        seleccion.append(mejor)
+        a = mejor
+    seleccion.append(n - 1)
+    return seleccion
+
+
+class TestDownsampling:
+    """Pruebas para LTTB y promedio por bucket"""
+
+    @pytest.mark.parametrize("n,n_puntos", [(1000, 50), (1001, 100), (37, 5), (10, 3)])
+    def test_lttb_coincide_con_referencia(self, n, n_puntos):
+        """Test: La versión vectorizada selecciona los mismos puntos"""
+        rng = np.random.default_rng(42)
+        x = np.cumsum(rng.uniform(1, 5, n))
+        y = np.sin(x / 20) * 10 + rng.normal(0, 1, n)
+
+        assert list(lttb(x, y, n_puntos)) == lttb_referencia(list(x), list(y), n_puntos)
+
+    def test_lttb_conserva_extremos_y_picos(self):
+        """Test: Primer y último punto se conservan, y también un pico aislado"""
+        x = np.arange(10000, dtype=float)
+        y = np.zeros(10000)
+        y[4321] = 100.0
+
+        indices = lttb(x, y, 100)
+
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 9999
+        assert 4321 in indices
+
+    def test_lttb_serie_corta_sin_cambios(self):
+        """Test: Con menos puntos que el máximo se retornan todos"""
+        assert list(lttb([1, 2, 3], [1, 2, 3], 10)) == [0, 1, 2]
+
+    def test_lttb_minimo_tres_puntos(self):
+        """Test: Error si se piden menos de 3 puntos"""
+        with pytest.raises(ValueError):
+            lttb(range(10), range(10), 2)
+
+    def test_promedio_por_bucket(self):
+        """Test: Promedios por bucket de tamaño fijo"""
+        x, y = promedio_por_bucket(np.arange(6), [1, 3, 5, 7, 9, 11], 3)
+
+        assert list(x) == [0.5, 2.5, 4.5]
+        assert list(y) == [2, 6, 10]
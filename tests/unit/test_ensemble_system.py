@@ -0,0 +1,95 @@
+"""
+Pruebas Unitarias para el ensemble vectorizado
+Ejecutar: pytest tests/unit/test_ensemble_system.py -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from ml.ensemble_system import SistemaAlertaOptimizado, COLUMNAS
+
+
+class ModeloFijo:
+    """Modelo de prueba: predice con una función de las columnas y cuenta llamadas"""
+
+    def __init__(self, funcion):
+        self.funcion = funcion
+        self.llamadas = []
+
+    def predict(self, X):
+        self.llamadas.append(len(X))
+        return np.asarray(self.funcion(X))
+
+
+@pytest.fixture
+def sistema():
+    sistema = SistemaAlertaOptimizado.__new__(SistemaAlertaOptimizado)
+    # Alerta con CH4 alto; el optimizado además con presión alta
+    sistema.modelo_original_alerta = ModeloFijo(lambda X: (X["mq4_ppm"] > 6000).astype(int))
+    sistema.modelo_original_tipo = ModeloFijo(lambda X: ["Concentración CH4 Alta"] * len(X))
+    sistema.modelo_optimizado_alerta = ModeloFijo(
+        lambda X: ((X["mq4_ppm"] > 6000) | (X["presion_biogas_kpa"] > 580)).astype(int)
+    )
+    sistema.modelo_optimizado_tipo = ModeloFijo(
+        lambda X: np.where(X["presion_biogas_kpa"] > 580, "Presión Alta", "Concentración CH4 Alta")
+    )
+    sistema.usar_optimizado = True
+    return sistema
+
+
+CASOS = pd.DataFrame([
+    [25.0, 500.0, 5200.0, 13],   # regla de temperatura
+    [36.0, 600.0, 1800.0, 21],   # baja producción + voto del optimizado
+    [36.5, 350.0, 5200.0, 12],   # normal
+    [37.0, 1180.0, 6500.0, 28],  # presión crítica, ambos modelos alertan
+    [36.5, 400.0, 6800.0, 10],   # solo modelos
+    [20.0, 900.0, 1000.0, 9],    # tres reglas: gana la de mayor confianza
+], columns=COLUMNAS)
+
+
+class TestEnsembleLote:
+    """Pruebas para SistemaAlertaOptimizado.predecir_lote"""
+
+    def test_resultados_por_fila(self, sistema):
+        """Test: Reglas, votación y prioridad de tipos por fila"""
+        resultado = sistema.predecir_lote(CASOS)
+
+        assert resultado["alerta"].tolist() == [0, 1, 0, 1, 1, 1]
+        assert resultado["tipo_alerta"].tolist() == [
+            "Normal", "Baja Producción", "Normal", "Presión Crítica",
+            "Concentración CH4 Alta", "Temperatura Anormal"
+        ]
+        assert resultado["fuente"].tolist() == ["modelo", "regla", "modelo", "regla", "modelo", "regla"]
+
+    def test_un_llamado_por_modelo(self, sistema):
+        """Test: Cada modelo se evalúa una vez por lote y el tipo solo en filas con alerta"""
+        sistema.predecir_lote(CASOS)
+
+        assert sistema.modelo_original_alerta.llamadas == [6]
+        assert sistema.modelo_optimizado_alerta.llamadas == [6]
+        assert sistema.modelo_original_tipo.llamadas == [2]
+        assert sistema.modelo_optimizado_tipo.llamadas == [4]
+
+    def test_coincide_con_prediccion_individual(self, sistema):
+        """Test: predecir_con_ensemble entrega lo mismo que el lote para cada fila"""
+        lote = sistema.predecir_lote(CASOS)
+
+        for i, fila in enumerate(CASOS.values.tolist()):
+            individual = sistema.predecir_con_ensemble(fila)
+            assert individual["alerta"] == lote["alerta"].iloc[i]
+            assert individual["tipo_alerta"] == lote["tipo_alerta"].iloc[i]
+            assert individual["fuente"] == lote["fuente"].iloc[i]
+
+        reglas = sistema.predecir_con_ensemble(CASOS.values[5].tolist())["detalles"]["reglas"]
+        assert [r["tipo"] for r in reglas] == ["Temperatura Anormal", "Baja Producción", "Presión Crítica"]
+
+    def test_bloques_y_arreglos(self, sistema):
+        """Test: Evaluar por bloques o desde un arreglo no cambia el resultado"""
+        completo = sistema.predecir_lote(CASOS)
+        por_bloques = sistema.predecir_lote(CASOS.to_numpy(), tamano_bloque=4)
+
+        pd.testing.assert_frame_equal(completo, por_bloques)
+
+    def test_lote_vacio(self, sistema):
+        """Test: Un lote sin filas se rechaza"""
+        with pytest.raises(ValueError):
+            sistema.predecir_lote(CASOS.iloc[:0])
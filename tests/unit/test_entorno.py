@@ -0,0 +1,31 @@
+"""
+Pruebas Unitarias para la lectura de variables de entorno
+Ejecutar: pytest tests/unit/test_entorno.py -v
+"""
+import pytest
+from utils.entorno import env_bool
+
+
+class TestEnvBool:
+    """Pruebas para env_bool"""
+
+    @pytest.mark.parametrize("valor", ["1", "true", "TRUE", "yes", "si", "sí", "on", " True "])
+    def test_valores_verdaderos(self, monkeypatch, valor):
+        """Test: Todas las formas de activar una opción se aceptan"""
+        monkeypatch.setenv("OPCION_PRUEBA", valor)
+        assert env_bool("OPCION_PRUEBA") is True
+
+    @pytest.mark.parametrize("valor", ["0", "false", "no", "off", "cualquiera"])
+    def test_valores_falsos(self, monkeypatch, valor):
+        """Test: Cualquier otro valor desactiva la opción"""
+        monkeypatch.setenv("OPCION_PRUEBA", valor)
+        assert env_bool("OPCION_PRUEBA", default=True) is False
+
+    def test_default_si_no_esta_definida(self, monkeypatch):
+        """Test: Sin variable (o vacía) se usa el default"""
+        monkeypatch.delenv("OPCION_PRUEBA", raising=False)
+        assert env_bool("OPCION_PRUEBA") is False
+        assert env_bool("OPCION_PRUEBA", default=True) is True
+
+        monkeypatch.setenv("OPCION_PRUEBA", "")
+        assert env_bool("OPCION_PRUEBA", default=True) is True
@@ -0,0 +1,82 @@
+"""
+Pruebas Unitarias para el extractor de datos de entrenamiento
+Ejecutar: pytest tests/unit/test_extractor_lecturas.py -v
+"""
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from ml.extractor_lecturas import pivotar_por_ventanas, etiquetar_con_reglas
+
+INICIO = datetime(2030, 1, 1, 8, 0, 0)
+
+
+def lectura(proceso_id, sensor, valor, segundos, fecha_inicio=INICIO):
+    return (proceso_id, sensor, valor, INICIO + timedelta(seconds=segundos), fecha_inicio)
+
+
+LECTURAS = [
+    # Proceso 1, ventana 08:00: dos temperaturas (se promedian)
+    lectura(1, "temperatura", 35.0, 0),
+    lectura(1, "presion", 100.0, 5),
+    lectura(1, "gas", 300.0, 10),
+    lectura(1, "temperatura", 37.0, 20),
+    # Ventana 08:01: solo temperatura, el resto se rellena
+    lectura(1, "temperatura", 38.0, 65),
+    # Ventana del día siguiente
+    lectura(1, "gas", 200.0, 86400 + 30),
+    # Proceso 2 sin presión: nunca completa una fila
+    lectura(2, "temperatura", 30.0, 0),
+    lectura(2, "gas", 100.0, 10),
+]
+
+
+def extraer(lotes, **kwargs):
+    bloques = list(pivotar_por_ventanas(lotes, ventana=60, **kwargs))
+    return pd.concat(bloques, ignore_index=True) if bloques else pd.DataFrame()
+
+
+class TestPivoteVentanas:
+    """Pruebas para el pivote de lecturas a filas de características"""
+
+    def test_alinea_sensores_por_ventana(self):
+        """Test: Cada ventana produce una fila con el promedio por sensor"""
+        filas = extraer([LECTURAS])
+
+        assert filas["proceso_id"].tolist() == [1, 1, 1]
+        assert filas["temperatura_celsius"].tolist() == [36.0, 38.0, 38.0]
+        assert filas["presion_biogas_kpa"].tolist() == [100.0, 100.0, 100.0]
+        assert filas["mq4_ppm"].tolist() == [300.0, 300.0, 200.0]
+        assert filas["dia_proceso"].tolist() == [1, 1, 2]
+        assert filas["fecha_hora"].iloc[0] == INICIO + timedelta(seconds=20)
+
+    def test_sin_relleno_descarta_ventanas_incompletas(self):
+        """Test: Sin relleno solo quedan las ventanas con los tres sensores"""
+        filas = extraer([LECTURAS], rellenar=False)
+
+        assert len(filas) == 1
+        assert filas["temperatura_celsius"].iloc[0] == 36.0
+
+    @pytest.mark.parametrize("tamano", [1, 2, 3, 5])
+    def test_lotes_no_cambian_el_resultado(self, tamano):
+        """Test: Las ventanas y el relleno se conservan entre lotes de cualquier tamaño"""
+        lotes = [LECTURAS[i:i + tamano] for i in range(0, len(LECTURAS), tamano)]
+
+        pd.testing.assert_frame_equal(extraer(lotes), extraer([LECTURAS]))
+
+    def test_sin_lecturas(self):
+        """Test: Sin lecturas no se generan bloques"""
+        assert list(pivotar_por_ventanas([[]])) == []
+
+    def test_etiquetas_por_reglas(self):
+        """Test: Las filas se etiquetan con la regla de mayor confianza"""
+        filas = pd.DataFrame({
+            "temperatura_celsius": [36.5, 25.0, 36.0],
+            "presion_biogas_kpa": [350.0, 900.0, 500.0],
+            "mq4_ppm": [5200.0, 5200.0, 1800.0],
+            "dia_proceso": [12, 13, 21],
+        })
+
+        etiquetadas = etiquetar_con_reglas(filas)
+
+        assert etiquetadas["alerta_ia"].tolist() == [0, 1, 1]
+        assert etiquetadas["tipo_alerta"].tolist() == ["Normal", "Temperatura Anormal", "Baja Producción"]
@@ -0,0 +1,190 @@
+"""
+Pruebas Unitarias para el pool de inferencia
+Ejecutar: pytest tests/unit/test_inferencia_pool.py -v
+"""
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from services.inferencia_pool import PoolInferencia, InferenciaPendiente, SATURADO, TIMEOUT
+from services.ai_service import predecir_alerta
+
+
+@pytest.fixture
+def bloqueo():
+    """Evento que mantiene ocupados los trabajos hasta liberarlo"""
+    evento = threading.Event()
+    yield evento
+    evento.set()
+
+
+class TestPoolInferencia:
+    """Pruebas para la admisión acotada y el timeout del pool"""
+
+    def test_ejecuta_y_retorna_resultado(self):
+        """Test: El resultado de la función llega al llamador"""
+        pool = PoolInferencia(max_hilos=1, timeout=1)
+
+        assert pool.ejecutar(lambda a, b: a + b, 2, 3) == 5
+        assert pool.metricas()["pendientes"] == 0
+        assert pool.metricas()["completadas"] == 1
+
+    def test_sin_hilos_ejecuta_en_linea(self):
+        """Test: Con 0 hilos se ejecuta en el hilo del llamador"""
+        pool = PoolInferencia(max_hilos=0)
+
+        assert pool.ejecutar(threading.current_thread) is threading.current_thread()
+
+    def test_propaga_excepciones(self):
+        """Test: Los errores de la función no se ocultan"""
+        pool = PoolInferencia(max_hilos=1, timeout=1)
+
+        def fallar():
+            raise ValueError("modelo roto")
+
+        with pytest.raises(ValueError):
+            pool.ejecutar(fallar)
+
+    def test_timeout_retorna_pendiente(self, bloqueo):
+        """Test: Una inferencia lenta no bloquea al request más allá del timeout"""
+        pool = PoolInferencia(max_hilos=1, max_pendientes=4, timeout=0.05)
+
+        with pytest.raises(InferenciaPendiente) as exc:
+            pool.ejecutar(bloqueo.wait)
+
+        assert exc.value.motivo == TIMEOUT
+        assert pool.metricas()["timeouts"] == 1
+        # El trabajo sigue ocupando su lugar hasta terminar
+        assert pool.metricas()["pendientes"] == 1
+
+    def test_saturado_rechaza_sin_encolar(self, bloqueo):
+        """Test: Con el pool lleno se responde de inmediato"""
+        pool = PoolInferencia(max_hilos=1, max_pendientes=2, timeout=0.01)
+        for _ in range(2):
+            with pytest.raises(InferenciaPendiente):
+                pool.ejecutar(bloqueo.wait)
+
+        with pytest.raises(InferenciaPendiente) as exc:
+            pool.ejecutar(lambda: 1)
+
+        assert exc.value.motivo == SATURADO
+        metricas = pool.metricas()
+        assert metricas["rechazadas"] == 1
+        assert metricas["max_observado"] == 2
+
+    def test_libera_lugar_al_terminar(self, bloqueo):
+        """Test: Al terminar los trabajos lentos el pool vuelve a admitir"""
+        pool = PoolInferencia(max_hilos=1, max_pendientes=1, timeout=0.01)
+        with pytest.raises(InferenciaPendiente):
+            pool.ejecutar(bloqueo.wait)
+
+        bloqueo.set()
+        pool.timeout = 1
+        pool._executor.submit(lambda: None).result()
+
+        assert pool.ejecutar(lambda: "ok") == "ok"
+
+    def test_enviar_no_espera_resultado(self, bloqueo):
+        """Test: enviar() retorna de inmediato aunque el trabajo siga en curso"""
+        pool = PoolInferencia(max_hilos=1, max_pendientes=1, timeout=0.01)
+
+        futuro = pool.enviar(bloqueo.wait, 5)
+        assert not futuro.done()
+        with pytest.raises(InferenciaPendiente) as exc:
+            pool.enviar(lambda: 1)
+        assert exc.value.motivo == SATURADO
+
+        bloqueo.set()
+        assert futuro.result(timeout=1) is True
+
+    def test_enviar_sin_hilos_en_linea(self):
+        """Test: Con 0 hilos enviar() ejecuta en el llamador y resuelve el Future"""
+        pool = PoolInferencia(max_hilos=0)
+
+        assert pool.enviar(threading.current_thread).result() is threading.current_thread()
+
+    def test_predecir_alerta_degradada(self):
+        """Test: predecir_alerta retorna una predicción pendiente si el pool no responde"""
+        with patch('services.ai_service.calcular_dia_proceso', return_value=4), \
+                patch('services.ai_service.pool_inferencia') as mock_pool:
+            mock_pool.ejecutar.side_effect = InferenciaPendiente(SATURADO)
+            resultado = predecir_alerta(35.0, 100.0, 300.0, "2025-01-10 08:00:00")
+
+        assert resultado["prediccion_pendiente"] is True
+        assert resultado["motivo"] == SATURADO
+        assert resultado["alerta_ia"] == 0
+        assert resultado["dia_proceso"] == 4
+
+
+class TestProgramarPrediccion:
+    """Pruebas para la evaluación diferida de predicciones al escribir"""
+
+    @pytest.fixture
+    def pool(self, bloqueo):
+        pool = PoolInferencia(max_hilos=1, max_pendientes=2, timeout=0.01)
+        # Ocupa el único hilo: lo que se programe queda en cola
+        pool.enviar(bloqueo.wait, 5)
+        with patch('services.prediccion_service.pool_inferencia', pool):
+            yield pool
+
+    @patch('services.prediccion_service.registrar_prediccion')
+    def test_no_bloquea_y_evalua_despues(self, mock_registrar, pool, bloqueo):
+        """Test: La escritura no espera a los modelos; la predicción se registra al liberarse el pool"""
+        from services.prediccion_service import programar_prediccion
+        app = MagicMock()
+
+        assert programar_prediccion(7, "inicio", app=app) is True
+        mock_registrar.assert_not_called()
+
+        bloqueo.set()
+        pool._executor.shutdown(wait=True)
+        mock_registrar.assert_called_once_with(7, "inicio")
+        app.app_context.assert_called_once()
+
+    @patch('services.prediccion_service.registrar_prediccion')
+    def test_una_evaluacion_encolada_por_proceso(self, mock_registrar, pool, bloqueo):
+        """Test: Escrituras seguidas del mismo proceso comparten la evaluación encolada"""
+        from services.prediccion_service import programar_prediccion
+        app = MagicMock()
+
+        for _ in range(5):
+            assert programar_prediccion(7, app=app) is True
+        assert pool.metricas()["pendientes"] == 2
+
+        bloqueo.set()
+        pool._executor.shutdown(wait=True)
+        assert mock_registrar.call_count == 1
+
+    @patch('services.prediccion_service.registrar_prediccion')
+    def test_pool_saturado_omite_evaluacion(self, mock_registrar, pool):
+        """Test: Con el pool lleno la evaluación se omite sin fallar la escritura"""
+        from services.prediccion_service import programar_prediccion
+        app = MagicMock()
+
+        assert programar_prediccion(1, app=app) is True
+        assert programar_prediccion(2, app=app) is False
+        assert pool.metricas()["rechazadas"] == 1
+
+
+class TestRegistrarPrediccion:
+    """Pruebas de robustez de la evaluación en segundo plano"""
+
+    @patch('services.prediccion_service.db')
+    @patch('services.prediccion_service.obtener_ultima_lectura_combinada',
+           side_effect=RuntimeError("conexión perdida"))
+    def test_error_al_leer_terna_no_propaga(self, _mock_lectura, mock_db):
+        """Test: Un error al leer la terna se registra y retorna None"""
+        from services.prediccion_service import registrar_prediccion
+
+        assert registrar_prediccion(1) is None
+        mock_db.session.rollback.assert_called_once()
+
+    @patch('services.prediccion_service.db')
+    @patch('services.prediccion_service.modelos_ml')
+    @patch('services.prediccion_service.obtener_ultima_lectura_combinada',
+           return_value=(30.0, 100.0, 200.0, "2024-01-01 00:00:00"))
+    def test_error_al_cargar_modelos_no_propaga(self, _mock_lectura, mock_modelos, mock_db):
+        """Test: Un error al cargar los modelos se registra y retorna None"""
+        from services.prediccion_service import registrar_prediccion
+        mock_modelos.obtener.side_effect = OSError("modelo corrupto")
+
+        assert registrar_prediccion(1) is None
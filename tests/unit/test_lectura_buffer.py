@@ -0,0 +1,114 @@
+"""
+Pruebas Unitarias para el buffer write-behind de lecturas
+Ejecutar: pytest tests/unit/test_lectura_buffer.py -v
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import IntegrityError, OperationalError
+from services.lectura_buffer import BufferLecturas, FACTOR_CAPACIDAD
+from exceptions.custom_exceptions import ServiceUnavailableException
+
+
+@pytest.fixture
+def buffer():
+    """Buffer configurado con una app simulada y sin hilo de vaciado"""
+    buf = BufferLecturas()
+    buf.configurar(MagicMock(), activo=True, max_filas=3, intervalo=60)
+    with patch.object(BufferLecturas, '_asegurar_hilo'), \
+            patch('services.lectura_buffer.actualizar_rollups'), \
+            patch('services.lectura_buffer.programar_prediccion'):
+        yield buf
+    # Evita que el vaciado en atexit intente escribir las filas de prueba
+    buf._filas.clear()
+
+
+class TestBufferLecturas:
+    """Pruebas para BufferLecturas"""
+
+    @patch('services.lectura_buffer.db')
+    def test_flush_inserta_en_bloque(self, mock_db, buffer):
+        """Test: El vaciado escribe todas las filas con un solo execute y commit"""
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        buffer.agregar({"sensor_id": 2, "proceso_id": 1, "valor": 2.0})
+
+        guardadas = buffer.flush()
+
+        assert guardadas == 2
+        assert buffer.pendientes == 0
+        mock_db.session.execute.assert_called_once()
+        assert len(mock_db.session.execute.call_args[0][1]) == 2
+        mock_db.session.commit.assert_called_once()
+
+    @patch('services.lectura_buffer.db')
+    def test_flush_vacio_no_toca_bd(self, mock_db, buffer):
+        """Test: Sin lecturas pendientes no se accede a la BD"""
+        assert buffer.flush() == 0
+        mock_db.session.execute.assert_not_called()
+
+    def test_umbral_de_tamano_despierta_vaciado(self, buffer):
+        """Test: Alcanzar max_filas señala al hilo de vaciado"""
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        assert not buffer._despertar.is_set()
+
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        assert buffer._despertar.is_set()
+
+    @patch('services.lectura_buffer.db')
+    def test_error_bd_conserva_filas(self, mock_db, buffer):
+        """Test: Si la BD falla las filas vuelven al buffer"""
+        mock_db.session.commit.side_effect = Exception("DB caída")
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+
+        assert buffer.flush() == 0
+        assert buffer.pendientes == 1
+
+    @patch('services.lectura_buffer.db')
+    def test_integridad_descarta_solo_filas_invalidas(self, mock_db, buffer):
+        """Test: Un sensor inválido no bloquea al resto del lote"""
+        error = IntegrityError("INSERT", {}, Exception("FK"))
+        # Lote completo falla, luego fila válida, fila inválida (cada una en su SAVEPOINT)
+        mock_db.session.execute.side_effect = [error, None, error]
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        buffer.agregar({"sensor_id": 99, "proceso_id": 1, "valor": 1.0})
+
+        assert buffer.flush() == 1
+        assert buffer.pendientes == 0
+        assert mock_db.session.begin_nested.call_count == 2
+        # Un solo commit para todas las filas del reintento
+        mock_db.session.commit.assert_called_once()
+
+    @patch('services.lectura_buffer.db')
+    def test_error_en_reintento_no_duplica_filas(self, mock_db, buffer):
+        """Test: Si la BD cae durante el reintento fila a fila no queda nada escrito y el lote vuelve entero"""
+        mock_db.session.execute.side_effect = [
+            IntegrityError("INSERT", {}, Exception("FK")), None, OperationalError("INSERT", {}, Exception("caída"))
+        ]
+        buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        buffer.agregar({"sensor_id": 2, "proceso_id": 1, "valor": 2.0})
+
+        assert buffer.flush() == 0
+        assert buffer.pendientes == 2
+        mock_db.session.commit.assert_not_called()
+        mock_db.session.rollback.assert_called()
+
+    def test_buffer_lleno(self, buffer):
+        """Test: Error cuando se supera la capacidad retenida"""
+        for _ in range(buffer.max_filas * FACTOR_CAPACIDAD):
+            buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+
+        with pytest.raises(ServiceUnavailableException) as error:
+            buffer.agregar({"sensor_id": 1, "proceso_id": 1, "valor": 1.0})
+        assert error.value.status_code == 503
+        assert error.value.retry_after == 60
+
+    @patch('services.lectura_buffer.cache_lecturas')
+    @patch('services.lectura_buffer.db')
+    def test_flush_invalida_cache(self, mock_db, mock_cache, buffer):
+        """Test: El vaciado invalida la caché de los sensores escritos"""
+        buffer.agregar({"sensor_id": 1, "proceso_id": 7, "valor": 1.0})
+        buffer.agregar({"sensor_id": 2, "proceso_id": 7, "valor": 1.0})
+
+        buffer.flush()
+
+        mock_cache.invalidar_sensores.assert_called_once_with(7, {1, 2})
@@ -0,0 +1,101 @@
+"""
+Pruebas Unitarias para la caché de últimas lecturas
+Ejecutar: pytest tests/unit/test_lectura_cache.py -v
+"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from database.lectura_cache import CacheLecturas
+
+BASE = datetime(2025, 1, 10, 8, 0, 0)
+
+
+def lectura(id, sensor_id=1, proceso_id=1, minutos=0, valor=1.0):
+    return {
+        "id": id,
+        "sensor_id": sensor_id,
+        "proceso_id": proceso_id,
+        "valor": valor,
+        "fecha_hora": BASE + timedelta(minutes=minutos),
+        "observaciones": None
+    }
+
+
+@pytest.fixture
+def cache():
+    return CacheLecturas(ttl=60, max_por_sensor=3)
+
+
+class TestCacheLecturas:
+    """Pruebas para CacheLecturas"""
+
+    def test_miss_inicial(self, cache):
+        """Test: Sin datos cargados la caché no responde"""
+        assert cache.obtener_ultimas(1) is None
+        assert cache.obtener_recientes(1, 1, 5) is None
+
+    def test_escritura_actualiza_ultimas(self, cache):
+        """Test: registrar() reemplaza la última lectura del sensor"""
+        cache.guardar_ultimas(1, {"temperatura": dict(lectura(1), nombre="temperatura")})
+
+        cache.registrar(lectura(2, minutos=5, valor=40.0))
+
+        ultimas = cache.obtener_ultimas(1)
+        assert ultimas["temperatura"]["valor"] == 40.0
+        assert ultimas["temperatura"]["id"] == 2
+
+    def test_escritura_sensor_desconocido_invalida(self, cache):
+        """Test: Una lectura de un sensor no cacheado fuerza recarga"""
+        cache.guardar_ultimas(1, {"temperatura": lectura(1)})
+
+        cache.registrar(lectura(2, sensor_id=9))
+
+        assert cache.obtener_ultimas(1) is None
+
+    def test_recientes_respetan_limite_y_completitud(self, cache):
+        """Test: Solo se sirve un límite mayor si la lista está completa"""
+        cache.guardar_recientes(1, 1, [lectura(2, minutos=1), lectura(1)], limite_consulta=100)
+
+        assert [l["id"] for l in cache.obtener_recientes(1, 1, 5)] == [2, 1]
+
+        cache.guardar_recientes(1, 2, [lectura(3, sensor_id=2)], limite_consulta=1)
+        assert cache.obtener_recientes(1, 2, 5) is None
+
+    def test_recientes_se_actualizan_en_escritura(self, cache):
+        """Test: registrar() agrega al inicio y respeta el máximo"""
+        cache.guardar_recientes(1, 1, [lectura(2, minutos=1), lectura(1)], limite_consulta=100)
+
+        cache.registrar(lectura(3, minutos=2))
+        cache.registrar(lectura(4, minutos=3))
+
+        assert [l["id"] for l in cache.obtener_recientes(1, 1, 3)] == [4, 3, 2]
+        assert cache.obtener_recientes(1, 1, 4) is None
+
+    def test_lectura_fuera_de_orden_invalida(self, cache):
+        """Test: Una lectura más antigua que la cabeza descarta la entrada"""
+        cache.guardar_recientes(1, 1, [lectura(2, minutos=5)], limite_consulta=100)
+
+        cache.registrar(lectura(3, minutos=1))
+
+        assert cache.obtener_recientes(1, 1, 1) is None
+
+    def test_expiracion_ttl(self, cache):
+        """Test: Las entradas expiran tras el TTL"""
+        cache.guardar_recientes(1, 1, [lectura(1)], limite_consulta=100)
+
+        with patch('database.lectura_cache.time.monotonic', return_value=10**9):
+            assert cache.obtener_recientes(1, 1, 1) is None
+
+    def test_cambio_de_proceso(self, cache):
+        """Test: Las claves incluyen el proceso y invalidar() limpia todo"""
+        cache.guardar_recientes(1, 1, [lectura(1)], limite_consulta=100)
+
+        assert cache.obtener_recientes(2, 1, 1) is None
+        cache.invalidar()
+        assert cache.obtener_recientes(1, 1, 1) is None
+
+    def test_ttl_cero_desactiva(self):
+        """Test: Con TTL 0 no se guarda nada"""
+        cache = CacheLecturas(ttl=0)
+        cache.guardar_recientes(1, 1, [lectura(1)], limite_consulta=100)
+        assert cache.obtener_recientes(1, 1, 1) is None
@@ -0,0 +1,158 @@
+"""
+Pruebas Unitarias para Lectura Service
+Ejecutar: pytest tests/unit/test_lectura_service.py -v
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from services.lectura_service import (
+    registrar_lecturas_batch, parsear_cursor, generar_cursor
+)
+from exceptions.custom_exceptions import ValidationException, DatabaseException
+from config.constants import MAX_LECTURAS_BATCH
+
+
+class TestRegistrarLecturasBatch:
+    """Pruebas para el registro de lecturas por lote"""
+
+    @pytest.fixture(autouse=True)
+    def mock_rollups(self):
+        with patch('services.lectura_service.actualizar_rollups') as mock:
+            yield mock
+
+    @pytest.fixture(autouse=True)
+    def mock_prediccion(self):
+        with patch('services.lectura_service.programar_prediccion') as mock:
+            yield mock
+
+    @patch('services.lectura_service.db')
+    @patch('services.lectura_service.obtener_proceso_activo')
+    def test_lote_exitoso_un_solo_commit(self, mock_proceso_activo, mock_db, mock_proceso, mock_rollups):
+        """Test: Todas las lecturas válidas se insertan con un solo execute y commit"""
+        mock_proceso_activo.return_value = mock_proceso
+        mock_db.session.query.return_value.filter.return_value.all.return_value = [(1,), (2,)]
+
+        resultados = registrar_lecturas_batch([
+            {"sensor_id": 1, "valor": 35.5},
+            {"sensor_id": 2, "valor": "98.1", "fecha_hora": "2025-01-10 08:30:00"}
+        ])
+
+        assert [r["estado"] for r in resultados] == ["registrada", "registrada"]
+        assert resultados[1]["fecha_hora"].startswith("2025-01-10T08:30:00")
+        mock_proceso_activo.assert_called_once()
+        mock_db.session.execute.assert_called_once()
+        filas = mock_db.session.execute.call_args[0][1]
+        assert len(filas) == 2
+        assert all(f["proceso_id"] == mock_proceso.id for f in filas)
+        mock_rollups.assert_called_once_with(filas)
+        mock_db.session.commit.assert_called_once()
+
+    @patch('services.lectura_service.db')
+    @patch('services.lectura_service.obtener_proceso_activo')
+    def test_lote_acepta_iso_con_zona(self, mock_proceso_activo, mock_db, mock_proceso, mock_rollups):
+        """Test: fecha_hora ISO 8601 con Z u offset se acepta y se guarda en UTC"""
+        mock_proceso_activo.return_value = mock_proceso
+        mock_db.session.query.return_value.filter.return_value.all.return_value = [(1,)]
+
+        resultados = registrar_lecturas_batch([
+            {"sensor_id": 1, "valor": 10, "fecha_hora": "2025-01-10T08:30:00Z"},
+            {"sensor_id": 1, "valor": 11, "fecha_hora": "2025-01-10T10:30:00+02:00"}
+        ])
+
+        assert [r["estado"] for r in resultados] == ["registrada", "registrada"]
+        filas = mock_db.session.execute.call_args[0][1]
+        assert [f["fecha_hora"] for f in filas] == [datetime(2025, 1, 10, 8, 30)] * 2
+
+    @patch('services.lectura_service.db')
+    @patch('services.lectura_service.obtener_proceso_activo')
+    def test_lote_parcial_rechaza_invalidas(self, mock_proceso_activo, mock_db, mock_proceso):
+        """Test: Las lecturas inválidas se rechazan sin afectar a las válidas"""
+        mock_proceso_activo.return_value = mock_proceso
+        mock_db.session.query.return_value.filter.return_value.all.return_value = [(1,)]
+
+        resultados = registrar_lecturas_batch([
+            {"sensor_id": 1, "valor": 10},
+            {"sensor_id": 99, "valor": 10},
+            {"sensor_id": 1, "valor": "abc"},
+            {"sensor_id": 1, "valor": 10, "fecha_hora": "ayer"},
+            "no es un objeto"
+        ])
+
+        assert [r["estado"] for r in resultados] == [
+            "registrada", "rechazada", "rechazada", "rechazada", "rechazada"
+        ]
+        assert "no encontrado" in resultados[1]["error"]
+        assert len(mock_db.session.execute.call_args[0][1]) == 1
+
+    @patch('services.lectura_service.db')
+    @patch('services.lectura_service.obtener_proceso_activo')
+    def test_lote_sin_validas_no_escribe(self, mock_proceso_activo, mock_db, mock_proceso):
+        """Test: Si ninguna lectura es válida no se ejecuta inserción"""
+        mock_proceso_activo.return_value = mock_proceso
+        mock_db.session.query.return_value.filter.return_value.all.return_value = []
+
+        resultados = registrar_lecturas_batch([{"sensor_id": 5, "valor": 1}])
+
+        assert resultados[0]["estado"] == "rechazada"
+        mock_db.session.execute.assert_not_called()
+        mock_db.session.commit.assert_not_called()
+
+    @patch('services.lectura_service.obtener_proceso_activo', return_value=None)
+    def test_lote_sin_proceso_activo(self, mock_proceso_activo):
+        """Test: Error 409 cuando no hay proceso activo"""
+        with pytest.raises(ValidationException) as exc_info:
+            registrar_lecturas_batch([{"sensor_id": 1, "valor": 1}])
+
+        assert exc_info.value.status_code == 409
+
+    def test_lote_vacio_o_excedido(self):
+        """Test: Error de validación con lote vacío o demasiado grande"""
+        with pytest.raises(ValidationException):
+            registrar_lecturas_batch([])
+
+        with pytest.raises(ValidationException):
+            registrar_lecturas_batch([{"sensor_id": 1, "valor": 1}] * (MAX_LECTURAS_BATCH + 1))
+
+    @patch('services.lectura_service.db')
+    @patch('services.lectura_service.obtener_proceso_activo')
+    def test_lote_error_bd_hace_rollback(self, mock_proceso_activo, mock_db, mock_proceso):
+        """Test: Error de BD en la inserción hace rollback"""
+        mock_proceso_activo.return_value = mock_proceso
+        mock_db.session.query.return_value.filter.return_value.all.return_value = [(1,)]
+        mock_db.session.commit.side_effect = Exception("DB Error")
+
+        with pytest.raises(DatabaseException):
+            registrar_lecturas_batch([{"sensor_id": 1, "valor": 1}])
+
+        mock_db.session.rollback.assert_called_once()
+
+
+class TestCursorLecturas:
+    """Pruebas para la paginación por cursor"""
+
+    def test_parsear_cursor_valido(self):
+        """Test: Cursor generado con isoformat se interpreta correctamente"""
+        fecha, lectura_id = parsear_cursor("2025-01-10T08:30:00,42")
+
+        assert fecha == datetime(2025, 1, 10, 8, 30, 0)
+        assert lectura_id == 42
+
+    def test_parsear_cursor_con_zona_horaria(self):
+        """Test: Fechas con zona horaria se normalizan a UTC naive"""
+        fecha, _ = parsear_cursor("2025-01-10T10:30:00+02:00,1")
+
+        assert fecha == datetime(2025, 1, 10, 8, 30, 0)
+
+    @pytest.mark.parametrize("cursor", ["", "abc", "2025-01-10T08:30:00", "2025-01-10,xx"])
+    def test_parsear_cursor_invalido(self, cursor):
+        """Test: Error 400 con cursores mal formados"""
+        with pytest.raises(ValidationException) as exc_info:
+            parsear_cursor(cursor)
+
+        assert exc_info.value.status_code == 400
+
+    def test_generar_cursor(self):
+        """Test: El cursor combina fecha ISO e id"""
+        lectura = Mock(fecha_hora=datetime(2025, 1, 10, 8, 30, 0), id=7)
+
+        assert generar_cursor(lectura) == "2025-01-10T08:30:00,7"
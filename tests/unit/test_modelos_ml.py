@@ -0,0 +1,193 @@
+"""
+Pruebas Unitarias para la carga diferida de modelos ML
+Ejecutar: pytest tests/unit/test_modelos_ml.py -v
+"""
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from services.modelos_ml import ModelosML, init_modelos
+
+
+@pytest.fixture
+def mock_cargar():
+    with patch('services.modelos_ml.cargar_motor') as mock:
+        mock.side_effect = lambda nombre, modo: Mock(nombre=nombre, origen={"sha256": nombre})
+        yield mock
+
+
+class TestModelosML:
+    """Pruebas para ModelosML"""
+
+    def test_no_carga_hasta_usarse(self, mock_cargar):
+        """Test: Crear el registro no carga los modelos"""
+        modelos = ModelosML()
+
+        assert modelos.estado == "pendiente"
+        mock_cargar.assert_not_called()
+
+    def test_obtener_carga_una_vez(self, mock_cargar):
+        """Test: La primera llamada carga ambos modelos y las siguientes los reutilizan"""
+        modelos = ModelosML(modo="mmap")
+
+        alerta, tipo, version = modelos.obtener()
+        modelos.obtener()
+
+        assert (alerta.nombre, tipo.nombre) == ("modelo_alerta", "modelo_tipo_alerta")
+        assert len(version) == 12
+        assert mock_cargar.call_count == 2
+        mock_cargar.assert_any_call("modelo_alerta", "mmap")
+        assert modelos.resumen()["listo"] is True
+
+    def test_error_de_carga(self, mock_cargar):
+        """Test: Un fallo de carga deja el estado en error y obtener retorna None"""
+        mock_cargar.side_effect = FileNotFoundError("modelo_alerta.pkl")
+        modelos = ModelosML()
+
+        assert modelos.obtener() is None
+        assert modelos.estado == "error"
+        assert "modelo_alerta.pkl" in modelos.resumen()["error"]
+
+    def test_precarga_en_segundo_plano(self, mock_cargar):
+        """Test: precargar() no bloquea y obtener() espera a la carga en curso"""
+        liberar = threading.Event()
+
+        def cargar_lento(nombre, modo):
+            liberar.wait(5)
+            return Mock(nombre=nombre, origen=None)
+
+        mock_cargar.side_effect = cargar_lento
+        modelos = ModelosML()
+
+        modelos.precargar()
+        assert modelos.estado == "cargando"
+
+        liberar.set()
+        assert modelos.obtener() is not None
+        assert modelos.listo
+        assert mock_cargar.call_count == 2
+
+    def test_fork_durante_la_carga(self, mock_cargar):
+        """Test: Un proceso hijo creado a mitad de la carga la reinicia"""
+        modelos = ModelosML()
+        modelos.estado = "cargando"
+
+        with patch('services.modelos_ml.os.getpid', return_value=modelos._pid + 1):
+            assert modelos.resumen()["estado"] == "pendiente"
+            assert modelos.obtener() is not None
+
+
+    def test_al_cargar_espera_a_la_carga(self, mock_cargar):
+        """Test: La función se llama una vez al terminar la carga, o de inmediato si ya terminó"""
+        modelos = ModelosML()
+        llamadas = []
+
+        modelos.al_cargar(lambda: llamadas.append(modelos.listo))
+        assert llamadas == []
+
+        modelos.obtener()
+        modelos.obtener()
+        assert llamadas == [True]
+
+        modelos.al_cargar(lambda: llamadas.append("inmediata"))
+        assert llamadas == [True, "inmediata"]
+
+    @pytest.mark.parametrize("preload, sincrona", [("true", True), ("1", True), ("false", False)])
+    def test_init_modelos_con_preload_carga_sincrona(self, mock_cargar, monkeypatch, preload, sincrona):
+        """Test: Con GUNICORN_PRELOAD los modelos quedan cargados antes del fork"""
+        modelos = ModelosML()
+        monkeypatch.setenv("GUNICORN_PRELOAD", preload)
+        monkeypatch.delenv("ML_PRECARGA", raising=False)
+
+        with patch('services.modelos_ml.modelos_ml', modelos), \
+                patch.object(ModelosML, 'precargar') as mock_precargar:
+            init_modelos(Mock())
+
+        assert modelos.listo is sincrona
+        assert mock_precargar.called is not sincrona
+
+
+class TestRecargaModelos:
+    """Pruebas para la recarga en caliente de los modelos"""
+
+    @pytest.fixture
+    def modelos(self, mock_cargar):
+        modelos = ModelosML(intervalo_recarga=30)
+        modelos._firma_archivos = Mock(return_value=("a", "a"))
+        modelos.obtener()
+        return modelos
+
+    def _nueva_version(self, modelos, mock_cargar, firma=("b", "b")):
+        modelos._firma_archivos.return_value = firma
+        mock_cargar.side_effect = lambda nombre, modo: Mock(nombre=nombre, origen={"sha256": nombre + "-v2"})
+
+    def test_recarga_reemplaza_modelos(self, modelos, mock_cargar):
+        """Test: Los modelos nuevos reemplazan a los vigentes sin invalidar los que están en uso"""
+        en_uso = modelos.obtener()
+        self._nueva_version(modelos, mock_cargar)
+
+        assert modelos.recargar() is True
+
+        assert modelos.obtener() is not en_uso
+        assert modelos.version != en_uso.version
+        assert en_uso.alerta.nombre == "modelo_alerta"
+        assert modelos.resumen()["recargas"] == 1
+
+    def test_recarga_fallida_conserva_modelos(self, modelos, mock_cargar):
+        """Test: Si la carga nueva falla se sigue respondiendo con los modelos vigentes"""
+        vigentes = modelos.obtener()
+        modelos._firma_archivos.return_value = ("b", "b")
+        mock_cargar.side_effect = EOFError("modelo_alerta.pkl truncado")
+
+        assert modelos.recargar() is False
+
+        assert modelos.obtener() is vigentes
+        assert modelos.listo
+        assert "truncado" in modelos.resumen()["error_recarga"]
+
+    def test_archivos_modificados_durante_la_recarga(self, modelos, mock_cargar):
+        """Test: No se reemplaza si los archivos cambian mientras se cargan"""
+        vigentes = modelos.obtener()
+        firmas = iter([("b", "b"), ("c", "c")])
+        self._nueva_version(modelos, mock_cargar)
+        modelos._firma_archivos.side_effect = lambda: next(firmas)
+
+        assert modelos.recargar() is False
+        assert modelos.obtener() is vigentes
+
+    def test_revision_inicia_recarga_en_segundo_plano(self, modelos, mock_cargar):
+        """Test: obtener() detecta el cambio de firma y lanza el hilo de recarga"""
+        self._nueva_version(modelos, mock_cargar)
+        modelos._proxima_revision = 0
+
+        with patch('services.modelos_ml.threading.Thread') as mock_thread:
+            vigentes = modelos.obtener()
+            # Dentro del intervalo no se vuelve a revisar
+            modelos.obtener()
+
+        assert vigentes.alerta.origen == {"sha256": "modelo_alerta"}
+        mock_thread.assert_called_once()
+        assert mock_thread.call_args.kwargs["args"] == (("b", "b"),)
+        modelos._lock_recarga.release()
+
+    def test_sin_cambios_no_recarga(self, modelos, mock_cargar):
+        """Test: Con la misma firma no se cargan los modelos de nuevo"""
+        modelos._proxima_revision = 0
+
+        with patch('services.modelos_ml.threading.Thread') as mock_thread:
+            modelos.obtener()
+
+        mock_thread.assert_not_called()
+        assert mock_cargar.call_count == 2
+
+    def test_error_inicial_se_reintenta_al_cambiar_archivos(self, mock_cargar):
+        """Test: Tras un fallo de carga, nuevos archivos se cargan sin reiniciar"""
+        mock_cargar.side_effect = FileNotFoundError("modelo_alerta.pkl")
+        modelos = ModelosML(intervalo_recarga=30)
+        modelos._firma_archivos = Mock(return_value=(None, None))
+        assert modelos.obtener() is None
+
+        self._nueva_version(modelos, mock_cargar)
+        modelos._proxima_revision = 0
+
+        assert modelos.obtener() is not None
+        assert modelos.listo
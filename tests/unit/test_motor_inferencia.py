@@ -0,0 +1,181 @@
+"""
+Pruebas Unitarias para el motor de inferencia compilado
+Ejecutar: pytest tests/unit/test_motor_inferencia.py -v
+"""
+import os
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from ml.motor_inferencia import BosqueCompilado
+
+ML_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'ml')
+MODELOS = [
+    "modelo_alerta.pkl",
+    "modelo_tipo_alerta.pkl",
+    "modelo_alerta_optimizado.pkl",
+    "modelo_tipo_alerta_optimizado.pkl"
+]
+
+
+def entradas(modelo, n=3000, semilla=0):
+    """Lecturas aleatorias en rangos realistas más filas justo en los umbrales"""
+    rng = np.random.default_rng(semilla)
+    X = np.column_stack([
+        rng.uniform(10, 50, n),
+        rng.uniform(60, 160, n),
+        rng.uniform(0, 1200, n),
+        rng.integers(1, 60, n)
+    ])
+    bordes = []
+    for estimador in modelo.estimators_[:20]:
+        arbol = estimador.tree_
+        for nodo in np.flatnonzero(arbol.children_left != -1)[:10]:
+            fila = X[nodo % n].copy()
+            fila[arbol.feature[nodo]] = arbol.threshold[nodo]
+            bordes.append(fila)
+    return np.vstack([X, bordes])
+
+
+@pytest.fixture(params=MODELOS)
+def modelo(request):
+    ruta = os.path.join(ML_DIR, request.param)
+    if not os.path.exists(ruta):
+        pytest.skip(f"{request.param} no disponible")
+    modelo = joblib.load(ruta)
+    # Con n_jobs > 1 sklearn acumula los árboles en orden no determinista
+    modelo.n_jobs = 1
+    return modelo
+
+
+class TestBosqueCompilado:
+    """Paridad del motor compilado con scikit-learn"""
+
+    def test_paridad_predict_proba(self, modelo):
+        """Test: Probabilidades idénticas bit a bit a las de sklearn"""
+        X = entradas(modelo)
+        df = pd.DataFrame(X, columns=modelo.feature_names_in_)
+
+        np.testing.assert_array_equal(
+            BosqueCompilado(modelo).predict_proba(X), modelo.predict_proba(df)
+        )
+
+    def test_paridad_predict(self, modelo):
+        """Test: Mismas clases predichas que sklearn, en lote y fila a fila"""
+        X = entradas(modelo, n=500, semilla=1)
+        motor = BosqueCompilado(modelo)
+        esperado = modelo.predict(pd.DataFrame(X, columns=modelo.feature_names_in_))
+
+        np.testing.assert_array_equal(motor.predict(X), esperado)
+        assert [motor.predict(fila)[0] for fila in X[:50]] == list(esperado[:50])
+
+    def test_forma_invalida(self, modelo):
+        """Test: Error si el número de características no coincide"""
+        with pytest.raises(ValueError):
+            BosqueCompilado(modelo).predict([[1.0, 2.0]])
+
+
+class TestBosqueGuardado:
+    """Pruebas para el formato compilado con memoria mapeada"""
+
+    def test_guardar_y_cargar_mmap(self, modelo, tmp_path):
+        """Test: El bosque cargado con mmap predice igual que el original"""
+        motor = BosqueCompilado(modelo)
+        motor.guardar(str(tmp_path / "bosque"), origen={"archivo": "x.pkl"})
+
+        cargado = BosqueCompilado.cargar(str(tmp_path / "bosque"), mmap=True)
+        X = entradas(modelo, n=300, semilla=2)
+
+        assert isinstance(cargado.umbrales, np.memmap)
+        assert cargado.origen == {"archivo": "x.pkl"}
+        np.testing.assert_array_equal(cargado.predict_proba(X), motor.predict_proba(X))
+        np.testing.assert_array_equal(cargado.predict(X), motor.predict(X))
+
+    def test_compilado_vigente(self, tmp_path):
+        """Test: El compilado deja de ser vigente si cambia el .pkl"""
+        from ml.motor_inferencia import origen_modelo, compilado_vigente
+        modelo = joblib.load(os.path.join(ML_DIR, "modelo_alerta.pkl"))
+        ruta_pkl = tmp_path / "modelo.pkl"
+        joblib.dump(modelo, ruta_pkl)
+        directorio = str(tmp_path / "compilado")
+
+        assert not compilado_vigente(directorio, str(ruta_pkl))
+        BosqueCompilado(modelo).guardar(directorio, origen=origen_modelo(str(ruta_pkl)))
+        assert compilado_vigente(directorio, str(ruta_pkl))
+
+        modelo.n_jobs = 2
+        joblib.dump(modelo, ruta_pkl)
+        assert not compilado_vigente(directorio, str(ruta_pkl))
+
+
+class TestBosqueCompacto:
+    """Pruebas para la exportación compacta (.npz comprimido)"""
+
+    def test_compactar_sin_limites_es_exacto(self, modelo):
+        """Test: Sin poda el bosque compacto predice igual, incluso en los umbrales"""
+        motor = BosqueCompilado(modelo)
+        compacto = motor.compactar()
+        X = entradas(modelo)
+
+        assert compacto.umbrales.dtype == np.float32
+        assert compacto.tamano_bytes() < motor.tamano_bytes()
+        np.testing.assert_array_equal(compacto.predict(X), motor.predict(X))
+        np.testing.assert_allclose(compacto.predict_proba(X), motor.predict_proba(X), atol=1e-6)
+
+    def test_poda_reduce_el_bosque(self, modelo):
+        """Test: max_arboles y max_profundidad reducen árboles, niveles y memoria"""
+        motor = BosqueCompilado(modelo)
+        compacto = motor.compactar(max_arboles=10, max_profundidad=4)
+
+        assert compacto.n_arboles == min(10, motor.n_arboles)
+        assert compacto.profundidad <= 4
+        assert compacto.tamano_bytes() < motor.compactar().tamano_bytes()
+        probas = compacto.predict_proba(entradas(modelo, n=200))
+        np.testing.assert_allclose(probas.sum(axis=1), 1.0, atol=1e-5)
+
+    def test_guardar_y_cargar_compacto(self, modelo, tmp_path):
+        """Test: El .npz cargado predice igual que el bosque compacto"""
+        compacto = BosqueCompilado(modelo).compactar(max_arboles=20)
+        ruta = str(tmp_path / "modelo.npz")
+        compacto.guardar_compacto(ruta, origen={"archivo": "x.pkl"})
+
+        cargado = BosqueCompilado.cargar_compacto(ruta)
+        X = entradas(modelo, n=300, semilla=3)
+
+        assert not os.path.exists(ruta + ".tmp")
+        assert cargado.origen == {"archivo": "x.pkl"}
+        assert cargado.n_arboles == compacto.n_arboles
+        np.testing.assert_array_equal(cargado.predict_proba(X), compacto.predict_proba(X))
+
+    def test_compacto_vigente(self, tmp_path):
+        """Test: compilado_vigente también valida archivos .npz"""
+        from ml.motor_inferencia import origen_modelo, compilado_vigente
+        modelo = joblib.load(os.path.join(ML_DIR, "modelo_alerta.pkl"))
+        ruta_pkl = tmp_path / "modelo.pkl"
+        joblib.dump(modelo, ruta_pkl)
+        ruta = str(tmp_path / "modelo.npz")
+
+        assert not compilado_vigente(ruta, str(ruta_pkl))
+        BosqueCompilado(modelo).compactar().guardar_compacto(ruta, origen=origen_modelo(str(ruta_pkl)))
+        assert compilado_vigente(ruta, str(ruta_pkl))
+
+        modelo.n_jobs = 2
+        joblib.dump(modelo, ruta_pkl)
+        assert not compilado_vigente(ruta, str(ruta_pkl))
+
+    def test_limites_por_defecto_dentro_de_tolerancia(self, tmp_path):
+        """Test: La exportación compacta por defecto recorta los bosques y pasa la validación de deriva"""
+        from ml.exportar_modelos import (
+            exportar_compactos, MAX_ARBOLES_COMPACTO, MAX_PROFUNDIDAD_COMPACTO, TOLERANCIA_COMPACTO
+        )
+        ruta_csv = os.path.join(ML_DIR, "..", "sensors.csv")
+
+        metricas = exportar_compactos(destino=str(tmp_path), ruta_csv=ruta_csv)
+
+        for nombre, resultado in metricas.items():
+            original = BosqueCompilado.desde_archivo(os.path.join(ML_DIR, f"{nombre}.pkl"))
+            assert resultado["arboles"] == min(MAX_ARBOLES_COMPACTO, original.n_arboles)
+            assert resultado["profundidad"] <= MAX_PROFUNDIDAD_COMPACTO
+            assert resultado["kb_compacto"] < resultado["kb_original"]
+            assert resultado["precision_original"] - resultado["precision_compacto"] <= TOLERANCIA_COMPACTO
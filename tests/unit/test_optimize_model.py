@@ -0,0 +1,74 @@
+"""
+Pruebas Unitarias para el aumento de datos de ml/optimize_model.py
+Ejecutar: pytest tests/unit/test_optimize_model.py -v
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from ml.optimize_model import preparar_datos, aumentar_datos, aumentar_csv
+
+
+@pytest.fixture
+def datos():
+    return preparar_datos(pd.DataFrame({
+        "dia_proceso": [3, 12, 20, 5],
+        "fase_proceso": ["Latencia", "Estabilización", "Estabilización", "Latencia"],
+        "temperatura_celsius": [24.5, 36.0, 36.5, 36.9],
+        "presion_biogas_kpa": [100.0, 600.0, 500.0, 102.0],
+        "mq4_ppm": [300.0, 850.0, 5200.0, 310.0],
+        "alerta_ia": ["True", "True", "True", "False"],
+        "tipo_alerta": ["Temperatura Anormal", "Baja Producción", "Presión Alta", None],
+    }))
+
+
+class TestAumentoDatos:
+    """Pruebas para el aumento vectorizado de casos problemáticos"""
+
+    def test_copias_por_clase(self, datos):
+        """Test: Cada caso problemático se replica según su multiplicador"""
+        nuevas = aumentar_datos(datos)
+
+        assert nuevas["tipo_alerta"].value_counts().to_dict() == {
+            "Temperatura Anormal": 3, "Baja Producción": 4
+        }
+        # Las columnas sin ruido se conservan
+        assert set(nuevas["fase_proceso"]) == {"Latencia", "Estabilización"}
+        assert (nuevas["alerta_ia"] == 1).all()
+
+    def test_multiplicador_configurable(self, datos):
+        """Test: El multiplicador de una clase se puede cambiar o desactivar"""
+        nuevas = aumentar_datos(datos, multiplicadores={"Temperatura Anormal": 0, "Baja Producción": 10})
+
+        assert nuevas["tipo_alerta"].value_counts().to_dict() == {"Baja Producción": 10}
+
+    def test_ruido_acotado(self, datos):
+        """Test: El ruido respeta los rangos de cada caso y el mínimo de CH4"""
+        nuevas = aumentar_datos(datos, multiplicadores={"Baja Producción": 500})
+        bajas = nuevas[nuevas["tipo_alerta"] == "Baja Producción"]
+
+        assert bajas["temperatura_celsius"].between(34.0, 38.0).all()
+        assert bajas["presion_biogas_kpa"].between(580.0, 620.0).all()
+        assert bajas["mq4_ppm"].min() == 800
+        assert (bajas["dia_proceso"] == 12).all()
+
+    def test_reproducible_con_semilla(self, datos):
+        """Test: La misma semilla genera las mismas filas"""
+        primera = aumentar_datos(datos, rng=np.random.default_rng(7))
+        segunda = aumentar_datos(datos, rng=np.random.default_rng(7))
+        otra = aumentar_datos(datos, rng=np.random.default_rng(8))
+
+        pd.testing.assert_frame_equal(primera, segunda)
+        assert not primera["temperatura_celsius"].equals(otra["temperatura_celsius"])
+
+    def test_csv_por_bloques(self, datos, tmp_path):
+        """Test: El CSV aumentado por bloques contiene los originales y las filas sintéticas"""
+        entrada = tmp_path / "export.csv"
+        salida = tmp_path / "aumentado.csv"
+        pd.concat([datos] * 5, ignore_index=True).to_csv(entrada, index=False)
+
+        originales, nuevas = aumentar_csv(entrada, salida, tamano_bloque=3)
+        resultado = pd.read_csv(salida)
+
+        assert (originales, nuevas) == (20, 35)
+        assert len(resultado) == 55
+        assert list(resultado.columns) == list(datos.columns)
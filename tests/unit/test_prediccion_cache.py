@@ -0,0 +1,92 @@
+"""
+Pruebas Unitarias para la caché de predicciones
+Ejecutar: pytest tests/unit/test_prediccion_cache.py -v
+"""
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from services.prediccion_cache import CachePredicciones
+from services.modelos_ml import Motores
+from services.ai_service import cuantizar, predecir_alerta
+
+
+class TestCachePredicciones:
+    """Pruebas para CachePredicciones"""
+
+    def test_acierto_y_fallo(self):
+        """Test: Cuenta aciertos y fallos"""
+        cache = CachePredicciones(max_entradas=10)
+
+        assert cache.obtener("v1", (1, 2, 3, 4)) is None
+        cache.guardar("v1", (1, 2, 3, 4), (0, "Normal"))
+
+        assert cache.obtener("v1", (1, 2, 3, 4)) == (0, "Normal")
+        metricas = cache.metricas()
+        assert (metricas["aciertos"], metricas["fallos"]) == (1, 1)
+        assert metricas["tasa_aciertos"] == 0.5
+
+    def test_desaloja_la_menos_usada(self):
+        """Test: Al superar el tamaño se descarta la entrada menos reciente"""
+        cache = CachePredicciones(max_entradas=2)
+        cache.guardar("v1", "a", 1)
+        cache.guardar("v1", "b", 2)
+        cache.obtener("v1", "a")
+
+        cache.guardar("v1", "c", 3)
+
+        assert cache.obtener("v1", "b") is None
+        assert cache.obtener("v1", "a") == 1
+        assert cache.obtener("v1", "c") == 3
+
+    def test_cambio_de_version_invalida(self):
+        """Test: Un modelo nuevo no reutiliza resultados del anterior"""
+        cache = CachePredicciones()
+        cache.guardar("v1", "a", 1)
+
+        assert cache.obtener("v2", "a") is None
+        assert cache.metricas()["invalidaciones"] == 1
+        assert cache.metricas()["version_modelos"] == "v2"
+
+    def test_tamano_cero_desactiva(self):
+        """Test: Con tamaño 0 no se guarda nada"""
+        cache = CachePredicciones(max_entradas=0)
+        cache.guardar("v1", "a", 1)
+
+        assert cache.obtener("v1", "a") is None
+
+
+class TestPrediccionMemoizada:
+    """Pruebas para la memoización en predecir_alerta"""
+
+    @pytest.fixture
+    def motores(self):
+        alerta = Mock()
+        alerta.predict.return_value = np.array([1])
+        tipo = Mock()
+        tipo.predict.return_value = np.array(["Temperatura Anormal"])
+        motores = Motores(alerta, tipo, "v1")
+        with patch('services.ai_service.modelos_ml') as mock_modelos, \
+                patch('services.ai_service.calcular_dia_proceso', return_value=3), \
+                patch('services.ai_service.cache_predicciones', CachePredicciones()):
+            mock_modelos.obtener.return_value = motores
+            yield motores
+
+    def test_cuantizar(self):
+        """Test: Redondeo a la resolución del sensor"""
+        assert cuantizar(35.04, 0.1) == 35.0
+        assert cuantizar(35.06, 0.1) == 35.1
+        assert cuantizar(412.4, 1.0) == 412.0
+
+    def test_entradas_equivalentes_no_repiten_inferencia(self, motores):
+        """Test: Lecturas que redondean igual usan una sola inferencia"""
+        primero = predecir_alerta(45.02, 100.0, 300.2, "2025-01-10 08:00:00")
+        segundo = predecir_alerta(44.98, 100.04, 299.9, "2025-01-10 08:00:05")
+
+        assert primero["alerta_ia"] == segundo["alerta_ia"] == 1
+        motores.alerta.predict.assert_called_once()
+        motores.tipo.predict.assert_called_once()
+        np.testing.assert_array_equal(
+            motores.alerta.predict.call_args[0][0], [[45.0, 100.0, 300.0, 3]]
+        )
+        # El mensaje conserva los valores leídos
+        assert "44.98" in segundo["mensaje_lectura"]
@@ -0,0 +1,72 @@
+"""
+Pruebas Unitarias para la caché del proceso activo
+Ejecutar: pytest tests/unit/test_proceso_cache.py -v
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from database.proceso_cache import CacheProcesoActivo, ProcesoActivo
+
+
+@pytest.fixture
+def mock_modelo():
+    with patch('database.proceso_cache.ProcesoBiodigestor') as mock:
+        mock.query.filter_by.return_value.first.return_value = Mock(
+            id=7, estado="ACTIVO", fecha_inicio=datetime(2025, 1, 1), fecha_fin=None
+        )
+        yield mock
+
+
+class TestCacheProcesoActivo:
+    """Pruebas para CacheProcesoActivo"""
+
+    def test_una_consulta_mientras_no_expira(self, mock_modelo):
+        """Test: Consultas repetidas dentro del TTL no vuelven a la BD"""
+        cache = CacheProcesoActivo(ttl=60)
+
+        primero = cache.obtener()
+        segundo = cache.obtener()
+
+        assert primero == ProcesoActivo(7, "ACTIVO", datetime(2025, 1, 1), None)
+        assert segundo is primero
+        mock_modelo.query.filter_by.assert_called_once_with(estado='ACTIVO')
+
+    def test_sin_proceso_tambien_se_cachea(self, mock_modelo):
+        """Test: La ausencia de proceso activo también se guarda"""
+        mock_modelo.query.filter_by.return_value.first.return_value = None
+        cache = CacheProcesoActivo(ttl=60)
+
+        assert cache.obtener() is None
+        assert cache.obtener() is None
+        mock_modelo.query.filter_by.assert_called_once()
+
+    def test_invalidar_fuerza_consulta(self, mock_modelo):
+        """Test: invalidar() descarta el proceso guardado"""
+        cache = CacheProcesoActivo(ttl=60)
+        cache.obtener()
+
+        cache.invalidar()
+        cache.obtener()
+
+        assert mock_modelo.query.filter_by.call_count == 2
+
+    def test_expiracion(self, mock_modelo):
+        """Test: Tras el TTL se vuelve a consultar la BD"""
+        cache = CacheProcesoActivo(ttl=5)
+
+        with patch('database.proceso_cache.time.monotonic', return_value=100.0):
+            cache.obtener()
+            cache.obtener()
+        with patch('database.proceso_cache.time.monotonic', return_value=106.0):
+            cache.obtener()
+
+        assert mock_modelo.query.filter_by.call_count == 2
+
+    def test_ttl_cero_desactiva(self, mock_modelo):
+        """Test: Con TTL 0 cada consulta va a la BD"""
+        cache = CacheProcesoActivo(ttl=0)
+
+        cache.obtener()
+        cache.obtener()
+
+        assert mock_modelo.query.filter_by.call_count == 2
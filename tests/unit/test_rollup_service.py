@@ -0,0 +1,97 @@
+"""
+Pruebas Unitarias para Rollup Service
+Ejecutar: pytest tests/unit/test_rollup_service.py -v
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from services.rollup_service import inicio_bucket, agregar_filas, elegir_bucket, actualizar_rollups
+from config.constants import MAX_PUNTOS_SERIE
+
+
+def fila(valor, fecha_hora, sensor_id=1, proceso_id=1):
+    return {"proceso_id": proceso_id, "sensor_id": sensor_id, "valor": valor, "fecha_hora": fecha_hora}
+
+
+class TestRollupService:
+    """Pruebas para el cálculo de rollups"""
+
+    def test_inicio_bucket(self):
+        """Test: Truncado al minuto, hora y día"""
+        fecha = datetime(2025, 1, 10, 8, 35, 42, 123)
+
+        assert inicio_bucket(fecha, 60) == datetime(2025, 1, 10, 8, 35)
+        assert inicio_bucket(fecha, 3600) == datetime(2025, 1, 10, 8, 0)
+        assert inicio_bucket(fecha, 86400) == datetime(2025, 1, 10)
+
+    def test_inicio_bucket_fecha_con_zona(self):
+        """Test: Fechas aware se normalizan a UTC naive"""
+        fecha = datetime(2025, 1, 10, 8, 35, tzinfo=timezone.utc)
+
+        assert inicio_bucket(fecha, 3600) == datetime(2025, 1, 10, 8, 0)
+
+    def test_agregar_filas(self):
+        """Test: min/max/suma/conteo/último por bucket"""
+        agregados = agregar_filas([
+            fila(10.0, datetime(2025, 1, 10, 8, 0, 10)),
+            fila(30.0, datetime(2025, 1, 10, 8, 0, 50)),
+            fila(20.0, datetime(2025, 1, 10, 8, 0, 30)),
+            fila(5.0, datetime(2025, 1, 10, 8, 1, 0)),
+        ])
+
+        minuto = agregados[(1, 1, "1m", datetime(2025, 1, 10, 8, 0))]
+        assert minuto["minimo"] == 10.0
+        assert minuto["maximo"] == 30.0
+        assert minuto["suma"] == 60.0
+        assert minuto["conteo"] == 3
+        assert minuto["ultimo_valor"] == 30.0
+
+        hora = agregados[(1, 1, "1h", datetime(2025, 1, 10, 8, 0))]
+        assert hora["conteo"] == 4
+        assert hora["ultimo_valor"] == 5.0
+        assert len(agregados) == 4  # 2 minutos + 1 hora + 1 día
+
+    def test_agregar_separa_sensores_y_procesos(self):
+        """Test: Las claves incluyen proceso y sensor"""
+        fecha = datetime(2025, 1, 10, 8, 0)
+        agregados = agregar_filas([fila(1, fecha, sensor_id=1), fila(2, fecha, sensor_id=2),
+                                   fila(3, fecha, proceso_id=2)])
+
+        assert len(agregados) == 9
+
+    @pytest.mark.parametrize("horas,esperado", [(1, "1m"), (24 * 7, "1h"), (24 * 365, "1d")])
+    def test_elegir_bucket(self, horas, esperado):
+        """Test: El bucket más grueso con suficientes puntos que no excede el máximo"""
+        desde = datetime(2025, 1, 1)
+        hasta = datetime.fromtimestamp(desde.timestamp() + horas * 3600)
+
+        assert elegir_bucket(desde, hasta) == esperado
+
+    def test_elegir_bucket_limite_de_puntos(self):
+        """Test: Exactamente MAX_PUNTOS_SERIE minutos todavía usa 1m"""
+        desde = datetime(2025, 1, 1)
+        hasta = datetime.fromtimestamp(desde.timestamp() + MAX_PUNTOS_SERIE * 60)
+
+        assert elegir_bucket(desde, hasta) == "1m"
+
+    def test_elegir_bucket_prefiere_el_mas_grueso(self):
+        """Test: Si varios buckets dan suficientes puntos se elige el más grueso"""
+        desde = datetime(2025, 1, 1)
+        hasta = datetime(2025, 1, 11)
+
+        assert elegir_bucket(desde, hasta, min_puntos=5) == "1d"
+        assert elegir_bucket(desde, hasta, min_puntos=50) == "1h"
+
+    def test_elegir_bucket_rango_corto(self):
+        """Test: Si ningún bucket llega al mínimo de puntos se usa el más fino"""
+        desde = datetime(2025, 1, 1)
+
+        assert elegir_bucket(desde, datetime(2025, 1, 1, 0, 10)) == "1m"
+
+    @patch('services.rollup_service.db')
+    def test_dialecto_no_soportado_omite_rollups(self, mock_db):
+        """Test: Con un dialecto sin upsert la lectura se registra sin rollups"""
+        mock_db.engine.dialect.name = "oracle"
+
+        assert actualizar_rollups([fila(10, datetime(2025, 1, 10, 8, 0))]) == 0
+        mock_db.session.execute.assert_not_called()
@@ -18,10 +18,19 @@ def make_aware(dt):
         return dt.replace(tzinfo=timezone.utc)
     return dt
 
+def to_naive_utc(dt):
+    """
+    Convierte datetime a naive en UTC (como lo devuelve MySQL DATETIME)
+    """
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
 def parse_timestamp(timestamp_str):
     """
-    Parsea string de timestamp en múltiples formatos.
-    Retorna datetime aware (UTC)
+    Parsea string de timestamp en múltiples formatos, incluido ISO 8601 con
+    zona ("Z" o "+HH:MM", como lo envían los dispositivos).
+    Retorna datetime aware (UTC si el texto no indica zona)
     """
     formatos = [
         "%Y-%m-%d %H:%M:%S",
@@ -36,5 +45,10 @@ def parse_timestamp(timestamp_str):
             return make_aware(dt)
         except ValueError:
             continue
-    
+
+    try:
+        return make_aware(datetime.fromisoformat(timestamp_str))
+    except ValueError:
+        pass
+
     raise ValueError(f"Formato de timestamp no soportado: {timestamp_str}")
\ No newline at end of file
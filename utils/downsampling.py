@@ -0,0 +1,73 @@
+"""
+Reducción de puntos (downsampling) para series de gráficas
+"""
+import numpy as np
+
+
+def lttb(x, y, n_puntos):
+    """
+    Largest-Triangle-Three-Buckets: selecciona a lo sumo n_puntos puntos
+    que conservan la forma visual de la serie (picos incluidos).
+    x debe estar ordenado. Retorna los índices seleccionados.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if n_puntos >= n:
+        return np.arange(n)
+    if n_puntos < 3:
+        raise ValueError("LTTB requiere al menos 3 puntos")
+
+    # Las áreas no dependen del origen: desplazar x evita perder precisión
+    # en las sumas acumuladas de timestamps grandes
+    x = x - x[0]
+
+    # n_puntos - 2 buckets para los puntos interiores; el último "bucket
+    # siguiente" es el punto final. Cada bucket tiene al menos un punto.
+    bordes = np.append(np.linspace(1, n - 1, n_puntos - 1).astype(int), n)
+
+    # Promedio de cada bucket con sumas acumuladas (sin recorrerlos)
+    sx = np.concatenate(([0.0], np.cumsum(x)))
+    sy = np.concatenate(([0.0], np.cumsum(y)))
+    tamanos = bordes[1:] - bordes[:-1]
+    media_x = (sx[bordes[1:]] - sx[bordes[:-1]]) / tamanos
+    media_y = (sy[bordes[1:]] - sy[bordes[:-1]]) / tamanos
+
+    indices = np.empty(n_puntos, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        ax, ay = x[a], y[a]
+        cx, cy = media_x[i + 1], media_y[i + 1]
+        # Doble del área del triángulo (a, candidato, promedio del bucket siguiente)
+        areas = np.abs(
+            (ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay)
+        )
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+
+def promedio_por_bucket(x, y, n_puntos):
+    """
+    Agrupa la serie en n_puntos buckets consecutivos y retorna el promedio
+    de x e y de cada uno (adecuado para gráficas de barras).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if n_puntos >= n:
+        return x, y
+    if n_puntos < 1:
+        raise ValueError("Se requiere al menos 1 punto")
+
+    bordes = np.linspace(0, n, n_puntos + 1).astype(int)
+    tamanos = np.diff(bordes)
+    return (
+        np.add.reduceat(x, bordes[:-1]) / tamanos,
+        np.add.reduceat(y, bordes[:-1]) / tamanos
+    )
@@ -0,0 +1,14 @@
+"""
+Lectura de variables de entorno de configuración
+"""
+import os
+
+VERDADEROS = ("1", "true", "yes", "si", "sí", "on")
+
+
+def env_bool(nombre, default=False):
+    """True si la variable vale 1/true/yes/si/on (sin distinguir mayúsculas); default si no está definida"""
+    valor = os.environ.get(nombre)
+    if valor is None or not valor.strip():
+        return default
+    return valor.strip().lower() in VERDADEROS
@@ -0,0 +1,51 @@
+"""
+Medición de memoria del proceso actual (Linux: /proc; otros: getrusage)
+"""
+import os
+import resource
+import sys
+
+
+def _leer_kb(ruta, campos):
+    """Lee campos 'Nombre:  N kB' de un archivo de /proc"""
+    valores = {}
+    try:
+        with open(ruta) as f:
+            for linea in f:
+                nombre, _, resto = linea.partition(":")
+                if nombre in campos:
+                    valores[nombre] = int(resto.split()[0])
+    except OSError:
+        pass
+    return valores
+
+
+def uso_memoria_mb():
+    """
+    Retorna dict con rss, pss y compartida (MB) del proceso actual.
+    pss reparte las páginas compartidas entre los procesos que las usan,
+    así que la suma de pss de los workers es la memoria real del servicio.
+    Los valores no disponibles en la plataforma son None.
+    """
+    estado = _leer_kb("/proc/self/status", {"VmRSS"})
+    resumen = _leer_kb("/proc/self/smaps_rollup", {"Pss", "Shared_Clean", "Shared_Dirty"})
+
+    rss = estado.get("VmRSS")
+    if rss is None:
+        # ru_maxrss es el pico: en KB en Linux, en bytes en macOS
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = maximo / 1024 if sys.platform == "darwin" else maximo
+
+    compartida = None
+    if "Shared_Clean" in resumen or "Shared_Dirty" in resumen:
+        compartida = resumen.get("Shared_Clean", 0) + resumen.get("Shared_Dirty", 0)
+
+    def mb(kb):
+        return round(kb / 1024, 1) if kb is not None else None
+
+    return {
+        "pid": os.getpid(),
+        "rss_mb": mb(rss),
+        "pss_mb": mb(resumen.get("Pss")),
+        "compartida_mb": mb(compartida)
+    }